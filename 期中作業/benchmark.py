@@ -0,0 +1,116 @@
+"""
+期中作業 : 曼德博集合 - 效能比較 (Benchmark)
+目標：比較不同計算引擎的耗時，並確認結果與原始逐點版本完全一致。
+執行：python benchmark.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from mid import generate_fractal
+from deep_zoom import render_deep
+
+# 標準曼德博集合全景
+FULL_VIEW = (-2.0, 0.5, -1.25, 1.25)
+# 深度放大 (海馬谷附近，放大約 5 萬倍)
+DEEP_VIEW = (-0.74877, -0.74872, 0.06505, 0.06510)
+
+def timed(func, *args, **kwargs):
+    """ 執行 func 並回傳 (結果, 耗時秒數) """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_vector_vs_scalar(width=200, height=200, max_iter=100):
+    """
+    1. 向量化 + tile 引擎 vs 原始雙重迴圈
+    """
+    print(f"=== 1. vector vs scalar ({width}x{height}, max_iter={max_iter}) ===")
+    (_, _, n_scalar), t_scalar = timed(generate_fractal, *FULL_VIEW, width, height, max_iter, engine='scalar')
+    (_, _, n_vector), t_vector = timed(generate_fractal, *FULL_VIEW, width, height, max_iter, engine='vector')
+
+    same = np.array_equal(n_scalar, n_vector)
+    print(f"scalar: {t_scalar:.3f} 秒")
+    print(f"vector: {t_vector:.3f} 秒 (加速 {t_scalar / t_vector:.1f} 倍)")
+    print(f"結果一致? {'✅' if same else '❌'}\n")
+    return same
+
+def bench_parallel(width=800, height=800, max_iter=500, workers=None):
+    """
+    2. 多核心 tile 排程 vs 單核心向量化 (預設使用全部 CPU)
+    """
+    workers = workers or os.cpu_count()
+    print(f"=== 2. parallel (workers={workers}) vs vector ({width}x{height}, max_iter={max_iter}) ===")
+    (_, _, n_serial), t_serial = timed(generate_fractal, *FULL_VIEW, width, height, max_iter)
+    (_, _, n_parallel), t_parallel = timed(generate_fractal, *FULL_VIEW, width, height, max_iter, workers=workers)
+
+    same = np.array_equal(n_serial, n_parallel)
+    print(f"vector  : {t_serial:.3f} 秒")
+    print(f"parallel: {t_parallel:.3f} 秒 (加速 {t_serial / t_parallel:.1f} 倍)")
+    print(f"結果一致? {'✅' if same else '❌'}\n")
+    return same
+
+def bench_modes(view, name, width=400, height=400, max_iter=1000, engine='vector'):
+    """
+    3. 各種 mode (basic / fast / trace) 的耗時，以及與 basic 不同的像素數
+    """
+    print(f"=== 3. modes @ {name}, engine={engine} ({width}x{height}, max_iter={max_iter}) ===")
+    (_, _, base), t_base = timed(generate_fractal, *view, width, height, max_iter, engine=engine, mode='basic')
+    print(f"basic: {t_base:.3f} 秒")
+    results = {}
+    for mode in ('fast', 'trace'):
+        (_, _, n3), t = timed(generate_fractal, *view, width, height, max_iter, engine=engine, mode=mode)
+        diff = int((n3 != base).sum())
+        results[mode] = diff
+        print(f"{mode:5s}: {t:.3f} 秒 (加速 {t_base / t:.1f} 倍)，不同像素 {diff} 個")
+    print()
+    return results
+
+def bench_deep_zoom(width=400, height=400, max_iter=2000):
+    """
+    4. 微擾理論深度放大 (半寬 1e-50) vs 一般全景繪製
+    """
+    print(f"=== 4. deep zoom 1e-50 vs 全景 ({width}x{height}, max_iter={max_iter}) ===")
+    (_, _, n_full), t_full = timed(generate_fractal, *FULL_VIEW, width, height, max_iter, mode='fast', verbose=False)
+    (_, _, n_deep), t_deep = timed(render_deep, "0", "1", "1e-50", width, height, max_iter, verbose=False)
+    print(f"全景 (float64)       : {t_full:.3f} 秒")
+    print(f"深度放大 (perturbation): {t_deep:.3f} 秒，共 {len(np.unique(n_deep))} 種逃逸次數 (色塊化時只會有 1 種)\n")
+    return t_deep
+
+def bench_export_memory(sizes=(1000, 2000, 4000, 8000), max_iter=50):
+    """
+    5. 串流匯出 PNG 的峰值記憶體 (每個尺寸開一個獨立行程，讀取它自己的 VmHWM，需要 Linux 的 /proc；
+    ru_maxrss 在 fork 後會沿用父行程的峰值，前面的 benchmark 用掉的記憶體會被算進來)
+    """
+    print(f"=== 5. export.py 峰值記憶體 (max_iter={max_iter}) ===")
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = ("import sys; from export import export; "
+            "export(sys.argv[1], -2.0, 0.5, -1.25, 1.25, int(sys.argv[2]), int(sys.argv[2]), int(sys.argv[3])); "
+            "print(open('/proc/self/status').read().split('VmHWM:')[1].split()[0], 'matplotlib' in sys.modules)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            out = os.path.join(tmp, f"{size}.png")
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", code, out, str(size), str(max_iter)],
+                                  cwd=here, capture_output=True, text=True, check=True)
+            elapsed = time.perf_counter() - start
+            rss_kb, mpl = proc.stdout.split()
+            results[size] = int(rss_kb)
+            print(f"{size}x{size}: {elapsed:.2f} 秒，峰值記憶體 {int(rss_kb) / 1024:.1f} MB，載入 matplotlib? {mpl}")
+    print()
+    return results
+
+if __name__ == "__main__":
+    bench_vector_vs_scalar()
+    bench_parallel()
+    bench_modes(FULL_VIEW, "全景")
+    bench_modes(DEEP_VIEW, "深度放大")
+    bench_modes(FULL_VIEW, "全景", 150, 150, engine='scalar')
+    bench_modes(DEEP_VIEW, "深度放大", 150, 150, engine='scalar')
+    bench_deep_zoom()
+    bench_export_memory()
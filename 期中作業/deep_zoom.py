@@ -0,0 +1,182 @@
+"""
+期中作業 : 曼德博集合 - 微擾理論 (Perturbation Theory) 深度放大
+問題：放大超過約 1e-13 倍後，np.linspace 與 Python complex (float64) 的解析度不夠，
+      相鄰像素算出同一個座標，畫面變成一格一格的色塊。
+解法：
+1. 只對畫面中心的「參考點」C 用 decimal 高精度計算一條參考軌道 Z_n
+2. 其他像素 c = C + dc 只追蹤與參考軌道的差 d_n = z_n - Z_n (float64 即可)：
+       d_(n+1) = 2 Z_n d_n + d_n^2 + dc
+3. 級數近似 (Series Approximation)：d_n ≈ A_n dc + B_n dc^2 + C_n dc^3，
+   前面大量迭代直接用係數跳過
+4. 偵測 glitch (|Z_n + d_n| 遠小於 |Z_n|，float64 失去有效位數) 的像素，
+   改用其中一個像素當新的參考點重算
+"""
+
+import math
+import time
+from decimal import Decimal, localcontext
+
+import numpy as np
+
+# Pauldelbrot glitch 判準：|z| < GLITCH_TOL * |Z| 代表相對誤差已經失控
+GLITCH_TOL = 1e-3
+# 級數近似的截斷誤差容許值 (三次項相對於一次項)
+SA_TOL = 1e-12
+# 最多使用幾個參考點 (每個參考點都要跑一次高精度軌道)
+MAX_REFERENCES = 16
+
+def to_decimal(x):
+    """ float 先轉成字串，避免 Decimal(1e-6) 展開成一長串二進位誤差 """
+    return Decimal(repr(x)) if isinstance(x, float) else Decimal(x)
+
+def precision_for(radius):
+    """ 依放大倍率決定 decimal 的有效位數 (多留 20 位作為保護) """
+    return max(30, int(-math.log10(float(radius))) + 20)
+
+def reference_orbit(c_re, c_im, max_iter, prec):
+    """
+    以 decimal 高精度計算參考軌道 Z_0 = 0, Z_(n+1) = Z_n^2 + C。
+    軌道本身的大小不超過 2，所以存成 float64 complex 不會損失需要的精度。
+    若參考點在 max_iter 之前逃逸，回傳的陣列會比 max_iter 短。
+    """
+    orbit = []
+    with localcontext() as ctx:
+        ctx.prec = prec
+        c_re, c_im = Decimal(c_re), Decimal(c_im)
+        zr = zi = Decimal(0)
+        four = Decimal(4)
+        for _ in range(max_iter):
+            orbit.append(complex(float(zr), float(zi)))
+            zr2, zi2 = zr * zr, zi * zi
+            if zr2 + zi2 > four:
+                break
+            zr, zi = zr2 - zi2 + c_re, 2 * zr * zi + c_im
+    return np.array(orbit, dtype=np.complex128)
+
+def series_approximation(orbit, dc_max):
+    """
+    計算級數係數 A_n, B_n, C_n，並找出可以直接跳到的迭代次數 n0：
+        A_(n+1) = 2 Z_n A_n + 1
+        B_(n+1) = 2 Z_n B_n + A_n^2
+        C_(n+1) = 2 Z_n C_n + 2 A_n B_n
+    停止條件：三次項相對一次項超過 SA_TOL，或誤差上界可能讓某個像素提早逃逸。
+    回傳 (n0, A, B, C)。
+    """
+    A = B = C = 0j
+    n = 0
+    while n + 1 < len(orbit):
+        Z = orbit[n]
+        A2 = 2 * Z * A + 1
+        B2 = 2 * Z * B + A * A
+        C2 = 2 * Z * C + 2 * A * B
+        # 以 dc_max 為尺度比較 (同除以 dc_max 避免極小數相乘下溢)
+        if abs(C2) * dc_max * dc_max > SA_TOL * abs(A2):
+            break
+        bound = (abs(A2) + abs(B2) * dc_max + abs(C2) * dc_max * dc_max) * dc_max
+        if abs(orbit[n + 1]) + bound > 2:
+            break
+        A, B, C = A2, B2, C2
+        n += 1
+    return n, A, B, C
+
+def perturb(orbit, dc, max_iter, use_series=True):
+    """
+    向量化的微擾迭代。dc 是一維 complex 陣列 (相對於參考點的偏移)。
+    回傳 (counts, glitched)：glitched 為需要換參考點重算的像素遮罩。
+    """
+    counts = np.full(dc.size, max_iter, dtype=np.int64)
+    glitched = np.zeros(dc.size, dtype=bool)
+
+    n0, A, B, C = 0, 0j, 0j, 0j
+    if use_series and dc.size:
+        n0, A, B, C = series_approximation(orbit, float(np.abs(dc).max()))
+    d = ((C * dc + B) * dc + A) * dc
+    idx = np.arange(dc.size)
+
+    for n in range(n0, len(orbit)):
+        if idx.size == 0:
+            break
+        Z = orbit[n]
+        z = Z + d
+        mag = z.real * z.real + z.imag * z.imag
+        escaped = mag > 4.0
+        glitch = mag < GLITCH_TOL * GLITCH_TOL * (Z.real * Z.real + Z.imag * Z.imag)
+        done = escaped | glitch
+        if done.any():
+            counts[idx[escaped]] = n
+            glitched[idx[glitch & ~escaped]] = True
+            alive = ~done
+            idx, d, dc = idx[alive], d[alive], dc[alive]
+        # d_(n+1) = 2 Z d + d^2 + dc
+        d = (2 * Z + d) * d + dc
+
+    # 參考點比這些像素更早逃逸，剩下的像素沒有參考軌道可用
+    if len(orbit) < max_iter:
+        glitched[idx] = True
+    return counts, glitched
+
+def render_deep(center_re, center_im, radius, width, height, max_iter,
+                max_references=MAX_REFERENCES, use_series=True, verbose=True):
+    """
+    深度放大繪製。center_re / center_im 請用字串或 Decimal 傳入 (float 只有 16 位有效數字)，
+    radius 是實軸方向的半寬 (例如 "1e-50")。
+    回傳 (r1, r2, n3)：r1, r2 是相對於中心的 float64 偏移量，n3 與 generate_fractal 相同格式。
+    """
+    radius = to_decimal(radius)
+    prec = precision_for(radius)
+    rx = float(radius)
+    ry = rx * height / width
+    r1 = np.linspace(-rx, rx, width)
+    r2 = np.linspace(-ry, ry, height)
+    dc_all = (r1[:, None] + 1j * r2[None, :]).ravel()
+
+    if verbose:
+        print(f"深度放大 {width}x{height}，半寬 {radius}，使用 {prec} 位有效數字計算參考軌道...")
+    start_time = time.time()
+
+    counts = np.full(dc_all.size, max_iter, dtype=np.int64)
+    pending = np.arange(dc_all.size)
+    ref_offset = 0j
+    with localcontext() as ctx:
+        ctx.prec = prec
+        ref_re, ref_im = to_decimal(center_re), to_decimal(center_im)
+
+    for k in range(max_references):
+        orbit = reference_orbit(ref_re, ref_im, max_iter, prec)
+        part, glitched = perturb(orbit, dc_all[pending] - ref_offset, max_iter, use_series)
+        counts[pending[~glitched]] = part[~glitched]
+        pending = pending[glitched]
+        if verbose:
+            print(f"  參考點 #{k + 1}: 軌道長度 {len(orbit)}，待重算像素 {pending.size}")
+        if pending.size == 0:
+            break
+        # 取待重算像素的中位數當新的參考點 (它自己的 d 恆為 0，保證每輪都有進展)
+        ref_offset = dc_all[pending[pending.size // 2]]
+        with localcontext() as ctx:
+            ctx.prec = prec
+            ref_re = to_decimal(center_re) + Decimal(ref_offset.real)
+            ref_im = to_decimal(center_im) + Decimal(ref_offset.imag)
+
+    if verbose:
+        if pending.size:
+            print(f"⚠️ 仍有 {pending.size} 個像素未能解決 glitch (以 max_iter 填入)")
+        print(f"計算完成！耗時: {time.time() - start_time:.2f} 秒")
+    return r1, r2, counts.reshape(width, height).astype(np.float64)
+
+def plot_deep_zoom(center_re, center_im, radius, width=400, height=400, max_iter=1000):
+    """ 繪製深度放大影像，座標軸標示相對於中心的偏移量 """
+    import matplotlib.pyplot as plt
+
+    x, y, z = render_deep(center_re, center_im, radius, width, height, max_iter)
+    plt.figure(figsize=(10, 10))
+    plt.imshow(z.T, extent=[x[0], x[-1], y[0], y[-1]], cmap='magma', origin='lower')
+    plt.colorbar(label='Iterations to Escape')
+    plt.title(f"Mandelbrot Deep Zoom\nCenter: {center_re} + {center_im}i, Radius: {radius}")
+    plt.xlabel("Re(c) - center")
+    plt.ylabel("Im(c) - center")
+    plt.show()
+
+if __name__ == "__main__":
+    # c = i 是 Misiurewicz 點 (軌道 0 -> i -> -1+i -> -i -> -1+i ...)，
+    # 在任何尺度下都看得到螺旋結構，適合展示 1e-50 等級的放大
+    plot_deep_zoom("0", "1", "1e-50", 400, 400, 2000)
@@ -0,0 +1,89 @@
+"""
+期中作業 : 曼德博集合 - 無 matplotlib 的串流匯出
+目標：批次輸出超大影像 (例如 20000x20000 以上)。
+1. 由上往下逐條 tile 計算 (mid.iter_fractal_tiles)，算完立刻寫檔，不保留完整的 n3
+2. .npy：寫入 memory-mapped 檔案 (np.lib.format.open_memmap)
+3. .png：以 LUT 著色後逐列壓縮寫出 (imaging.PNGStreamWriter)
+4. 全程不載入 matplotlib.pyplot，峰值記憶體只和 tile 大小有關
+執行：python export.py out.png --size 20000 20000 --max-iter 256
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from mid import iter_fractal_tiles
+from imaging import PNGStreamWriter, build_lut
+
+FULL_VIEW = (-2.0, 0.5, -1.25, 1.25)
+# 每條 tile 的像素數上限；列數依寬度換算，寬度再大記憶體用量也不變
+TILE_PIXELS = 1 << 16
+
+def iter_image_rows(xmin, xmax, ymin, ymax, width, height, max_iter,
+                    tile_rows=None, mode='fast'):
+    """
+    依影像順序 (由上往下) 產生 (row0, rows)，rows 的形狀為 (列數, width)。
+    像素座標與 generate_fractal 相同，只是 r2 反過來走，第一列是 ymax。
+    tile_rows=None 時依 TILE_PIXELS 自動決定。
+    """
+    if tile_rows is None:
+        tile_rows = max(1, TILE_PIXELS // width)
+    r1 = np.linspace(xmin, xmax, width)
+    r2 = np.linspace(ymin, ymax, height)[::-1]
+    for j0, _, block in iter_fractal_tiles(r1, r2, max_iter, tile_rows, mode):
+        yield j0, block.T
+
+def export_npy(path, xmin, xmax, ymin, ymax, width, height, max_iter,
+               tile_rows=None, mode='fast'):
+    """
+    將逃逸次數寫入 .npy (uint32，形狀 (height, width)，第一列是 ymax)。
+    使用 memory-mapped 檔案，寫完一條 tile 就 flush，不佔用常駐記憶體。
+    """
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint32, shape=(height, width))
+    for row0, rows in iter_image_rows(xmin, xmax, ymin, ymax, width, height, max_iter, tile_rows, mode):
+        out[row0:row0 + rows.shape[0]] = rows
+        out.flush()
+    del out
+
+def export_png(path, xmin, xmax, ymin, ymax, width, height, max_iter,
+               tile_rows=None, mode='fast'):
+    """
+    以 magma 近似色票輸出 PNG，顏色由預先建好的 LUT 查表，掃描線逐條寫出。
+    """
+    lut = build_lut(max_iter)
+    with open(path, "wb") as f:
+        writer = PNGStreamWriter(f, width, height)
+        for _, rows in iter_image_rows(xmin, xmax, ymin, ymax, width, height, max_iter, tile_rows, mode):
+            writer.write_rows(lut[rows.astype(np.intp)])
+        writer.close()
+
+def export(path, *args, **kwargs):
+    """ 依副檔名選擇 .npy 或 .png """
+    if path.endswith(".npy"):
+        export_npy(path, *args, **kwargs)
+    elif path.endswith(".png"):
+        export_png(path, *args, **kwargs)
+    else:
+        raise ValueError("輸出檔名必須是 .npy 或 .png")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Mandelbrot export (.png / .npy)")
+    parser.add_argument("out", help="輸出檔案 (.png 或 .npy)")
+    parser.add_argument("--view", type=float, nargs=4, default=FULL_VIEW,
+                        metavar=("XMIN", "XMAX", "YMIN", "YMAX"))
+    parser.add_argument("--size", type=int, nargs=2, default=(800, 800), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--tile-rows", type=int, default=None, help="每條 tile 的列數 (預設依寬度自動決定)")
+    parser.add_argument("--mode", default="fast", choices=["basic", "fast", "trace"])
+    args = parser.parse_args(argv)
+
+    width, height = args.size
+    print(f"正在輸出 {width}x{height} 到 {args.out} ...")
+    start = time.time()
+    export(args.out, *args.view, width, height, args.max_iter,
+           tile_rows=args.tile_rows, mode=args.mode)
+    print(f"完成！耗時: {time.time() - start:.2f} 秒")
+
+if __name__ == "__main__":
+    main()
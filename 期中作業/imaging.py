@@ -0,0 +1,99 @@
+"""
+期中作業 : 曼德博集合 - 影像輸出工具
+不依賴 matplotlib，只用 NumPy 與標準函式庫：
+1. 逃逸次數 -> 顏色：預先建好的查表 (LUT)，著色只需一次索引
+2. RGB 陣列 -> PNG：用 zlib 自行組出 PNG 檔案格式
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+# 近似 matplotlib 'magma' 色票的控制點 (由暗到亮)，與 plot_mandelbrot 的配色一致
+MAGMA_ANCHORS = [
+    (0, 0, 4),
+    (40, 11, 84),
+    (101, 21, 110),
+    (159, 42, 99),
+    (212, 72, 66),
+    (245, 125, 21),
+    (250, 193, 39),
+    (252, 253, 191),
+]
+
+def build_lut(max_iter, anchors=MAGMA_ANCHORS):
+    """
+    建立長度 max_iter + 1 的顏色查表，lut[n] 是逃逸次數 n 的 RGB 顏色。
+    與 imshow 相同，0 對應最暗、max_iter (集合內部) 對應最亮。
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    t = np.linspace(0.0, 1.0, max_iter + 1)
+    pos = np.linspace(0.0, 1.0, len(anchors))
+    lut = np.empty((max_iter + 1, 3), dtype=np.uint8)
+    for ch in range(3):
+        lut[:, ch] = np.round(np.interp(t, pos, anchors[:, ch]))
+    return lut
+
+def colorize(n3, lut):
+    """
+    n3[i, j] (i 沿實軸、j 沿虛軸) -> 影像 RGB 陣列 (高, 寬, 3)。
+    影像第一列是虛部最大的一列 (等同 imshow 的 origin='lower')。
+    """
+    counts = np.asarray(n3).T[::-1].astype(np.intp)
+    return lut[counts]
+
+def png_chunk(tag, data):
+    """ PNG 區塊：長度 + 標籤 + 資料 + CRC """
+    return (struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def png_header(width, height):
+    """ PNG 檔頭 + IHDR (8-bit RGB) """
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + png_chunk(b"IHDR", ihdr)
+
+def encode_png(rgb, level=6):
+    """ 將 (高, 寬, 3) 的 uint8 陣列編碼成 PNG bytes """
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    height, width, _ = rgb.shape
+    # 每一列前面加上濾波類型 0 (None)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+    return (png_header(width, height)
+            + png_chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + png_chunk(b"IEND", b""))
+
+class PNGStreamWriter:
+    """
+    逐列寫出 PNG：每次 write_rows 只壓縮傳入的幾列，並立即寫成一個 IDAT 區塊。
+    記憶體用量只和一次傳入的列數有關，與整張影像大小無關。
+    """
+    def __init__(self, f, width, height, level=6):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._zlib = zlib.compressobj(level)
+        f.write(png_header(width, height))
+
+    def write_rows(self, rgb_rows):
+        """ rgb_rows: (列數, 寬, 3) 的 uint8 陣列，由上往下 """
+        rgb_rows = np.ascontiguousarray(rgb_rows, dtype=np.uint8)
+        n = rgb_rows.shape[0]
+        if self.rows_written + n > self.height:
+            raise ValueError("寫入的列數超過影像高度")
+        raw = np.zeros((n, self.width * 3 + 1), dtype=np.uint8)
+        raw[:, 1:] = rgb_rows.reshape(n, self.width * 3)
+        data = self._zlib.compress(raw.tobytes())
+        if data:
+            self.f.write(png_chunk(b"IDAT", data))
+        self.rows_written += n
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"只寫入 {self.rows_written} / {self.height} 列")
+        self.f.write(png_chunk(b"IDAT", self._zlib.flush()))
+        self.f.write(png_chunk(b"IEND", b""))
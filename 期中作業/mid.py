@@ -3,17 +3,23 @@
 目標：利用複數迭代函數 f(z) = z^2 + c，繪製出數學上著名的碎形圖案。
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
+import math
+import os
 import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
 
-def mandelbrot(c, max_iter):
+def mandelbrot(c, max_iter, mode='basic'):
     """
     計算複數 c 是否屬於曼德博集合。
     核心公式：z(n+1) = z(n)^2 + c, z(0) = 0
     如果 |z| 超過 2，則認定為發散 (不屬於集合)。
     回傳：發散時的迭代次數 (用於著色)。
+    mode='fast' 時改用 mandelbrot_fast (結果完全相同，但集合內部的點快很多)。
     """
+    if mode == 'fast':
+        return mandelbrot_fast(c, max_iter)
     z = 0
     for n in range(max_iter):
         if abs(z) > 2:
@@ -21,40 +27,354 @@ def mandelbrot(c, max_iter):
         z = z*z + c
     return max_iter
 
-def generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter):
+# |z|^2 超過此值才用 hypot 確認 |z| > 2，
+# 平常省去開根號，又保證與 abs(z) > 2 的判斷逐位元一致
+ESCAPE_CHECK = 3.9999999
+
+def in_cardioid_or_bulb(x, y):
+    """
+    解析判斷 c = x + yi 是否落在主心形 (main cardioid) 或週期 2 圓盤內。
+    這兩個區域內的點一定屬於集合，可以直接回傳 max_iter。
+    x, y 可以是純量或 NumPy 陣列。
+    """
+    xq = x - 0.25
+    q = xq * xq + y * y
+    cardioid = q * (q + xq) < 0.25 * y * y
+    bulb = (x + 1.0) * (x + 1.0) + y * y < 0.0625
+    return cardioid | bulb
+
+def mandelbrot_fast(c, max_iter):
+    """
+    加速版逃逸時間核心，回傳值與 mandelbrot() 完全相同：
+    1. 主心形 / 週期 2 圓盤的解析判斷
+    2. Brent 週期偵測：z 與存檔值「完全相等」代表軌道進入循環，永遠不會逃逸
+    3. 以 |z|^2 與 4 比較，省去 abs(z) 的開根號
+    """
+    x, y = c.real, c.imag
+    if in_cardioid_or_bulb(x, y):
+        return max_iter
+
+    zr = zi = 0.0
+    saved_r = saved_i = 0.0  # Brent 演算法的存檔點
+    power, lam = 1, 0
+    for n in range(max_iter):
+        zr2 = zr * zr
+        zi2 = zi * zi
+        if zr2 + zi2 > ESCAPE_CHECK and math.hypot(zr, zi) > 2:
+            return n
+        # z^2 + c 拆成實部與虛部，運算順序與 Python complex 相同
+        p = zr * zi
+        zi = p + p + y
+        zr = zr2 - zi2 + x
+
+        if zr == saved_r and zi == saved_i:
+            return max_iter
+        lam += 1
+        if lam == power:
+            saved_r, saved_i = zr, zi
+            power *= 2
+            lam = 0
+    return max_iter
+
+# 向量化版本每隔幾輪做一次週期比對 (比對本身也有成本)
+CYCLE_CHECK_EVERY = 4
+
+# 每個 tile 處理的列數 (沿虛軸方向)，記憶體用量約為 width * TILE_ROWS 個複數
+TILE_ROWS = 64
+
+def escape_time_tile(cr, ci, max_iter, mode='basic'):
+    """
+    向量化的逃逸時間計算 (一次處理整個 tile)。
+    cr, ci: 同形狀的實部 / 虛部陣列。
+    每一輪只對「尚未逃逸」的點做 z = z^2 + c，
+    已逃逸的點會從工作陣列中移除，不再花費計算量。
+    mode='fast' 時另外套用心形 / 圓盤判斷與 Brent 週期偵測 (同 mandelbrot_fast)。
+    回傳：與 cr 同形狀的逃逸次數陣列 (與 mandelbrot() 逐點結果一致)。
+    """
+    shape = cr.shape
+    counts = np.full(cr.size, max_iter, dtype=np.int64)
+
+    # 只保留仍在迭代中的點 (idx 記錄它們在 tile 中的位置)
+    idx = np.arange(cr.size)
+    cr = cr.ravel().copy()
+    ci = ci.ravel().copy()
+    fast = mode == 'fast'
+    if fast:
+        # 心形與圓盤內的點直接保留 max_iter，不進入迭代
+        alive = ~in_cardioid_or_bulb(cr, ci)
+        idx, cr, ci = idx[alive], cr[alive], ci[alive]
+    zr = np.zeros_like(cr)
+    zi = np.zeros_like(ci)
+    saved_r = np.zeros_like(cr)
+    saved_i = np.zeros_like(ci)
+    power, lam = 1, 0
+
+    for n in range(max_iter):
+        if idx.size == 0:
+            break
+        # |z| > 2  <=>  zr^2 + zi^2 > 4 (省去開根號，只在邊界附近才用 hypot 確認)
+        zr2 = zr * zr
+        zi2 = zi * zi
+        escaped = zr2 + zi2 > ESCAPE_CHECK
+        if escaped.any():
+            escaped[escaped] = np.hypot(zr[escaped], zi[escaped]) > 2
+            counts[idx[escaped]] = n
+            alive = ~escaped
+            idx, cr, ci = idx[alive], cr[alive], ci[alive]
+            zr, zi, zr2, zi2 = zr[alive], zi[alive], zr2[alive], zi2[alive]
+            if fast:
+                saved_r, saved_i = saved_r[alive], saved_i[alive]
+        # z^2 + c 拆成實部與虛部，運算順序與 Python complex 相同
+        p = zr * zi
+        zi = p + p + ci
+        zr = zr2 - zi2 + cr
+
+        if fast and n % CYCLE_CHECK_EVERY == 0:
+            # 所有點同步迭代，所以 Brent 的 power / lam 是共用的純量；
+            # 每隔幾輪才比對一次，循環只會晚一點被發現，不會誤判
+            cycled = zr == saved_r
+            cycled &= zi == saved_i
+            if cycled.any():
+                alive = ~cycled
+                idx, cr, ci = idx[alive], cr[alive], ci[alive]
+                zr, zi = zr[alive], zi[alive]
+                saved_r, saved_i = saved_r[alive], saved_i[alive]
+        if fast:
+            lam += 1
+            if lam == power:
+                saved_r, saved_i = zr.copy(), zi.copy()
+                power *= 2
+                lam = 0
+
+    return counts.reshape(shape)
+
+def generate_fractal_scalar(r1, r2, max_iter, mode='basic'):
+    """
+    原始的逐點版本：雙重迴圈，每個像素呼叫一次 mandelbrot()。
+    保留下來作為正確性對照與效能比較的基準。
+    """
+    n3 = np.empty((len(r1), len(r2)))
+    for i in range(len(r1)):
+        for j in range(len(r2)):
+            # 將像素座標轉換為複數平面座標
+            c = complex(r1[i], r2[j])
+            # 計算該點的逃逸時間
+            n3[i, j] = mandelbrot(c, max_iter, mode)
+    return n3
+
+def generate_fractal_vector(r1, r2, max_iter, tile_rows=TILE_ROWS, mode='basic'):
+    """
+    NumPy 向量化版本：沿虛軸把影像切成固定列數的 tile 逐塊計算，
+    因此大解析度 (例如 4K) 時記憶體用量只和 tile 大小有關。
+    """
+    n3 = np.empty((len(r1), len(r2)))
+    for j0, j1, block in iter_fractal_tiles(r1, r2, max_iter, tile_rows, mode):
+        n3[:, j0:j1] = block
+    return n3
+
+# 邊界追蹤時，矩形任一邊小於此像素數就直接整塊計算
+TRACE_MIN_SIZE = 8
+
+def generate_fractal_trace(r1, r2, max_iter, engine='vector', min_size=TRACE_MIN_SIZE):
+    """
+    Mariani-Silver 邊界追蹤 (rectangle filling)：
+    先算矩形四條邊，若邊上的逃逸次數全部相同，就把整個內部直接填成該值；
+    否則切成四塊重複處理。依據是曼德博集合 (以及每個逃逸次數帶) 的連通性。
+    注意：這是「取樣」後的判斷，比邊界像素還細的絲狀結構可能被填掉，
+    所以結果不保證與逐點計算逐像素相同 (其餘 mode 則保證完全一致)。
+    邊上的點使用 mode='fast' 核心計算。
+    """
+    width, height = len(r1), len(r2)
+    n3 = np.empty((width, height))
+    known = np.zeros((width, height), dtype=bool)
+
+    def compute(ii, jj):
+        """ 計算尚未算過的像素 (ii, jj 為一維索引陣列，可含重複) """
+        ii, jj = np.divmod(np.unique(ii * height + jj), height)
+        todo = ~known[ii, jj]
+        ii, jj = ii[todo], jj[todo]
+        if ii.size == 0:
+            return
+        if engine == 'scalar':
+            vals = [mandelbrot_fast(complex(r1[i], r2[j]), max_iter) for i, j in zip(ii, jj)]
+        else:
+            vals = escape_time_tile(r1[ii], r2[jj], max_iter, mode='fast')
+        n3[ii, jj] = vals
+        known[ii, jj] = True
+
+    # 逐層處理 (廣度優先)：同一層所有矩形的邊一次丟進向量化核心計算，
+    # 避免對許多小矩形各自呼叫一次 escape_time_tile 的額外開銷。
+    # 每個矩形是像素範圍 [i0, i1) x [j0, j1)
+    level = [(0, width, 0, height)]
+    while level:
+        batch_i, batch_j, split = [], [], []
+        for i0, i1, j0, j1 in level:
+            if i1 - i0 <= min_size or j1 - j0 <= min_size:
+                ii, jj = np.meshgrid(np.arange(i0, i1), np.arange(j0, j1), indexing='ij')
+                batch_i.append(ii.ravel())
+                batch_j.append(jj.ravel())
+                continue
+            # 四條邊的像素索引
+            cols = np.arange(i0, i1)
+            rows = np.arange(j0, j1)
+            batch_i += [cols, cols, np.full(len(rows), i0), np.full(len(rows), i1 - 1)]
+            batch_j += [np.full(len(cols), j0), np.full(len(cols), j1 - 1), rows, rows]
+            split.append((i0, i1, j0, j1))
+        compute(np.concatenate(batch_i), np.concatenate(batch_j))
+
+        level = []
+        for i0, i1, j0, j1 in split:
+            border = np.concatenate([n3[i0:i1, j0], n3[i0:i1, j1 - 1], n3[i0, j0:j1], n3[i1 - 1, j0:j1]])
+            if (border == border[0]).all():
+                n3[i0 + 1:i1 - 1, j0 + 1:j1 - 1] = border[0]
+                known[i0 + 1:i1 - 1, j0 + 1:j1 - 1] = True
+                continue
+            # 切成四塊，相鄰兩塊共用中間那條線 (已算過的像素不會重算)
+            im, jm = (i0 + i1) // 2, (j0 + j1) // 2
+            level += [(i0, im + 1, j0, jm + 1), (im, i1, j0, jm + 1),
+                      (i0, im + 1, jm, j1), (im, i1, jm, j1)]
+    return n3
+
+def iter_fractal_tiles(r1, r2, max_iter, tile_rows=TILE_ROWS, mode='basic'):
+    """
+    串流版本：依 r2 的順序逐塊產生 (j0, j1, block)，block 即 n3[:, j0:j1]。
+    呼叫端可以邊算邊寫檔，不必把整個 n3 留在記憶體 (見 export.py)。
+    mode='trace' 時在每一條 tile 內各自做邊界追蹤。
+    """
+    for j0 in range(0, len(r2), tile_rows):
+        j1 = min(j0 + tile_rows, len(r2))
+        if mode == 'trace':
+            block = generate_fractal_trace(r1, r2[j0:j1], max_iter)
+        else:
+            cr, ci = np.meshgrid(r1, r2[j0:j1], indexing='ij')
+            block = escape_time_tile(cr, ci, max_iter, mode)
+        yield j0, j1, block
+
+# 平行模式下每個 tile 的邊長 (像素)，tile 越小負載越平均，但排程開銷越高
+TILE_SIZE = 128
+
+# --- 平行運算 (Multi-core Tile Scheduler) ---
+# 每個 worker 行程啟動時附加到同一塊共享記憶體，直接把結果寫進 n3，
+# 因此大型 n3 不需要經由 pickle 傳回主行程。
+_shared = {}
+
+def _init_worker(shm_name, shape, r1, r2, max_iter, mode):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared['shm'] = shm  # 保留參照，避免共享記憶體被提早關閉
+    _shared['n3'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _shared['r1'] = r1
+    _shared['r2'] = r2
+    _shared['max_iter'] = max_iter
+    _shared['mode'] = mode
+
+def _render_tile(tile):
+    """ worker 端：計算單一 tile，寫入共享陣列，回傳 (tile, 耗時, pid) """
+    i0, i1, j0, j1 = tile
+    start = time.perf_counter()
+    r1, r2 = _shared['r1'][i0:i1], _shared['r2'][j0:j1]
+    if _shared['mode'] == 'trace':
+        block = generate_fractal_trace(r1, r2, _shared['max_iter'])
+    else:
+        cr, ci = np.meshgrid(r1, r2, indexing='ij')
+        block = escape_time_tile(cr, ci, _shared['max_iter'], _shared['mode'])
+    _shared['n3'][i0:i1, j0:j1] = block
+    return tile, time.perf_counter() - start, os.getpid()
+
+def split_tiles(width, height, tile_size=TILE_SIZE):
+    """ 把 width x height 的像素範圍切成 (i0, i1, j0, j1) 方塊清單 """
+    return [(i0, min(i0 + tile_size, width), j0, min(j0 + tile_size, height))
+            for i0 in range(0, width, tile_size)
+            for j0 in range(0, height, tile_size)]
+
+def generate_fractal_parallel(r1, r2, max_iter, workers, tile_size=TILE_SIZE, mode='basic'):
+    """
+    多核心版本：把視窗切成 tile，交給行程池計算。
+    使用 imap_unordered(chunksize=1) 動態分派：哪個 worker 先做完就先領下一塊，
+    所以碰到集合內部 (要跑滿 max_iter) 的 tile 不會拖住整張圖。
+    回傳 (n3, timings)，timings 為每個 tile 的 (tile, 耗時秒數, pid)。
+    """
+    shape = (len(r1), len(r2))
+    nbytes = max(shape[0] * shape[1] * np.dtype(np.float64).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        tiles = split_tiles(shape[0], shape[1], tile_size)
+        with Pool(workers, initializer=_init_worker,
+                  initargs=(shm.name, shape, r1, r2, max_iter, mode)) as pool:
+            timings = list(pool.imap_unordered(_render_tile, tiles, chunksize=1))
+        # 共享記憶體在函式結束時釋放，只在主行程內複製一次
+        n3 = np.ndarray(shape, dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return n3, timings
+
+def report_tile_timings(timings, top=3):
+    """ 印出每個 tile 的耗時統計，以及最慢的幾個 tile """
+    if not timings:
+        return
+    seconds = [t for _, t, _ in timings]
+    pids = {pid for _, _, pid in timings}
+    print(f"共 {len(timings)} 個 tile，{len(pids)} 個 worker；"
+          f"每塊耗時 最短 {min(seconds):.3f} / 平均 {sum(seconds) / len(seconds):.3f} / 最長 {max(seconds):.3f} 秒")
+    for tile, t, pid in sorted(timings, key=lambda x: x[1], reverse=True)[:top]:
+        print(f"  tile x[{tile[0]}:{tile[1]}] y[{tile[2]}:{tile[3]}]: {t:.3f} 秒 (pid {pid})")
+
+def generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter,
+                     engine='vector', tile_rows=TILE_ROWS, workers=1, tile_size=TILE_SIZE,
+                     mode='basic', verbose=True):
     """
     生成指定範圍內的曼德博集合影像數據。
-    使用 Vectorization (向量化) 加速運算，避免雙重迴圈過慢。
+    engine='vector' (預設)：使用 NumPy 向量化 + 分塊 (tile) 運算。
+    engine='scalar'：原本的雙重迴圈逐點計算 (比較好理解數學原理，但很慢)。
+    workers > 1 時使用多核心 tile 排程 (workers <= 0 代表使用全部 CPU)，並印出每個 tile 的耗時。
+    mode='basic' (預設)：原始迭代。
+    mode='fast'：心形 / 圓盤判斷 + Brent 週期偵測 + |z|^2 比較，結果與 basic 完全一致。
+    mode='trace'：在 fast 之上再加 Mariani-Silver 邊界追蹤 (見 generate_fractal_trace 的說明)。
+    verbose=False 時不印出進度訊息 (給 tile 伺服器等批次呼叫使用)。
+    回傳 (r1, r2, n3)，其中 n3[i, j] 是點 r1[i] + r2[j]i 的逃逸次數。
     """
     # 建立座標網格
     r1 = np.linspace(xmin, xmax, width)
     r2 = np.linspace(ymin, ymax, height)
-    n3 = np.empty((width, height))
-    
-    # 這裡為了簡單展示，我們先用簡單的迴圈邏輯 (雖然慢一點，但比較好理解數學原理)
-    # 若要高效能，通常會使用 numpy 的廣播運算
-    print(f"正在計算 {width}x{height} 的像素點，請稍候...")
+
+    if workers is not None and workers <= 0:
+        workers = os.cpu_count()
+
+    if verbose:
+        print(f"正在計算 {width}x{height} 的像素點，請稍候...")
     start_time = time.time()
-    
-    for i in range(width):
-        for j in range(height):
-            # 將像素座標轉換為複數平面座標
-            real = r1[i]
-            imag = r2[j]
-            c = complex(real, imag)
-            
-            # 計算該點的逃逸時間
-            n3[i, j] = mandelbrot(c, max_iter)
-            
+
+    if engine not in ('vector', 'scalar'):
+        raise ValueError(f"未知的 engine: {engine}")
+    if mode not in ('basic', 'fast', 'trace'):
+        raise ValueError(f"未知的 mode: {mode}")
+
+    if engine == 'vector' and workers and workers > 1:
+        n3, timings = generate_fractal_parallel(r1, r2, max_iter, workers, tile_size, mode)
+        if verbose:
+            report_tile_timings(timings)
+    elif mode == 'trace':
+        n3 = generate_fractal_trace(r1, r2, max_iter, engine)
+    elif engine == 'vector':
+        n3 = generate_fractal_vector(r1, r2, max_iter, tile_rows, mode)
+    else:
+        n3 = generate_fractal_scalar(r1, r2, max_iter, mode)
+
     end_time = time.time()
-    print(f"計算完成！耗時: {end_time - start_time:.2f} 秒")
+    if verbose:
+        print(f"計算完成！耗時: {end_time - start_time:.2f} 秒")
     return (r1, r2, n3)
 
-def plot_mandelbrot(xmin, xmax, ymin, ymax, width=400, height=400, max_iter=256):
+def plot_mandelbrot(xmin, xmax, ymin, ymax, width=400, height=400, max_iter=256, workers=1,
+                    mode='basic'):
     """
-    繪製並顯示曼德博集合
+    繪製並顯示曼德博集合 (workers > 1 時使用多核心計算，mode 見 generate_fractal)
     """
-    x, y, z = generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter)
+    # 只有真的要畫圖時才載入 matplotlib，批次計算 / 匯出不需要它
+    import matplotlib.pyplot as plt
+
+    x, y, z = generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter,
+                               workers=workers, mode=mode)
     
     # 繪圖設定
     plt.figure(figsize=(10, 10))
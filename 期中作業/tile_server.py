@@ -0,0 +1,289 @@
+"""
+期中作業 : 曼德博集合 - 漸進式、可快取的縮放 Tile 伺服器
+目標：互動探索時不必每次重新計算整張圖。
+1. Tile 金字塔：以 (zoom, tx, ty, max_iter) 定位，第 zoom 層有 2^zoom x 2^zoom 塊
+2. 兩層快取：記憶體 LRU + 硬碟 (.npy)，平移時已算過的 tile 直接重用
+3. 漸進式繪製：先回傳低解析度預覽，完整解析度在背景計算完成後寫入快取
+4. 本機 HTTP 前端：提供 PNG 或原始逃逸次數 (.npy)
+執行：python tile_server.py --port 8000
+"""
+
+import argparse
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from mid import generate_fractal
+from imaging import build_lut, colorize, encode_png
+
+# 第 0 層 (唯一一塊 tile) 涵蓋的範圍，與 mid.py 的全景相同
+WORLD = (-2.0, 0.5, -1.25, 1.25)
+# 每塊 tile 的像素邊長
+TILE_PX = 256
+# 預覽的解析度縮小倍數
+PREVIEW_FACTOR = 8
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tile_cache")
+
+class LRUCache:
+    """ 容量固定的執行緒安全 LRU 快取 (最近最少使用的項目先淘汰) """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+class TileService:
+    """
+    建立在 generate_fractal 上的 tile 金字塔服務。
+    tile 內容為 n3 慣例的逃逸次數陣列：tile[i, j]，i 沿實軸向右、j 沿虛軸向上。
+    ty 則和網路地圖一樣由上往下編號 (ty = 0 是最上方一列)。
+    """
+    def __init__(self, cache_dir=CACHE_DIR, memory_tiles=512, tile_px=TILE_PX,
+                 mode='fast', render_threads=2):
+        self.cache_dir = cache_dir
+        self.tile_px = tile_px
+        self.mode = mode
+        self.memory = LRUCache(memory_tiles)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(render_threads)
+        self._luts = {}
+
+    # --- 座標換算 ---
+
+    def tile_bounds(self, zoom, tx, ty):
+        """ 回傳 tile 的 (xmin, xmax, ymin, ymax) """
+        xmin, xmax, ymin, ymax = WORLD
+        n = 2 ** zoom
+        if not (0 <= tx < n and 0 <= ty < n):
+            raise ValueError(f"tile ({tx}, {ty}) 超出第 {zoom} 層的範圍")
+        w = (xmax - xmin) / n
+        h = (ymax - ymin) / n
+        return (xmin + tx * w, xmin + (tx + 1) * w,
+                ymax - (ty + 1) * h, ymax - ty * h)
+
+    def render(self, zoom, tx, ty, max_iter, px):
+        """ 以 px x px 的解析度計算一塊 tile (取像素中心點，相鄰 tile 不會重疊) """
+        xmin, xmax, ymin, ymax = self.tile_bounds(zoom, tx, ty)
+        hx = (xmax - xmin) / px / 2
+        hy = (ymax - ymin) / px / 2
+        _, _, n3 = generate_fractal(xmin + hx, xmax - hx, ymin + hy, ymax - hy,
+                                    px, px, max_iter, mode=self.mode, verbose=False)
+        return n3.astype(np.uint32)
+
+    # --- 快取 ---
+
+    def _key(self, zoom, tx, ty, max_iter):
+        # 不同 mode 的結果可能不同 (trace 會把週期軌道填成 max_iter)，共用 cache_dir 時不能混用
+        return (self.mode, zoom, tx, ty, max_iter)
+
+    def _disk_path(self, key):
+        mode, zoom, tx, ty, max_iter = key
+        return os.path.join(self.cache_dir, mode, str(max_iter), str(zoom), f"{tx}_{ty}.npy")
+
+    def cached(self, zoom, tx, ty, max_iter):
+        """ 依序查記憶體、硬碟快取，找不到回傳 None """
+        key = self._key(zoom, tx, ty, max_iter)
+        tile = self.memory.get(key)
+        if tile is not None:
+            return tile
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            tile = np.load(path)
+            self.memory.put(key, tile)
+            return tile
+        return None
+
+    def _store(self, key, tile):
+        self.memory.put(key, tile)
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先寫到暫存檔再改名，避免其他執行緒讀到寫一半的檔案
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, tile)
+        os.replace(tmp, path)
+
+    # --- 取得 tile ---
+
+    def get_tile(self, zoom, tx, ty, max_iter):
+        """ 取得完整解析度的 tile (必要時同步計算) """
+        tile = self.cached(zoom, tx, ty, max_iter)
+        if tile is None:
+            tile = self.schedule(zoom, tx, ty, max_iter).result()
+        return tile
+
+    def schedule(self, zoom, tx, ty, max_iter):
+        """ 在背景計算完整解析度的 tile；同一塊 tile 同時只會計算一次 """
+        key = self._key(zoom, tx, ty, max_iter)
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._render_and_store, key)
+                self._pending[key] = future
+            return future
+
+    def _render_and_store(self, key):
+        try:
+            tile = self.render(*key[1:], self.tile_px)
+            self._store(key, tile)
+            return tile
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+
+    def preview(self, zoom, tx, ty, max_iter):
+        """
+        快速預覽：若上一層的母 tile 已有快取，直接取它的 1/4 放大兩倍；
+        否則以 1/PREVIEW_FACTOR 的解析度計算後放大。
+        放大以索引對應 (最近鄰) 完成，px 不必是 2 或 PREVIEW_FACTOR 的倍數，結果一定是 px x px。
+        """
+        px = self.tile_px
+        pixels = np.arange(px)
+        if zoom > 0:
+            parent = self.cached(zoom - 1, tx // 2, ty // 2, max_iter)
+            if parent is not None:
+                # 子 tile 的第 i 個像素中心落在母 tile 的 ((tx % 2) * px + i) // 2；ty 由上往下，j 由下往上
+                rows = ((tx % 2) * px + pixels) // 2
+                cols = ((1 - ty % 2) * px + pixels) // 2
+                return parent[np.ix_(rows, cols)]
+        low = self.render(zoom, tx, ty, max_iter, max(px // PREVIEW_FACTOR, 1))
+        idx = pixels * low.shape[0] // px
+        return low[np.ix_(idx, idx)]
+
+    def get_progressive(self, zoom, tx, ty, max_iter):
+        """
+        漸進式取得：已有快取就回傳 (tile, True)；
+        否則排程完整計算，並立即回傳 (預覽, False)。
+        """
+        tile = self.cached(zoom, tx, ty, max_iter)
+        if tile is not None:
+            return tile, True
+        self.schedule(zoom, tx, ty, max_iter)
+        return self.preview(zoom, tx, ty, max_iter), False
+
+    def iter_tile(self, zoom, tx, ty, max_iter):
+        """ 產生器版本：先 yield 預覽，再 yield 完整解析度的 tile """
+        tile, final = self.get_progressive(zoom, tx, ty, max_iter)
+        yield tile
+        if not final:
+            yield self.get_tile(zoom, tx, ty, max_iter)
+
+    def to_png(self, tile, max_iter):
+        lut = self._luts.get(max_iter)
+        if lut is None:
+            lut = self._luts[max_iter] = build_lut(max_iter)
+        return encode_png(colorize(tile, lut))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# --- HTTP 前端 ---
+
+TILE_URL = re.compile(r"^/tile/(\d+)/(\d+)/(\d+)/(\d+)\.(png|npy)$")
+
+INDEX_HTML = """<!doctype html>
+<meta charset="utf-8">
+<title>Mandelbrot Tiles</title>
+<h1>Mandelbrot Tile Server</h1>
+<p>GET /tile/{max_iter}/{zoom}/{tx}/{ty}.png 或 .npy；加上 ?progressive=1 會先回傳預覽
+(回應標頭 X-Tile-Final: 0)，稍後再請求即可取得完整解析度。</p>
+<img src="/tile/256/0/0/0.png">
+"""
+
+class TileHandler(BaseHTTPRequestHandler):
+    """ 處理 tile 請求，service 由 make_server 掛在 server 物件上 """
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path in ("/", "/index.html"):
+            self._send(200, "text/html; charset=utf-8", INDEX_HTML.encode("utf-8"))
+            return
+
+        m = TILE_URL.match(path)
+        if not m:
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+            return
+        max_iter, zoom, tx, ty = map(int, m.groups()[:4])
+        fmt = m.group(5)
+        service = self.server.service
+        try:
+            if "progressive=1" in query.split("&"):
+                tile, final = service.get_progressive(zoom, tx, ty, max_iter)
+            else:
+                tile, final = service.get_tile(zoom, tx, ty, max_iter), True
+        except ValueError as e:
+            self._send(404, "text/plain; charset=utf-8", str(e).encode("utf-8"))
+            return
+
+        if fmt == "png":
+            body, ctype = service.to_png(tile, max_iter), "image/png"
+        else:
+            buf = io.BytesIO()
+            np.save(buf, tile)
+            body, ctype = buf.getvalue(), "application/octet-stream"
+        headers = {"X-Tile-Final": "1" if final else "0",
+                   "Cache-Control": "max-age=86400" if final else "no-store"}
+        self._send(200, ctype, body, headers)
+
+    def _send(self, status, ctype, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 不在終端機印出每一個請求
+
+def make_server(service, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), TileHandler)
+    server.service = service
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mandelbrot tile server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--mode", default="fast", choices=["basic", "fast", "trace"])
+    args = parser.parse_args()
+
+    service = TileService(cache_dir=args.cache_dir, mode=args.mode)
+    server = make_server(service, args.host, args.port)
+    print(f"Tile 伺服器已啟動：http://{args.host}:{args.port}/ (Ctrl+C 結束)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
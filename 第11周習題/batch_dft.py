@@ -0,0 +1,119 @@
+"""
+第 11 週習題 (延伸) : 批次 DFT (Batched DFT)
+情境：大量長度相同的短訊號 (frame)。week11.dft 每次呼叫都要對每個 (k, n) 重算 cmath.exp，
+這裡改成：
+1. DFT 矩陣只算一次，放進有上限的 LRU 快取 (以 N 與方向為 key)
+2. 一個 2-D 陣列 (每列一個 frame) 用一次矩陣乘法轉換完
+3. 實數輸入可只輸出一半頻譜 (rfft 形式，k = 0..N/2)，計算量與記憶體都減半
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# 最多快取幾個 DFT 矩陣 (N x N 個複數，N 很大時請改用 fft.py)
+MATRIX_CACHE_SIZE = 16
+
+def _angles(N, K):
+    """ 2*pi*k*n/N，k < K、n < N；k*n 先對 N 取餘數以保持精度 """
+    k = np.arange(K)
+    n = np.arange(N)
+    return 2 * np.pi * (np.outer(n, k) % N) / N
+
+@lru_cache(maxsize=MATRIX_CACHE_SIZE)
+def dft_matrix(N, inverse=False):
+    """
+    M[n, k] = e^(-/+ i * 2*pi * k * n / N)，使 X = x @ M (x 的每一列是一個 frame)。
+    inverse=True 時指數為正 (尚未除以 N)。矩陣唯讀，避免快取內容被意外修改。
+    """
+    sign = 1 if inverse else -1
+    M = np.exp(sign * 1j * _angles(N, N))
+    M.flags.writeable = False
+    return M
+
+@lru_cache(maxsize=MATRIX_CACHE_SIZE)
+def rdft_matrix(N):
+    """
+    實數輸入的半頻譜矩陣：[cos | -sin]，形狀 (N, 2K)，K = N//2 + 1。
+    實數 frame 乘上它一次得到實部與虛部，全程只做實數乘法。
+    """
+    theta = _angles(N, N // 2 + 1)
+    M = np.concatenate([np.cos(theta), -np.sin(theta)], axis=1)
+    M.flags.writeable = False
+    return M
+
+@lru_cache(maxsize=MATRIX_CACHE_SIZE)
+def irdft_matrix(N):
+    """
+    半頻譜還原實數訊號的矩陣，形狀 (2K, N)：
+    x[n] = (1/N) * sum_k w_k * (Re X_k cos - Im X_k sin)，
+    w_0 = 1、N 為偶數時 w_(N/2) = 1，其餘 w_k = 2 (補上沒有存下來的共軛那一半)。
+    """
+    K = N // 2 + 1
+    theta = _angles(N, K).T  # (K, N)
+    w = np.full(K, 2.0)
+    w[0] = 1.0
+    if N % 2 == 0:
+        w[-1] = 1.0
+    M = np.concatenate([w[:, None] * np.cos(theta), -w[:, None] * np.sin(theta)], axis=0) / N
+    M.flags.writeable = False
+    return M
+
+def _as_frames(frames):
+    frames = np.asarray(frames)
+    if frames.ndim != 2:
+        raise ValueError("frames 必須是 2-D 陣列 (每一列是一個 frame)")
+    return frames
+
+def dft_batch(frames):
+    """ 每一列各自做 DFT：X[f, k] = sum_n x[f, n] * e^(-i * 2*pi * k * n / N) """
+    frames = _as_frames(frames)
+    return frames @ dft_matrix(frames.shape[1])
+
+def idft_batch(spectra):
+    """ 每一列各自做 IDFT (除以 N 正規化) """
+    spectra = _as_frames(spectra)
+    N = spectra.shape[1]
+    return spectra @ dft_matrix(N, inverse=True) / N
+
+def rdft_batch(frames):
+    """
+    實數 frame 的半頻譜 DFT (與 numpy.fft.rfft 相同格式)：
+    輸出形狀 (F, N//2 + 1)，其餘頻率可由共軛對稱 X[N-k] = conj(X[k]) 得到。
+    """
+    frames = _as_frames(frames).astype(np.float64, copy=False)
+    N = frames.shape[1]
+    K = N // 2 + 1
+    out = frames @ rdft_matrix(N)
+    return out[:, :K] + 1j * out[:, K:]
+
+def irdft_batch(half_spectra, N):
+    """ rdft_batch 的逆轉換，需要告知原始長度 N (因為 N 與 N+1 的半頻譜長度可能相同) """
+    half_spectra = _as_frames(half_spectra)
+    if half_spectra.shape[1] != N // 2 + 1:
+        raise ValueError(f"半頻譜長度應為 {N // 2 + 1}")
+    stacked = np.concatenate([half_spectra.real, half_spectra.imag], axis=1)
+    return stacked @ irdft_matrix(N)
+
+if __name__ == "__main__":
+    from week11 import dft, verify_signal
+
+    rng = np.random.default_rng(0)
+    frames = rng.standard_normal((1000, 64))
+    print(f"批次轉換 {frames.shape[0]} 個長度 {frames.shape[1]} 的 frame")
+
+    X = dft_batch(frames)
+    print("第 0 個 frame 與 week11.dft 比較:", end=" ")
+    ok1 = verify_signal(dft(frames[0].tolist()), X[0].tolist())
+
+    print("批次 IDFT 還原 (全部 frame):", end=" ")
+    ok2 = verify_signal(frames.ravel().tolist(), idft_batch(X).ravel().tolist())
+
+    H = rdft_batch(frames)
+    print("半頻譜與完整頻譜前半段比較:", end=" ")
+    ok3 = verify_signal(X[:, :H.shape[1]].ravel().tolist(), H.ravel().tolist())
+
+    print("半頻譜還原實數訊號:", end=" ")
+    ok4 = verify_signal(frames.ravel().tolist(), irdft_batch(H, frames.shape[1]).ravel().tolist())
+
+    print("\n✅ 驗證成功" if ok1 and ok2 and ok3 and ok4 else "\n❌ 驗證失敗")
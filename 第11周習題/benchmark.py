@@ -0,0 +1,101 @@
+"""
+第 11 週習題 : 傅立葉轉換 - 效能比較 (Benchmark)
+目標：比較 O(N^2) 的 dft 與 O(N log N) 的 fft，找出兩者的交叉點。
+執行：python benchmark.py
+"""
+
+import random
+import time
+
+import numpy as np
+
+from week11 import dft
+from fft import fft
+from batch_dft import dft_batch, rdft_batch
+from convolution import convolve, convolve_direct, poly_mul
+
+def timed(func, *args, repeat=3):
+    """ 取 repeat 次中最快的一次 (秒) """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_dft_vs_fft(sizes=(2, 4, 8, 16, 32, 64, 97, 128, 256, 360, 512, 1024, 2048)):
+    """
+    1. 各長度下 dft 與 fft 的耗時，以及 fft 第一次勝出的長度 (交叉點)
+    """
+    print("=== 1. dft (O(N^2)) vs fft (O(N log N)) ===")
+    print(f"{'N':>6} {'dft (ms)':>12} {'fft (ms)':>12} {'加速':>8}")
+    crossover = None
+    for N in sizes:
+        x = [random.random() for _ in range(N)]
+        t_dft = timed(dft, x, repeat=1 if N >= 1024 else 3)
+        t_fft = timed(fft, x)
+        if crossover is None and t_fft < t_dft:
+            crossover = N
+        print(f"{N:>6} {t_dft * 1e3:>12.3f} {t_fft * 1e3:>12.3f} {t_dft / t_fft:>7.1f}x")
+    print(f"交叉點：N >= {crossover} 時 fft 比 dft 快\n")
+    return crossover
+
+def bench_large_fft(sizes=(65536, 65537, 3 ** 10, 100000)):
+    """
+    2. 大長度 (2 的次方 / 質數 / 3 的次方 / 合成數) 的 fft 耗時，並估算 dft 需要的時間
+    """
+    print("=== 2. 大長度 fft ===")
+    # 以 N = 1024 的 dft 實測時間外推 O(N^2)
+    t_ref = timed(dft, [random.random() for _ in range(1024)], repeat=1)
+    for N in sizes:
+        x = [random.random() for _ in range(N)]
+        t_fft = timed(fft, x)
+        est = t_ref * (N / 1024) ** 2
+        print(f"N = {N:>6}: fft {t_fft * 1e3:8.1f} ms，dft 估計約 {est / 60:.0f} 分鐘")
+    print()
+
+def bench_batch(frames=5000, N=128, dft_sample=50):
+    """
+    3. 大量短 frame：逐一呼叫 dft / fft vs 一次矩陣乘法 (dft_batch / rdft_batch)
+    dft 太慢，只實測 dft_sample 個 frame 再按比例換算。
+    """
+    print(f"=== 3. 批次轉換 {frames} 個長度 {N} 的 frame ===")
+    data = np.random.default_rng(0).standard_normal((frames, N))
+    rows = data.tolist()
+
+    t_dft = timed(lambda: [dft(r) for r in rows[:dft_sample]], repeat=1) * frames / dft_sample
+    t_fft = timed(lambda: [fft(r) for r in rows], repeat=1)
+    dft_batch(data[:1]), rdft_batch(data[:1])  # 先建好快取的矩陣
+    t_batch = timed(dft_batch, data)
+    t_rbatch = timed(rdft_batch, data)
+    print(f"逐一 dft (估計): {t_dft:8.3f} 秒")
+    print(f"逐一 fft       : {t_fft:8.3f} 秒")
+    print(f"dft_batch      : {t_batch:8.3f} 秒 (比逐一 dft 快 {t_dft / t_batch:.0f} 倍)")
+    print(f"rdft_batch     : {t_rbatch:8.3f} 秒 (半頻譜，比 dft_batch 快 {t_batch / t_rbatch:.1f} 倍)\n")
+
+def bench_convolution(degree=100000, short=8192):
+    """
+    4. 摺積：兩個 degree 次多項式相乘 (direct vs fft)，以及長訊號配短濾波器 (direct vs overlap-save)
+    """
+    print("=== 4. 摺積與多項式乘法 ===")
+    rng = np.random.default_rng(0)
+    p = rng.integers(-100, 100, degree + 1).tolist()
+    q = rng.integers(-100, 100, degree + 1).tolist()
+    t_direct = timed(convolve_direct, p, q, repeat=1)
+    t_fft = timed(poly_mul, p, q, repeat=1)
+    print(f"{degree} 次多項式相乘: direct {t_direct:.3f} 秒, fft {t_fft:.3f} 秒 (快 {t_direct / t_fft:.0f} 倍)")
+
+    x = rng.standard_normal(1 << 20)
+    h = rng.standard_normal(short)
+    t_direct = timed(convolve_direct, x, h)
+    t_os = timed(convolve, x, h, "overlap-save")
+    t_fft = timed(convolve, x, h, "fft")
+    print(f"長度 {len(x)} 訊號 * 長度 {short} 濾波器: direct {t_direct:.3f} 秒, "
+          f"overlap-save {t_os:.3f} 秒, fft {t_fft:.3f} 秒\n")
+
+if __name__ == "__main__":
+    random.seed(0)
+    bench_dft_vs_fft()
+    bench_large_fft()
+    bench_batch()
+    bench_convolution()
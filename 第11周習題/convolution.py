@@ -0,0 +1,167 @@
+"""
+第 11 週習題 (延伸) : 快速摺積 (Convolution) 與多項式乘法
+摺積定理：時域的摺積 = 頻域的逐點相乘，(a * b) = IDFT(DFT(a) . DFT(b))。
+依輸入長度自動選擇：
+1. direct：其中一邊夠短時，直接 O(n*m) 計算反而最快
+2. fft：兩邊都很長時，補零後用 fft.py 的 FFT 計算，O(N log N)
+3. overlap-save：一長一短 (例如長訊號配短濾波器) 時分段做 FFT，只需要短邊大小的 FFT
+多項式乘法 poly_mul 沿用習題 4 (No4.py) 的慣例：c[i] 代表 x^i 的係數。
+"""
+
+import numpy as np
+
+from fft import fft_array, fft_radix2, ifft_array, ifft_radix2
+
+# 較短一邊不超過此長度時用 direct (np.convolve 是 C 迴圈，本機實測交叉點約在 4096)
+DIRECT_MAX = 4096
+# 長短比例超過此值時用 overlap-save
+OVERLAP_SAVE_RATIO = 8
+# 整數係數的 poly_mul：max|p| * max|q| * min(長度) 不小於此值時改用精確的整數摺積
+INT_EXACT_BOUND = 2 ** 52
+
+def _next_pow2(n):
+    return 1 << max(n - 1, 0).bit_length()
+
+def _as_array(a):
+    a = np.asarray(a)
+    if a.dtype.kind not in "iufc":
+        a = a.astype(np.complex128)
+    return a
+
+def _finish(result, a, b):
+    """ 兩邊都是實數時丟掉 FFT 留下的極小虛部 """
+    if a.dtype.kind != "c" and b.dtype.kind != "c":
+        return result.real
+    return result
+
+def convolve_direct(a, b):
+    """ 直接摺積 y[n] = sum_k a[k] b[n-k]，O(n*m) """
+    return np.convolve(_as_array(a), _as_array(b))
+
+def convolve_fft(a, b):
+    """ 補零到 2 的次方長度後，以 FFT 逐點相乘再逆轉換，O(N log N) """
+    a, b = _as_array(a), _as_array(b)
+    L = len(a) + len(b) - 1
+    N = _next_pow2(L)
+    A = fft_array(np.concatenate([a, np.zeros(N - len(a))]))
+    B = fft_array(np.concatenate([b, np.zeros(N - len(b))]))
+    return _finish(ifft_array(A * B)[:L], a, b)
+
+def convolve_overlap_save(x, h, block=None):
+    """
+    Overlap-save：x 是長訊號，h 是短濾波器 (長度 M)。
+    每次取 x 的 N 個樣本 (與前一段重疊 M-1 個)，做長度 N 的循環摺積，
+    前 M-1 個結果受循環折返影響而丟掉，保留後面 N-M+1 個。
+    """
+    x, h = _as_array(x), _as_array(h)
+    M = len(h)
+    L = len(x) + M - 1
+    N = block or _next_pow2(4 * M)
+    if N < M or N & (N - 1):
+        raise ValueError("block 必須是 2 的次方且不小於濾波器長度")
+    step = N - M + 1
+    H = fft_array(np.concatenate([h, np.zeros(N - M)]))
+
+    # 前面補 M-1 個 0，後面補到能湊滿最後一段
+    n_blocks = -(-L // step)
+    padded = np.zeros((n_blocks - 1) * step + N, dtype=np.result_type(x.dtype, np.float64))
+    padded[M - 1:M - 1 + len(x)] = x
+
+    # 所有分段排成 (n_blocks, N) 的 view，一次批次做 radix-2 FFT
+    segments = np.lib.stride_tricks.sliding_window_view(padded, N)[::step]
+    out = ifft_radix2(fft_radix2(segments) * H)[:, M - 1:]
+    return _finish(out.reshape(-1)[:L], x, h)
+
+def choose_method(n, m):
+    """ 依兩邊長度選擇 'direct' / 'overlap-save' / 'fft' """
+    short, long_ = min(n, m), max(n, m)
+    if short <= DIRECT_MAX:
+        return "direct"
+    if long_ >= OVERLAP_SAVE_RATIO * short:
+        return "overlap-save"
+    return "fft"
+
+def convolve(a, b, method="auto"):
+    """ 摺積，method='auto' 時依長度自動選擇演算法 """
+    a, b = _as_array(a), _as_array(b)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros(0)
+    if method == "auto":
+        method = choose_method(len(a), len(b))
+    if method == "direct":
+        return convolve_direct(a, b)
+    if method == "fft":
+        return convolve_fft(a, b)
+    if method == "overlap-save":
+        # 長的當訊號、短的當濾波器 (摺積可交換)
+        return convolve_overlap_save(a, b) if len(a) >= len(b) else convolve_overlap_save(b, a)
+    raise ValueError(f"未知的 method: {method}")
+
+def _convolve_exact_int(p, q):
+    """ 以 Python int (任意精度) 直接摺積，O(n*m)，給超出 float64 精確範圍的整數係數用 """
+    return np.convolve(np.array([int(c) for c in p], dtype=object),
+                       np.array([int(c) for c in q], dtype=object)).tolist()
+
+def poly_mul(p, q, method="auto"):
+    """
+    多項式乘法，係數慣例與 No4.py 相同：c[i] 代表 x^i 的係數 (c[0] 是常數項)。
+    例：(1 + x) * (1 - x) -> poly_mul([1, 1], [1, -1]) == [1, 0, -1]
+    兩邊都是整數係數時，結果四捨五入回整數。
+    float64 只能精確表示 2^53 以內的整數，所以 max|p| * max|q| * min(長度) 達到 2^52 時
+    (結果係數可能超出範圍，或 FFT 的誤差超過 0.5)，改用 Python int 的直接摺積，結果保證正確。
+    """
+    p, q = list(p), list(q)
+    if p and q and all(isinstance(c, (int, np.integer)) for c in p + q):
+        bound = max(abs(int(c)) for c in p) * max(abs(int(c)) for c in q) * min(len(p), len(q))
+        if bound >= INT_EXACT_BOUND:
+            return _convolve_exact_int(p, q)
+        return [int(round(v)) for v in np.real(convolve(p, q, method))]
+    return convolve(p, q, method).tolist()
+
+def poly_from_roots(roots, method="auto"):
+    """
+    由根建立多項式 prod (x - r)，兩兩分組相乘 (類似合併排序)，
+    高次時每一層都能用到 FFT，總成本 O(n log^2 n)。
+    """
+    factors = [[-r, 1] for r in roots] or [[1]]
+    while len(factors) > 1:
+        paired = [poly_mul(factors[i], factors[i + 1], method) for i in range(0, len(factors) - 1, 2)]
+        if len(factors) % 2:
+            paired.append(factors[-1])
+        factors = paired
+    return factors[0]
+
+if __name__ == "__main__":
+    import cmath
+    import random
+    from week11 import verify_signal
+
+    print("--- 多項式乘法 (c[i] 代表 x^i) ---")
+    print(f"(1 + x)(1 - x) = {poly_mul([1, 1], [1, -1])}")
+    print(f"(1 + 2x + 3x^2)(4 + 5x) = {poly_mul([1, 2, 3], [4, 5])}")
+
+    # No4.py 的測試案例 x^5 - 1 = 0：由 5 個單位根重建，應得到 c = [-1, 0, 0, 0, 0, 1]
+    unity_roots = [cmath.exp(2j * cmath.pi * k / 5) for k in range(5)]
+    rebuilt = poly_from_roots(unity_roots)
+    print(f"由 x^5 - 1 的根重建: {[round(v.real, 4) for v in rebuilt]}")
+
+    print("\n--- 三種演算法結果一致 ---")
+    random.seed(0)
+    a = [random.uniform(-1, 1) for _ in range(5000)]
+    b = [random.uniform(-1, 1) for _ in range(300)]
+    ref = convolve_direct(a, b).tolist()
+    ok = True
+    for method in ("fft", "overlap-save"):
+        print(f"{method}:", end=" ")
+        ok &= verify_signal(ref, convolve(a, b, method).tolist())
+    print(f"auto 選擇: {choose_method(len(a), len(b))}")
+
+    print("\n--- 大整數係數 (超出 float64 的精確範圍) ---")
+    big_p = [random.randint(-2 ** 40, 2 ** 40) for _ in range(50)]
+    big_q = [random.randint(-2 ** 40, 2 ** 40) for _ in range(30)]
+    exact = [sum(big_p[k] * big_q[n - k] for k in range(max(0, n - len(big_q) + 1), min(n, len(big_p) - 1) + 1))
+             for n in range(len(big_p) + len(big_q) - 1)]
+    same = poly_mul(big_p, big_q) == exact
+    ok &= same
+    print(f"係數到 2^40、結果到約 2^85: {'與逐項整數乘法相同' if same else '不相同'}")
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
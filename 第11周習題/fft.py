@@ -0,0 +1,177 @@
+"""
+第 11 週習題 (延伸) : 快速傅立葉轉換 (FFT)
+week11.py 的 dft / idft 是 O(N^2) 的雙重迴圈，這裡提供 O(N log N) 的版本：
+1. N 為 2 的次方：迭代式 radix-2 Cooley-Tukey (位元反轉 + 逐層蝴蝶運算)
+2. N 為合成數：mixed-radix，每次拆出最小質因數 p，遞迴處理 N/p
+3. N 為質數 (或含有很大的質因數)：Bluestein (chirp-z) 轉成 2 的次方長度的摺積
+旋轉因子 (twiddle factor) 等表格依 N 快取，重複轉換同樣長度時不必重算。
+fft(x) / ifft(X) 與 dft(x) / idft(X) 的輸入輸出格式相同 (list -> list)。
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# 質因數不超過此值時用 mixed-radix 拆解，否則整段改用 Bluestein
+MAX_RADIX = 64
+# 長度不超過此值時直接用 DFT 矩陣 (小矩陣乘法比遞迴快)
+DIRECT_SIZE = 16
+
+# --- 快取的表格 ---
+
+def _readonly(a):
+    a.flags.writeable = False
+    return a
+
+@lru_cache(maxsize=64)
+def twiddles(N):
+    """ W_N^k = e^(-2*pi*i*k/N), k = 0..N-1 """
+    return _readonly(np.exp(-2j * np.pi * np.arange(N) / N))
+
+@lru_cache(maxsize=64)
+def bit_reverse_indices(N):
+    """ 長度 N (2 的次方) 的位元反轉排列 """
+    bits = N.bit_length() - 1
+    idx = np.arange(N)
+    rev = np.zeros(N, dtype=np.intp)
+    for _ in range(bits):
+        rev = (rev << 1) | (idx & 1)
+        idx >>= 1
+    return _readonly(rev)
+
+@lru_cache(maxsize=64)
+def dft_matrix(N):
+    """ 小長度直接使用的 DFT 矩陣 M[k, n] = W_N^(kn) """
+    k = np.arange(N)
+    return _readonly(twiddles(N)[np.outer(k, k) % N])
+
+@lru_cache(maxsize=64)
+def _bluestein_tables(N):
+    """ Bluestein 需要的 chirp w_n 與摺積核的頻譜 (依 N 快取) """
+    n = np.arange(N)
+    # n^2 先對 2N 取餘數，避免 n 很大時角度失去精度
+    chirp = np.exp(-1j * np.pi * ((n * n) % (2 * N)) / N)
+    M = 1 << (2 * N - 2).bit_length()
+    kernel = np.zeros(M, dtype=np.complex128)
+    kernel[:N] = np.conj(chirp)
+    kernel[M - N + 1:] = np.conj(chirp[1:])[::-1]
+    return _readonly(chirp), _readonly(fft_radix2(kernel))
+
+@lru_cache(maxsize=256)
+def smallest_prime_factor(N):
+    for p in range(2, math.isqrt(N) + 1):
+        if N % p == 0:
+            return p
+    return N
+
+# --- 三種演算法 ---
+
+def fft_radix2(x):
+    """
+    迭代式 radix-2：先依位元反轉重排，再由長度 2 的蝴蝶開始逐層合併。
+    每一層都是一次向量化運算：X = [a + w*b, a - w*b]。
+    x 可以是多維陣列，沿最後一軸轉換 (一次轉換多個長度相同的訊號)。
+    """
+    x = np.asarray(x, dtype=np.complex128)
+    shape = x.shape
+    N = shape[-1]
+    x = x[..., bit_reverse_indices(N)]
+    W = twiddles(N)
+    m = 2
+    while m <= N:
+        half = m // 2
+        w = W[::N // m][:half]
+        x = x.reshape(*shape[:-1], -1, m)
+        a = x[..., :half]
+        b = x[..., half:] * w
+        x = np.concatenate([a + b, a - b], axis=-1)
+        m *= 2
+    return x.reshape(shape)
+
+def fft_mixed_radix(x):
+    """
+    mixed-radix Cooley-Tukey：N = p * M (p 為最小質因數)。
+    把 x 依 n mod p 分成 p 條長度 M 的子序列 x_r[m] = x[m*p + r]，各自轉換得到 Y_r，
+    再合併：X[k] = sum_r W_N^(r*k) * Y_r[k mod M]。
+    """
+    N = len(x)
+    p = smallest_prime_factor(N)
+    M = N // p
+    Y = np.stack([_fft(x[r::p]) for r in range(p)])  # (p, M)
+    k = np.arange(N)
+    W = twiddles(N)[np.outer(np.arange(p), k) % N]   # (p, N)
+    return (W * Y[:, k % M]).sum(axis=0)
+
+def fft_bluestein(x):
+    """
+    Bluestein (chirp-z)：利用 kn = (k^2 + n^2 - (k-n)^2) / 2，
+    X[k] = w_k * sum_n (x_n w_n) * conj(w_(k-n))，其中 w_n = e^(-pi*i*n^2/N)。
+    後面的求和是摺積，補零到 2 的次方後用 radix-2 FFT 計算，適用任意 N (包含質數)。
+    """
+    N = len(x)
+    chirp, kernel_hat = _bluestein_tables(N)
+    M = len(kernel_hat)
+    a = np.zeros(M, dtype=np.complex128)
+    a[:N] = np.asarray(x, dtype=np.complex128) * chirp
+    conv = ifft_radix2(fft_radix2(a) * kernel_hat)
+    return chirp * conv[:N]
+
+def ifft_radix2(X):
+    """ 利用 ifft(X) = conj(fft(conj(X))) / N (同樣沿最後一軸) """
+    return np.conj(fft_radix2(np.conj(X))) / np.shape(X)[-1]
+
+def _fft(x):
+    """ 依長度選擇演算法 (x 為 NumPy 陣列) """
+    N = len(x)
+    if N <= 1:
+        return np.array(x, dtype=np.complex128)
+    if N & (N - 1) == 0:
+        return fft_radix2(x)
+    if N <= DIRECT_SIZE:
+        return dft_matrix(N) @ np.asarray(x, dtype=np.complex128)
+    p = smallest_prime_factor(N)
+    if p == N or p > MAX_RADIX:
+        return fft_bluestein(x)
+    return fft_mixed_radix(x)
+
+# --- 對外介面 ---
+
+def fft_array(x):
+    """ 快速傅立葉轉換 (NumPy 陣列版) """
+    return _fft(np.asarray(x, dtype=np.complex128))
+
+def ifft_array(X):
+    """ 逆快速傅立葉轉換 (NumPy 陣列版)，同樣除以 N 正規化 """
+    X = np.asarray(X, dtype=np.complex128)
+    if len(X) == 0:
+        return X
+    return np.conj(_fft(np.conj(X))) / len(X)
+
+def fft(x):
+    """
+    快速傅立葉轉換，輸入輸出與 week11.dft 相同：
+    X[k] = sum_{n=0}^{N-1} x[n] * e^(-i * 2*pi * k * n / N)
+    """
+    return fft_array(x).tolist()
+
+def ifft(X):
+    """
+    逆快速傅立葉轉換，輸入輸出與 week11.idft 相同：
+    x[n] = (1/N) * sum_{k=0}^{N-1} X[k] * e^(i * 2*pi * k * n / N)
+    """
+    return ifft_array(X).tolist()
+
+if __name__ == "__main__":
+    from week11 import dft, verify_signal
+
+    # 涵蓋三種演算法：2 的次方、合成數、質數
+    for N in (8, 12, 97, 256, 360):
+        f = [math.sin(0.3 * n) + 0.5 * math.cos(1.7 * n) for n in range(N)]
+        F = fft(f)
+        print(f"N = {N}")
+        print("  與 O(N^2) dft 比較:", end=" ")
+        ok_dft = verify_signal(dft(f), F)
+        print("  fft -> ifft 還原:", end=" ")
+        ok_inv = verify_signal(f, ifft(F))
+        print("  ✅ 通過" if ok_dft and ok_inv else "  ❌ 失敗")
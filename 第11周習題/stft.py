@@ -0,0 +1,172 @@
+"""
+第 11 週習題 (延伸) : 串流短時傅立葉轉換 (STFT) 與滑動 DFT
+week11.py 只能處理整段放在記憶體裡的 list；感測器資料則是源源不絕的串流。
+1. stft()：從迭代器讀取樣本，加窗後每 hop 個樣本產生一個頻譜 (generator，記憶體固定)
+2. istft()：重疊相加 (overlap-add) 還原，逆轉換沿用 idft(X) 的介面 (list -> list)
+3. SlidingDFT：只追蹤少數幾個頻率時，每來一個樣本以 O(1) 更新每個 bin
+"""
+
+import cmath
+import math
+from collections import deque
+
+import numpy as np
+
+from fft import fft, ifft
+
+def hann(N):
+    """ 週期型 Hann 窗：w[n] = 0.5 - 0.5 cos(2*pi*n/N) """
+    return [0.5 - 0.5 * math.cos(2 * math.pi * n / N) for n in range(N)]
+
+def _check_nola(window, hop):
+    """
+    重疊相加可還原的條件 (NOLA, nonzero overlap-add)：每個位置疊上來的窗函數平方和都不為 0，
+    即 sum_k w[n + k*hop]^2 > 0 (n = 0..hop-1)。例如 Hann 窗的 w[0] = 0，hop == frame_size 時不成立。
+    """
+    for n in range(hop):
+        if sum(w * w for w in window[n::hop]) <= 1e-12:
+            raise ValueError(f"window 與 hop = {hop} 不滿足 NOLA 條件 (第 {n} 個位置的窗函數平方和為 0)，無法還原")
+
+def stft(samples, frame_size, hop, window=None, transform=fft, pad=True):
+    """
+    串流 STFT：samples 可以是任何迭代器 (例如從感測器或檔案逐筆讀取)。
+    每湊滿一個 frame 就 yield 一次頻譜，之後每 hop 個新樣本再 yield 一次；
+    內部只保留最近 frame_size 個樣本。
+    transform 需符合 dft(x) 的介面 (預設使用 fft.fft)。
+    pad=True 時開頭補 frame_size - hop 個 0、尾端補 0 直到最後的樣本被完整覆蓋，
+    讓頭尾的樣本也能被完整還原 (搭配 istft(pad=True))。
+    只做分析時 hop 可以等於 frame_size；要以 istft 還原時 window 與 hop 必須滿足 NOLA 條件 (見 _check_nola)。
+    """
+    if not 0 < hop <= frame_size:
+        raise ValueError("hop 必須介於 1 與 frame_size 之間")
+    window = hann(frame_size) if window is None else list(window)
+    if len(window) != frame_size:
+        raise ValueError("window 長度必須等於 frame_size")
+
+    edge = frame_size - hop if pad else 0
+    buf = deque([0.0] * edge, maxlen=frame_size)
+    since_last = hop - (frame_size - edge)  # 湊滿第一個 frame 時剛好等於 hop
+
+    def frames_from(stream):
+        nonlocal since_last
+        for s in stream:
+            buf.append(s)
+            since_last += 1
+            if len(buf) == frame_size and since_last >= hop:
+                since_last = 0
+                yield transform([w * v for w, v in zip(window, buf)])
+
+    yield from frames_from(samples)
+    if pad:
+        # 尾端補 0：先補滿最後一個不完整的 frame，再補 edge 個 0 讓尾端樣本被完整覆蓋
+        tail = (hop - since_last if since_last else 0) + edge
+        yield from frames_from([0.0] * tail)
+
+def istft(spectra, frame_size, hop, window=None, inverse=ifft, pad=True):
+    """
+    串流重疊相加 (weighted overlap-add) 還原：
+        x[n] = sum_f w[n - f*hop] * y_f[n - f*hop] / sum_f w[n - f*hop]^2
+    其中 y_f = inverse(X_f)，inverse 需符合 idft(X) 的介面 (預設使用 fft.ifft)。
+    每處理一個頻譜就 yield 已經確定的 hop 個樣本；pad 需與 stft 的設定一致。
+    window 與 hop 不滿足 NOLA 條件時 (例如 Hann 窗且 hop == frame_size) 有些樣本的分母為 0，拋出 ValueError。
+    """
+    if not 0 < hop <= frame_size:
+        raise ValueError("hop 必須介於 1 與 frame_size 之間")
+    window = hann(frame_size) if window is None else list(window)
+    if len(window) != frame_size:
+        raise ValueError("window 長度必須等於 frame_size")
+    _check_nola(window, hop)
+    acc = [0.0] * frame_size    # 尚未輸出的樣本累加值
+    norm = [0.0] * frame_size   # 對應的窗函數平方和
+    skip = frame_size - hop if pad else 0
+
+    def emit(count):
+        nonlocal skip
+        for n in range(count):
+            value = acc[n] / norm[n] if norm[n] > 1e-12 else 0.0
+            if skip:
+                skip -= 1
+            else:
+                yield value
+
+    for X in spectra:
+        y = inverse(X)
+        for n in range(frame_size):
+            acc[n] += window[n] * y[n].real
+            norm[n] += window[n] * window[n]
+        # 前 hop 個樣本之後不會再有 frame 疊上來，可以輸出
+        yield from emit(hop)
+        acc = acc[hop:] + [0.0] * hop
+        norm = norm[hop:] + [0.0] * hop
+    yield from emit(frame_size - hop)
+
+class SlidingDFT:
+    """
+    滑動 DFT：只追蹤指定的幾個頻率 bin，每來一個新樣本以 O(1) 更新：
+        X_k <- (X_k + x_new - r^N * x_old) * r * e^(i * 2*pi * k / N)
+    X_k 等於最近 N 個樣本 (由舊到新) 做 dft 後的第 k 個分量。
+    r = 1 為精確結果；長時間運行可設 r 略小於 1 (例如 0.99999) 抑制累積誤差。
+    """
+    def __init__(self, N, bins, r=1.0):
+        self.N = N
+        self.bins = list(bins)
+        self.r = r
+        self._rN = r ** N
+        self._twiddle = np.array([r * cmath.exp(2j * math.pi * k / N) for k in self.bins])
+        self.X = np.zeros(len(self.bins), dtype=np.complex128)
+        self._window = deque([0.0] * N, maxlen=N)
+
+    def update(self, sample):
+        """ 加入一個新樣本，回傳目前各 bin 的值 (順序與 bins 相同) """
+        old = self._window[0]
+        self._window.append(sample)
+        self.X = (self.X + sample - self._rN * old) * self._twiddle
+        return self.X
+
+    def process(self, samples):
+        """ 對串流中的每個樣本 yield 一次各 bin 的值 """
+        for s in samples:
+            yield self.update(s).copy()
+
+if __name__ == "__main__":
+    from week11 import dft, idft, verify_signal
+
+    # 模擬感測器串流：兩個頻率的正弦波 (用 generator，不會一次產生整段資料)
+    def sensor(n_samples):
+        for n in range(n_samples):
+            yield math.sin(2 * math.pi * 5 * n / 64) + 0.3 * math.sin(2 * math.pi * 12 * n / 64)
+
+    N, HOP, TOTAL = 64, 16, 1000
+    signal = list(sensor(TOTAL))
+
+    print(f"--- STFT (frame={N}, hop={HOP}) -> overlap-add 還原 ---")
+    spectra = stft(sensor(TOTAL), N, HOP)
+    recon = list(istft(spectra, N, HOP))
+    print(f"輸入 {TOTAL} 個樣本，還原 {len(recon)} 個樣本 (尾端為補 0 的部分)")
+    ok1 = verify_signal(signal, recon[:TOTAL])
+
+    print("\n--- 逆轉換改用 week11.idft (相同介面) ---")
+    recon2 = list(istft(stft(sensor(256), N, HOP), N, HOP, inverse=idft))
+    ok2 = verify_signal(signal[:256], recon2[:256])
+
+    print("\n--- 滑動 DFT (只追蹤 bin 5 與 12) ---")
+    sdft = SlidingDFT(N, bins=[5, 12])
+    for s in signal:
+        X = sdft.update(s)
+    full = dft(signal[-N:])
+    print(f"滑動 DFT: |X5| = {abs(X[0]):.4f}, |X12| = {abs(X[1]):.4f}")
+    print(f"完整 DFT: |X5| = {abs(full[5]):.4f}, |X12| = {abs(full[12]):.4f}")
+    ok3 = verify_signal([full[5], full[12]], list(X))
+
+    print("\n--- NOLA 條件：hop == frame_size ---")
+    try:
+        list(istft(stft(sensor(256), N, N), N, N))
+        ok4 = False
+    except ValueError as e:
+        print(f"Hann 窗: {e}")
+        ok4 = True
+    recon4 = list(istft(stft(sensor(256), N, N, window=[1.0] * N), N, N, window=[1.0] * N))
+    print("矩形窗 (不重疊也能還原):", end=" ")
+    ok4 &= verify_signal(signal[:256], recon4[:256])
+
+    print("\n✅ 驗證成功" if ok1 and ok2 and ok3 and ok4 else "\n❌ 驗證失敗")
@@ -0,0 +1,395 @@
+"""
+習題 9 (延伸) : 計算幾何演算法
+week3 只有 Point / Line / Triangle 等基本物件，處理大量資料時只能自己寫 O(n^2) 迴圈。
+1. 凸包：Andrew 單調鏈 (monotone chain)，排序後掃兩次，O(n log n)；
+   先以 Akl-Toussaint 前處理刪掉明顯在內部的點
+2. 最近點對：分治法，左右兩半遞迴後只檢查中線附近的帶狀區域，O(n log n)
+3. 點在多邊形內：預先把邊整理成陣列 (PolygonEdges)，之後整批點向量化判斷
+4. Delaunay 三角剖分：Bowyer-Watson 逐點插入，輸出 week3 的 Triangle
+   - 以一個「無窮遠點」構成的 ghost 三角形包住凸包外側，不需要巨大的外框三角形
+   - 插入順序依格子蛇形排列，相鄰兩點很近，找所在三角形只需走幾步
+"""
+
+import math
+
+import numpy as np
+
+from week3 import Point, Triangle
+from point_array import PointArray, Polygon
+
+def _coords(points):
+    """ Point 的 list 或 PointArray -> (x 陣列, y 陣列) """
+    if isinstance(points, PointArray):
+        return points.x, points.y
+    points = list(points)
+    return (np.array([p.x for p in points], dtype=np.float64),
+            np.array([p.y for p in points], dtype=np.float64))
+
+def _cross(ox, oy, ax, ay, bx, by):
+    """ (A - O) x (B - O)，> 0 表示 O -> A -> B 逆時針 """
+    return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
+
+# --- 1. 凸包 ---
+
+def _interior_filter(xs, ys):
+    """
+    Akl-Toussaint 前處理：8 個方向的極值點 (左、左下、下、右下、右、右上、上、左上) 依逆時針圍成凸多邊形，
+    嚴格在它內部的點不可能是凸包頂點，先用向量化運算刪掉，只留下靠近外圍的少數點給單調鏈處理。
+    """
+    s, d = xs + ys, xs - ys
+    extremes = [xs.argmin(), s.argmin(), ys.argmin(), d.argmax(), xs.argmax(), s.argmax(), ys.argmax(), d.argmin()]
+    ring = []
+    for i in extremes:
+        p = (xs[i], ys[i])
+        if p not in ring:
+            ring.append(p)
+    if len(ring) < 3:
+        return xs, ys
+    inside = np.ones(len(xs), dtype=bool)
+    for (ax, ay), (bx, by) in zip(ring, ring[1:] + ring[:1]):
+        inside &= _cross(ax, ay, bx, by, xs, ys) > 0
+    return xs[~inside], ys[~inside]
+
+def convex_hull(points):
+    """
+    Andrew 單調鏈。回傳凸包頂點 (逆時針，從最左下的點開始)，
+    共線的邊上點不列入；少於 3 個不同點時回傳這些點本身。
+    """
+    xs, ys = _coords(points)
+    if len(xs) >= 3:
+        xs, ys = _interior_filter(xs, ys)
+    order = np.lexsort((ys, xs))
+    pts = list(zip(xs[order].tolist(), ys[order].tolist()))
+    # 去除重複點 (已排序，重複點相鄰)
+    pts = [p for i, p in enumerate(pts) if i == 0 or p != pts[i - 1]]
+    if len(pts) < 3:
+        return [Point(x, y) for x, y in pts]
+
+    def half(seq):
+        chain = []
+        for x, y in seq:
+            while len(chain) >= 2 and _cross(*chain[-2], *chain[-1], x, y) <= 0:
+                chain.pop()
+            chain.append((x, y))
+        return chain
+
+    lower = half(pts)
+    upper = half(reversed(pts))
+    # 兩條鏈的最後一點是另一條鏈的起點
+    return [Point(x, y) for x, y in lower[:-1] + upper[:-1]]
+
+# --- 2. 最近點對 ---
+
+def closest_pair(points):
+    """ 分治法。回傳 (距離, p, q)，少於 2 個點時拋出 ValueError """
+    xs, ys = _coords(points)
+    if len(xs) < 2:
+        raise ValueError("至少需要兩個點")
+    order = np.lexsort((ys, xs))
+    by_x = list(zip(xs[order].tolist(), ys[order].tolist()))
+
+    def brute(pts):
+        best = (math.inf, None, None)
+        for i in range(len(pts)):
+            for j in range(i + 1, len(pts)):
+                d = math.dist(pts[i], pts[j])
+                if d < best[0]:
+                    best = (d, pts[i], pts[j])
+        return best
+
+    def solve(pts):
+        """ pts 依 x 排序；回傳 (最佳結果, 依 y 排序的 pts) """
+        n = len(pts)
+        if n <= 3:
+            return brute(pts), sorted(pts, key=lambda p: p[1])
+        mid = n // 2
+        mid_x = pts[mid][0]
+        best_l, left = solve(pts[:mid])
+        best_r, right = solve(pts[mid:])
+        best = min(best_l, best_r, key=lambda b: b[0])
+        # 兩段各自依 y 排好，Timsort 會直接合併這兩段 (線性時間)
+        by_y = sorted(left + right, key=lambda p: p[1])
+
+        # 帶狀區域：離中線不到 best 的點，每點只需與後面 y 差不到 best 的點比較 (最多 7 個)
+        d = best[0]
+        strip = [p for p in by_y if abs(p[0] - mid_x) < d]
+        for i, p in enumerate(strip):
+            for q in strip[i + 1:i + 8]:
+                if q[1] - p[1] >= d:
+                    break
+                dq = math.dist(p, q)
+                if dq < d:
+                    d = dq
+                    best = (dq, p, q)
+        return best, by_y
+
+    (d, p, q), _ = solve(by_x)
+    return d, Point(*p), Point(*q)
+
+def closest_pair_brute(points):
+    """ 逐對比較 O(n^2)，作為對照 """
+    pts = list(zip(*(a.tolist() for a in _coords(points))))
+    best = (math.inf, None, None)
+    for i, p in enumerate(pts):
+        for q in pts[i + 1:]:
+            d = math.dist(p, q)
+            if d < best[0]:
+                best = (d, p, q)
+    return best[0], Point(*best[1]), Point(*best[2])
+
+# --- 3. 點在多邊形內 ---
+
+def point_in_polygon(p, vertices):
+    """ 射線法 (逐邊檢查)，作為對照。邊界上的點不保證結果 """
+    inside = False
+    n = len(vertices)
+    for i in range(n):
+        a, b = vertices[i], vertices[(i + 1) % n]
+        if (a.y > p.y) != (b.y > p.y):
+            if p.x < a.x + (p.y - a.y) * (b.x - a.x) / (b.y - a.y):
+                inside = not inside
+    return inside
+
+class PolygonEdges:
+    """
+    預先整理多邊形的邊：起點 (x1, y1)、終點的 y2、x 對 y 的變化率 (x2 - x1) / (y2 - y1)，
+    以及整體的 bounding box。contains 對整批點以射線法 (偶奇規則) 判斷。
+    """
+    # 每一批最多 CHUNK 個 (點, 邊) 組合，控制暫存陣列的大小
+    CHUNK = 1 << 22
+
+    def __init__(self, polygon):
+        if not isinstance(polygon, Polygon):
+            polygon = Polygon(polygon)
+        x1, y1 = polygon.vertices.x, polygon.vertices.y
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+        dy = y2 - y1
+        # 水平邊永遠不會跨過射線，變化率隨便填 0
+        self.x1, self.y1, self.y2 = x1, y1, y2
+        self.dxdy = np.divide(x2 - x1, dy, out=np.zeros_like(dy), where=dy != 0)
+        self.bounds = polygon.vertices.bounds()
+
+    def __len__(self):
+        return len(self.x1)
+
+    def contains(self, points):
+        """ 回傳布林陣列，第 i 個點在多邊形內為 True (邊界上的點不保證結果) """
+        px, py = _coords(points)
+        xmin, ymin, xmax, ymax = self.bounds
+        result = np.zeros(len(px), dtype=bool)
+        # bounding box 外的點直接是 False
+        idx = np.flatnonzero((px >= xmin) & (px <= xmax) & (py >= ymin) & (py <= ymax))
+        step = max(1, self.CHUNK // len(self))
+        for start in range(0, len(idx), step):
+            sel = idx[start:start + step]
+            x, y = px[sel, None], py[sel, None]
+            crosses = (self.y1 > y) != (self.y2 > y)
+            left = x < self.x1 + (y - self.y1) * self.dxdy
+            result[sel] = np.count_nonzero(crosses & left, axis=1) % 2 == 1
+        return result
+
+# --- 4. Delaunay 三角剖分 ---
+
+# 無窮遠點 (ghost vertex) 的編號
+GHOST = -1
+
+def _insertion_order(xs, ys):
+    """ 依 sqrt(n) x sqrt(n) 的格子蛇形排列：列依序、奇數列由右往左 """
+    n = len(xs)
+    k = max(1, int(math.sqrt(n / 2)))
+    span_y = max(ys.max() - ys.min(), 1e-300)
+    row = np.minimum(((ys - ys.min()) / span_y * k).astype(np.int64), k - 1)
+    snake = np.where(row % 2 == 1, -xs, xs)
+    return np.lexsort((snake, row)).tolist()
+
+def delaunay_indices(points):
+    """
+    Bowyer-Watson 逐點插入，回傳三角形的頂點索引 [(i, j, k), ...] (逆時針)。
+    重複的點只保留第一個；所有點共線時沒有三角形，回傳 []。
+    """
+    xs, ys = _coords(points)
+    X, Y = xs.tolist(), ys.tolist()
+    order = _insertion_order(xs, ys) if len(X) else []
+
+    # 找前三個不共線的點作為起始三角形
+    start = None
+    for i in range(2, len(order)):
+        a, b, c = order[0], order[1], order[i]
+        if (X[a], Y[a]) == (X[b], Y[b]):
+            order[1], order[i] = order[i], order[1]
+            continue
+        orient = _cross(X[a], Y[a], X[b], Y[b], X[c], Y[c])
+        if orient != 0:
+            start = (a, b, c) if orient > 0 else (a, c, b)
+            order[2], order[i] = order[i], order[2]
+            break
+    if start is None:
+        return []
+
+    # 三角形 t 的頂點 V[t] (逆時針)，N[t][i] 是頂點 i 對面那條邊的鄰居
+    a, b, c = start
+    V = [[a, b, c], [b, a, GHOST], [c, b, GHOST], [a, c, GHOST]]
+    N = [[2, 3, 1], [3, 2, 0], [1, 3, 0], [2, 1, 0]]
+    alive = [True] * 4
+
+    def in_circle(t, px, py):
+        """ 點是否嚴格在 t 的外接圓內；ghost 三角形的外接圓退化成真實邊外側的半平面 """
+        v = V[t]
+        if GHOST in v:
+            k = v.index(GHOST)
+            u, w = v[(k + 1) % 3], v[(k + 2) % 3]
+            orient = _cross(X[u], Y[u], X[w], Y[w], px, py)
+            if orient != 0:
+                return orient > 0
+            # 落在凸包邊所在直線上：只有在邊的內部才算在圓內
+            return (min(X[u], X[w]) < px < max(X[u], X[w])) or (min(Y[u], Y[w]) < py < max(Y[u], Y[w]))
+        adx, ady = X[v[0]] - px, Y[v[0]] - py
+        bdx, bdy = X[v[1]] - px, Y[v[1]] - py
+        cdx, cdy = X[v[2]] - px, Y[v[2]] - py
+        return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+                + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+                + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)) > 0
+
+    def locate(t, px, py):
+        """ 從 t 沿著點所在的方向走，直到包含該點的三角形或凸包外的 ghost 三角形 """
+        came = -1
+        while GHOST not in V[t]:
+            v, nb = V[t], N[t]
+            for i in range(3):
+                u, w = v[(i + 1) % 3], v[(i + 2) % 3]
+                if nb[i] != came and _cross(X[u], Y[u], X[w], Y[w], px, py) < 0:
+                    came, t = t, nb[i]
+                    break
+            else:
+                return t
+        return t
+
+    last = 0
+    for p in order[3:]:
+        px, py = X[p], Y[p]
+        t = locate(last if alive[last] else 0, px, py)
+        if not in_circle(t, px, py):
+            # 只有與既有頂點重合時，所在三角形的外接圓才不包含此點
+            continue
+
+        # 擴張出所有外接圓包含 p 的三角形 (cavity)
+        bad = {t}
+        stack = [t]
+        while stack:
+            s = stack.pop()
+            for nb in N[s]:
+                if nb not in bad and in_circle(nb, px, py):
+                    bad.add(nb)
+                    stack.append(nb)
+
+        # cavity 的邊界邊 (u, w) 與 p 組成新的三角形
+        starts = {}
+        created = []
+        for s in bad:
+            alive[s] = False
+            v = V[s]
+            for i in range(3):
+                outer = N[s][i]
+                if outer in bad:
+                    continue
+                u, w = v[(i + 1) % 3], v[(i + 2) % 3]
+                nt = len(V)
+                V.append([u, w, p])
+                N.append([-1, -1, outer])
+                alive.append(True)
+                N[outer][N[outer].index(s)] = nt
+                starts[u] = nt
+                created.append(nt)
+        # 新三角形 (u, w, p) 與 (w, x, p) 共用邊 (w, p)
+        for nt in created:
+            other = starts[V[nt][1]]
+            N[nt][0] = other
+            N[other][1] = nt
+        last = created[-1]
+        # 新三角形中挑一個真實三角形當下一次走訪的起點
+        for nt in created:
+            if GHOST not in V[nt]:
+                last = nt
+                break
+
+    return [tuple(v) for t, v in enumerate(V) if alive[t] and GHOST not in v]
+
+def delaunay(points):
+    """ Delaunay 三角剖分，回傳 week3 的 Triangle list """
+    xs, ys = _coords(points)
+    if isinstance(points, PointArray):
+        pts = points.to_points()
+    else:
+        pts = [Point(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+    return [Triangle(pts[i], pts[j], pts[k]) for i, j, k in delaunay_indices(points)]
+
+def main():
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    cloud = PointArray(rng.normal(0, 1, n), rng.normal(0, 1, n))
+    points = cloud.to_points()
+
+    print("--- 1. 凸包 ---")
+    hull = convex_hull(points)
+    # 驗證：每個點都在每條凸包邊的左側 (或線上)
+    hx, hy = _coords(hull)
+    ok_hull = all(np.all(_cross(hx[i], hy[i], hx[i - len(hx) + 1], hy[i - len(hx) + 1], cloud.x, cloud.y) >= -1e-9)
+                  for i in range(len(hx)))
+    print(f"{n} 個點的凸包有 {len(hull)} 個頂點，面積 {Polygon(hull).area():.3f}，所有點都在凸包內: {ok_hull}")
+
+    print("\n--- 2. 最近點對 ---")
+    d, p, q = closest_pair(points)
+    d_brute, *_ = closest_pair_brute(points[:2000])
+    d_small, *_ = closest_pair(points[:2000])
+    ok_pair = d_small == d_brute
+    print(f"最近點對 {p} - {q}，距離 {d:.3e}；前 2000 點與逐對比較一致: {ok_pair}")
+
+    print("\n--- 3. 點在多邊形內 ---")
+    # 星形多邊形 (非凸)
+    k = 40
+    angles = np.linspace(0, 2 * math.pi, k, endpoint=False)
+    radius = np.where(np.arange(k) % 2 == 0, 2.0, 0.8)
+    star = Polygon(PointArray(radius * np.cos(angles), radius * np.sin(angles)))
+    edges = PolygonEdges(star)
+    inside = edges.contains(cloud)
+    vertices = star.vertices.to_points()
+    expected = [point_in_polygon(p, vertices) for p in points]
+    ok_pip = inside.tolist() == expected
+    print(f"{k} 邊的星形，{n} 個點中 {int(inside.sum())} 個在內部，與逐點射線法一致: {ok_pip}")
+
+    print("\n--- 4. Delaunay 三角剖分 ---")
+    start = time.perf_counter()
+    tris = delaunay_indices(cloud)
+    elapsed = time.perf_counter() - start
+    X, Y = cloud.x, cloud.y
+    # 驗證 1：三角形數量 = 2n - 2 - h (h 為凸包頂點數)
+    ok_count = len(tris) == 2 * n - 2 - len(hull)
+    # 驗證 2：面積總和 = 凸包面積
+    t = np.array(tris)
+    areas = _cross(X[t[:, 0]], Y[t[:, 0]], X[t[:, 1]], Y[t[:, 1]], X[t[:, 2]], Y[t[:, 2]]) / 2
+    ok_area = bool(np.all(areas > 0)) and math.isclose(areas.sum(), Polygon(hull).area(), rel_tol=1e-9)
+    # 驗證 3：每條內部邊對面的頂點都不在外接圓內 (局部 Delaunay 即整體 Delaunay)
+    opposite = {}
+    for a, b, c in tris:
+        opposite[(a, b)], opposite[(b, c)], opposite[(c, a)] = c, a, b
+    violations = 0
+    for a, b, c in tris:
+        for (u, w), v in (((b, a), c), ((c, b), a), ((a, c), b)):
+            o = opposite.get((u, w))
+            if o is None:
+                continue
+            ax, ay, bx, by, cx, cy = X[a] - X[o], Y[a] - Y[o], X[b] - X[o], Y[b] - Y[o], X[c] - X[o], Y[c] - Y[o]
+            det = ((ax * ax + ay * ay) * (bx * cy - cx * by) + (bx * bx + by * by) * (cx * ay - ax * cy)
+                   + (cx * cx + cy * cy) * (ax * by - bx * ay))
+            violations += det > 1e-9
+    print(f"{n} 個點 -> {len(tris)} 個三角形 ({elapsed:.2f} 秒)")
+    print(f"三角形數 = 2n - 2 - h: {ok_count}，面積總和 = 凸包面積: {ok_area}，違反空圓性質的邊: {violations}")
+    print(f"前三個 Triangle: {delaunay(points[:10])[:3]}")
+
+    ok = ok_hull and ok_pair and ok_pip and ok_count and ok_area and violations == 0
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
+
+if __name__ == "__main__":
+    main()
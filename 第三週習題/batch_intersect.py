@@ -0,0 +1,148 @@
+"""
+習題 9 (延伸) : 批次交點計算 (向量化)
+week3 的 Line.intersect_line (克拉瑪公式) 與 Circle.intersect_circle 一次只算一對，
+回傳 Point 物件；三邊定位 (trilateration) 之類的流程要一次處理上百萬對。
+1. 直線以 N x 4 陣列 [x1, y1, x2, y2] 表示，圓以 N x 3 陣列 [cx, cy, r] 表示
+2. 公式與 week3 完全相同，只是整欄一起算，結果與逐對呼叫一致
+3. 平行 (|det| < 1e-9)、外離、內含、同心 (d == 0) 不是錯誤：
+   回傳的座標為 NaN，另外附上一個布林遮罩 valid 標示哪些配對有交點
+"""
+
+import numpy as np
+
+from week3 import Point, Line, Circle
+from point_array import PointArray
+
+# 與 week3 Line.intersect_line 相同的平行判斷門檻
+EPS = 1e-9
+
+def lines_to_array(lines):
+    """ [Line, ...] -> N x 4 陣列 """
+    return np.array([(l.p1.x, l.p1.y, l.p2.x, l.p2.y) for l in lines], dtype=np.float64).reshape(-1, 4)
+
+def circles_to_array(circles):
+    """ [Circle, ...] -> N x 3 陣列 """
+    return np.array([(c.center.x, c.center.y, c.r) for c in circles], dtype=np.float64).reshape(-1, 3)
+
+def _columns(arr, width, name):
+    arr = np.asarray(arr, dtype=np.float64)
+    if arr.ndim != 2 or arr.shape[1] != width:
+        raise ValueError(f"{name} 必須是 N x {width} 陣列，收到 {arr.shape}")
+    return arr.T
+
+def intersect_lines(lines1, lines2):
+    """
+    第 i 條 lines1 與第 i 條 lines2 的交點 (視為無限長直線)。
+    回傳 (PointArray, valid)；平行的配對 valid 為 False，座標為 NaN。
+    """
+    x1, y1, x2, y2 = _columns(lines1, 4, "lines1")
+    u1, v1, u2, v2 = _columns(lines2, 4, "lines2")
+    if len(x1) != len(u1):
+        raise ValueError("lines1 與 lines2 的數量必須相同")
+    # 一般式 ax + by = c
+    a1, b1 = y1 - y2, x2 - x1
+    c1 = a1 * x1 + b1 * y1
+    a2, b2 = v1 - v2, u2 - u1
+    c2 = a2 * u1 + b2 * v1
+    det = a1 * b2 - a2 * b1
+    valid = np.abs(det) >= EPS
+    # 平行的配對除以 1，最後再換成 NaN，避免除以 0 的警告
+    safe = np.where(valid, det, 1.0)
+    x = np.where(valid, (b2 * c1 - b1 * c2) / safe, np.nan)
+    y = np.where(valid, (a1 * c2 - a2 * c1) / safe, np.nan)
+    return PointArray(x, y), valid
+
+def intersect_circles(circles1, circles2):
+    """
+    第 i 個 circles1 與第 i 個 circles2 的交點。
+    回傳 (PointArray, PointArray, valid)，兩組交點的順序與 Circle.intersect_circle 相同；
+    相切時兩組座標相同。外離、內含、同心 (d == 0) 的配對 valid 為 False，座標為 NaN。
+    """
+    cx1, cy1, r1 = _columns(circles1, 3, "circles1")
+    cx2, cy2, r2 = _columns(circles2, 3, "circles2")
+    if len(cx1) != len(cx2):
+        raise ValueError("circles1 與 circles2 的數量必須相同")
+    x2 = cx2 - cx1
+    y2 = cy2 - cy1
+    d = np.sqrt(x2 ** 2 + y2 ** 2)
+    valid = ~((d > r1 + r2) | (d < np.abs(r1 - r2)) | (d == 0))
+    d = np.where(valid, d, 1.0)
+
+    # 餘弦定理：交點在連心線上的投影距離 a 與半弦長 h
+    a = (r1 ** 2 - r2 ** 2 + d ** 2) / (2 * d)
+    h = np.sqrt(np.abs(r1 ** 2 - a ** 2))
+    ux, uy = x2 / d, y2 / d
+    x3 = cx1 + a * ux
+    y3 = cy1 + a * uy
+    # 旋轉 90 度得到交點偏移量
+    first = PointArray(np.where(valid, x3 + h * uy * -1, np.nan), np.where(valid, y3 + h * ux, np.nan))
+    second = PointArray(np.where(valid, x3 - h * uy * -1, np.nan), np.where(valid, y3 - h * ux, np.nan))
+    return first, second, valid
+
+def trilaterate(centers, distances):
+    """
+    三邊定位：每一列是三個基地台 (N x 3 x 2) 與量到的距離 (N x 3)。
+    先求前兩個圓的兩個交點，取離第三個圓周較近的那一個。回傳 (PointArray, valid)。
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    distances = np.asarray(distances, dtype=np.float64)
+    c1 = np.column_stack([centers[:, 0], distances[:, 0]])
+    c2 = np.column_stack([centers[:, 1], distances[:, 1]])
+    first, second, valid = intersect_circles(c1, c2)
+    (sx, sy), r3 = centers[:, 2].T, distances[:, 2]
+    err1 = np.abs(np.hypot(first.x - sx, first.y - sy) - r3)
+    err2 = np.abs(np.hypot(second.x - sx, second.y - sy) - r3)
+    pick = err1 <= err2
+    return PointArray(np.where(pick, first.x, second.x), np.where(pick, first.y, second.y)), valid
+
+def _same(p, x, y):
+    return abs(p.x - x) < 1e-9 and abs(p.y - y) < 1e-9
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 20_000
+
+    # 直線：隨機配對，另外刻意放入平行、重合與長度為 0 的直線
+    L1 = rng.uniform(-10, 10, (n, 4))
+    L2 = rng.uniform(-10, 10, (n, 4))
+    L2[::7] = L1[::7] + np.array([3, 1, 3, 1])   # 平移 -> 平行
+    L2[1::7] = L1[1::7]                          # 重合
+    L2[2::7, 2:] = L2[2::7, :2]                  # 退化成一點
+    pts, valid = intersect_lines(L1, L2)
+    lines1 = [Line(Point(*r[:2]), Point(*r[2:])) for r in L1.tolist()]
+    lines2 = [Line(Point(*r[:2]), Point(*r[2:])) for r in L2.tolist()]
+    mismatch = 0
+    for i, (l1, l2) in enumerate(zip(lines1, lines2)):
+        p = l1.intersect_line(l2)
+        if (p is None) != (not valid[i]) or (p is not None and not _same(p, pts.x[i], pts.y[i])):
+            mismatch += 1
+    print(f"直線交點: {n} 對，平行 {int((~valid).sum())} 對，與 Line.intersect_line 不一致 {mismatch} 對")
+
+    # 圓：隨機配對，另外放入同心、相切與內含
+    C1 = np.column_stack([rng.uniform(-5, 5, (n, 2)), rng.uniform(0.5, 4, n)])
+    C2 = np.column_stack([rng.uniform(-5, 5, (n, 2)), rng.uniform(0.5, 4, n)])
+    C2[::9, :2] = C1[::9, :2]                                # 同心
+    C2[1::9] = [[C1[i, 0] + C1[i, 2] + 1, C1[i, 1], 1] for i in range(1, n, 9)]  # 外切
+    C2[2::9] = C1[2::9] * [1, 1, 0.1] + [0.01, 0, 0]         # 內含
+    first, second, valid = intersect_circles(C1, C2)
+    circles1 = [Circle(Point(*r[:2]), r[2]) for r in C1.tolist()]
+    circles2 = [Circle(Point(*r[:2]), r[2]) for r in C2.tolist()]
+    bad = mismatch
+    mismatch = 0
+    for i, (c1, c2) in enumerate(zip(circles1, circles2)):
+        ps = c1.intersect_circle(c2)
+        if not ps:
+            mismatch += bool(valid[i])
+        elif not (valid[i] and _same(ps[0], first.x[i], first.y[i]) and _same(ps[1], second.x[i], second.y[i])):
+            mismatch += 1
+    print(f"圓交點: {n} 對，無交點 {int((~valid).sum())} 對，與 Circle.intersect_circle 不一致 {mismatch} 對")
+
+    # 三邊定位：三個基地台量到的距離 -> 接收器位置
+    truth = rng.uniform(0, 100, (n, 2))
+    stations = rng.uniform(0, 100, (n, 3, 2))
+    ranges = np.hypot(*(stations - truth[:, None, :]).transpose(2, 0, 1))
+    found, ok = trilaterate(stations, ranges)
+    err = np.hypot(found.x - truth[:, 0], found.y - truth[:, 1])[ok]
+    print(f"三邊定位: {int(ok.sum())}/{n} 組有解，位置誤差中位數 {np.median(err):.2e}")
+
+    print("\n✅ 驗證成功" if bad + mismatch == 0 else "\n❌ 驗證失敗")
@@ -0,0 +1,180 @@
+"""
+習題 9 : 幾何學 - 效能比較 (Benchmark)
+目標：比較逐對計算與各種加速結構 / 向量化版本的耗時。
+執行：python benchmark.py
+"""
+
+import math
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from week3 import Point, Line, Circle
+from spatial import Scene
+from point_array import Affine, PointArray
+from batch_intersect import intersect_lines, intersect_circles
+from algorithms import (convex_hull, closest_pair, closest_pair_brute, PolygonEdges,
+                        point_in_polygon, delaunay_indices)
+
+def timed(func, *args, repeat=3):
+    """ 取 repeat 次中最快的一次 (秒) """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def allocated(func, *args):
+    """ func 執行結果所佔用的記憶體 (bytes) """
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def random_scene(n, size=1000.0, length=5.0, circle_ratio=0.3):
+    """ 邊長 size 的區域內 n 個短線段與小圓 """
+    shapes = []
+    for _ in range(n):
+        x, y = random.uniform(0, size), random.uniform(0, size)
+        if random.random() < circle_ratio:
+            shapes.append(Circle(Point(x, y), random.uniform(0.5, length / 2)))
+        else:
+            a = random.uniform(0, 2 * math.pi)
+            shapes.append(Line(Point(x, y), Point(x + length * math.cos(a), y + length * math.sin(a))))
+    return shapes
+
+def bench_scene(sizes=(1000, 5000, 20000, 50000), brute_max=2000):
+    """ 1. 所有交點：逐對 O(n^2) vs 均勻格網 vs Bentley-Ottmann (只有線段) """
+    print("=== 1. 所有交點查詢 ===")
+    for n in sizes:
+        random.seed(n)
+        scene = Scene(random_scene(n))
+        t_grid = timed(lambda: list(scene.intersections("grid")), repeat=1)
+        line = f"n = {n:6d}: 格網 {t_grid:7.3f} 秒"
+        segments = Scene([s for s in scene.shapes if isinstance(s, Line)])
+        t_sweep = timed(lambda: list(segments.intersections("sweep")), repeat=1)
+        line += f", 掃描線 ({len(segments)} 條線段) {t_sweep:7.3f} 秒"
+        if n <= brute_max:
+            t_brute = timed(lambda: list(scene.intersections("brute")), repeat=1)
+            line += f", 逐對 {t_brute:7.3f} 秒"
+        else:
+            line += f", 逐對 (約 {n * (n - 1) // 2:.1e} 對，略過)"
+        print(line)
+    print()
+
+def bench_transform(n=1_000_000):
+    """ 2. 網格頂點：逐點 Point.translate/scale/rotate vs PointArray 一次套用組合矩陣 """
+    print(f"=== 2. {n} 個頂點：平移 -> 縮放 -> 旋轉 ===")
+    rng = np.random.default_rng(0)
+    mesh = PointArray(rng.uniform(-1, 1, n), rng.uniform(-1, 1, n))
+    points = mesh.to_points()
+    center = Point(0.5, 0.5)
+    t_points = timed(lambda: [p.translate(1, 2).scale(3).rotate(30, center) for p in points], repeat=1)
+    M = Affine().translate(1, 2).scale(3).rotate(30, center)
+    t_array = timed(mesh.transform, M)
+    print(f"逐點 Point 方法: {t_points:.3f} 秒")
+    print(f"PointArray + Affine: {t_array:.4f} 秒 (快 {t_points / t_array:.0f} 倍)\n")
+
+def bench_batch_intersections(n=1_000_000):
+    """ 3. n 對直線 / n 對圓：逐對 intersect_line / intersect_circle vs 批次陣列版本 """
+    print(f"=== 3. {n} 對交點：逐對 vs 批次 ===")
+    rng = np.random.default_rng(0)
+    L1, L2 = rng.uniform(-10, 10, (n, 4)), rng.uniform(-10, 10, (n, 4))
+    C1 = np.column_stack([rng.uniform(-5, 5, (n, 2)), rng.uniform(0.5, 4, n)])
+    C2 = np.column_stack([rng.uniform(-5, 5, (n, 2)), rng.uniform(0.5, 4, n)])
+    lines1 = [Line(Point(*r[:2]), Point(*r[2:])) for r in L1.tolist()]
+    lines2 = [Line(Point(*r[:2]), Point(*r[2:])) for r in L2.tolist()]
+    circles1 = [Circle(Point(*r[:2]), r[2]) for r in C1.tolist()]
+    circles2 = [Circle(Point(*r[:2]), r[2]) for r in C2.tolist()]
+
+    t_scalar = timed(lambda: [a.intersect_line(b) for a, b in zip(lines1, lines2)], repeat=1)
+    t_batch = timed(intersect_lines, L1, L2)
+    print(f"直線 intersect_line: {t_scalar:.3f} 秒 / intersect_lines: {t_batch:.4f} 秒 (快 {t_scalar / t_batch:.0f} 倍)")
+    t_scalar = timed(lambda: [a.intersect_circle(b) for a, b in zip(circles1, circles2)], repeat=1)
+    t_batch = timed(intersect_circles, C1, C2)
+    print(f"圓 intersect_circle: {t_scalar:.3f} 秒 / intersect_circles: {t_batch:.4f} 秒 (快 {t_scalar / t_batch:.0f} 倍)\n")
+
+# 改成 __slots__ 之前的 Point / Line / Circle (每個實例都有 __dict__，Line 建構時就算好 a, b, c)
+class DictPoint:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+class DictLine:
+    def __init__(self, p1, p2):
+        self.p1 = p1
+        self.p2 = p2
+        self.a = p1.y - p2.y
+        self.b = p2.x - p1.x
+        self.c = self.a * p1.x + self.b * p1.y
+
+class DictCircle:
+    def __init__(self, center, r):
+        self.center = center
+        self.r = r
+
+def build_shapes(coords, point, line, circle):
+    """ 每列座標建一個物件：依序輪流 Point、Line (兩個端點)、Circle """
+    shapes = []
+    for i, (x, y, u, v) in enumerate(coords):
+        kind = i % 3
+        if kind == 0:
+            shapes.append(point(x, y))
+        elif kind == 1:
+            shapes.append(line(point(x, y), point(u, v)))
+        else:
+            shapes.append(circle(point(x, y), u))
+    return shapes
+
+def bench_primitives(n=1_000_000):
+    """ 4. 建立 n 個物件：有 __dict__ 的舊類別 vs __slots__ 不可變類別 """
+    print(f"=== 4. 建立 {n} 個 Point / Line / Circle ===")
+    coords = np.random.default_rng(0).uniform(0, 100, (n, 4)).tolist()
+    for name, classes in (("__dict__ (舊)", (DictPoint, DictLine, DictCircle)),
+                          ("__slots__ 不可變", (Point, Line, Circle))):
+        t = timed(build_shapes, coords, *classes, repeat=1)
+        size = allocated(build_shapes, coords, *classes)
+        print(f"{name:>14}: {t:.3f} 秒，{size / 2**20:7.1f} MiB ({size / n:.0f} bytes/物件)")
+
+    # 交點去重：同一組直線兩兩求交點，set() 直接合併近似重複點
+    lines = [Line(Point(0, k * 1e-12), Point(1, 1 + k * 1e-12)) for k in range(300)] + \
+            [Line(Point(0, 1), Point(1, 0))]
+    hits = [l.intersect_line(lines[-1]) for l in lines[:-1]]
+    print(f"300 條幾乎重合的直線與 x + y = 1 的交點：{len({(p.x, p.y) for p in hits})} 種座標，set() 後 {len(set(hits))} 個\n")
+
+def bench_algorithms(sizes=(1_000, 10_000, 100_000, 1_000_000), brute_max=2000, scalar_max=10_000):
+    """ 5. 凸包、最近點對、點在多邊形內、Delaunay：n = 10^3 ... 10^6 """
+    print("=== 5. 計算幾何演算法 ===")
+    angles = np.linspace(0, 2 * math.pi, 64, endpoint=False)
+    radius = np.where(np.arange(64) % 2 == 0, 0.5, 0.2)
+    star = PointArray(0.5 + radius * np.cos(angles), 0.5 + radius * np.sin(angles))
+    star_points = star.to_points()
+    edges = PolygonEdges(star.to_points())
+    for n in sizes:
+        rng = np.random.default_rng(n)
+        cloud = PointArray(rng.uniform(0, 1, n), rng.uniform(0, 1, n))
+        points = cloud.to_points()
+        print(f"n = {n}:")
+        print(f"  凸包 (單調鏈)       {timed(convex_hull, cloud, repeat=1):8.3f} 秒")
+        line = f"  最近點對 (分治)     {timed(closest_pair, cloud, repeat=1):8.3f} 秒"
+        if n <= brute_max:
+            line += f"，逐對 {timed(closest_pair_brute, cloud, repeat=1):.3f} 秒"
+        print(line)
+        line = f"  點在 64 邊星形內    {timed(edges.contains, cloud):8.3f} 秒 (PolygonEdges)"
+        if n <= scalar_max:
+            line += f"，逐點射線法 {timed(lambda: [point_in_polygon(p, star_points) for p in points], repeat=1):.3f} 秒"
+        print(line)
+        print(f"  Delaunay            {timed(delaunay_indices, cloud, repeat=1):8.3f} 秒")
+    print()
+
+if __name__ == "__main__":
+    bench_scene()
+    bench_transform()
+    bench_batch_intersections()
+    bench_primitives()
+    bench_algorithms()
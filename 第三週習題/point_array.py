@@ -0,0 +1,208 @@
+"""
+習題 9 (延伸) : 以陣列儲存的點集與仿射變換
+week3 的 Point.translate / scale / rotate 每次都產生新的 Point，rotate 還會對每個點重算 cos / sin；
+Triangle.transform 也是一個點一個點地呼叫。處理上百萬個頂點的網格時：
+1. PointArray：x、y 各是一個 NumPy 欄位 (structure of arrays)
+2. Affine：平移、縮放、旋轉都是 3x3 齊次座標矩陣，多個變換先相乘成一個矩陣
+3. 整個點集只做一次向量化運算：x' = a x + b y + c，y' = d x + e y + f
+4. 圓的半徑依矩陣的縮放量計算；非均勻縮放會把圓變成橢圓，此時拋出 ValueError
+"""
+
+import math
+
+import numpy as np
+
+from week3 import Point, Circle, Triangle
+
+class Affine:
+    """
+    2D 仿射變換，內部是 3x3 矩陣 m (最後一列固定為 [0, 0, 1])：
+        [x']   [a b c] [x]
+        [y'] = [d e f] [y]
+        [1 ]   [0 0 1] [1]
+    translate / scale / rotate 回傳「先做自己、再做這個變換」的新 Affine，可以串接：
+        Affine().translate(10, 10).rotate(90)  # 先平移再旋轉
+    A @ B 與矩陣乘法相同 (先做 B 再做 A)。
+    """
+    __slots__ = ("m",)
+
+    def __init__(self, m=None):
+        self.m = np.eye(3) if m is None else np.asarray(m, dtype=np.float64)
+
+    def __repr__(self):
+        (a, b, c), (d, e, f) = self.m[:2]
+        return f"Affine([{a:.4g}, {b:.4g}, {c:.4g}], [{d:.4g}, {e:.4g}, {f:.4g}])"
+
+    def __matmul__(self, other):
+        return Affine(self.m @ other.m)
+
+    def then(self, other):
+        """ 先做 self 再做 other """
+        return other @ self
+
+    def inverse(self):
+        return Affine(np.linalg.inv(self.m))
+
+    # --- 基本變換 (與 Point 的方法同名、同參數) ---
+
+    def translate(self, dx, dy):
+        return self.then(Affine([[1, 0, dx], [0, 1, dy], [0, 0, 1]]))
+
+    def scale(self, sx, sy=None, center=None):
+        """ 縮放 (sy 省略時為均勻縮放)，預設以原點為中心 """
+        sy = sx if sy is None else sy
+        return self._about(Affine([[sx, 0, 0], [0, sy, 0], [0, 0, 1]]), center)
+
+    def rotate(self, angle_deg, center=None):
+        """ 繞著 center 旋轉 (預設繞原點)，cos / sin 只計算一次 """
+        rad = math.radians(angle_deg)
+        cos_a, sin_a = math.cos(rad), math.sin(rad)
+        return self._about(Affine([[cos_a, -sin_a, 0], [sin_a, cos_a, 0], [0, 0, 1]]), center)
+
+    def _about(self, linear, center):
+        if center is not None:
+            linear = Affine().translate(-center.x, -center.y).then(linear).translate(center.x, center.y)
+        return self.then(linear)
+
+    # --- 套用 ---
+
+    def apply(self, x, y):
+        """ 對 x、y 陣列 (或純量) 做一次向量化變換 """
+        (a, b, c), (d, e, f) = self.m[:2]
+        return a * x + b * y + c, d * x + e * y + f
+
+    def __call__(self, p):
+        """ 變換單一 Point，因此可以直接傳給 Triangle.transform / Line.transform """
+        x, y = self.apply(p.x, p.y)
+        return Point(float(x), float(y))
+
+    def radius_scale(self):
+        """
+        圓的半徑縮放量。線性部分 L 必須是相似變換 (L^T L = s^2 I)，
+        否則圓會變成橢圓，無法用 Circle 表示。
+        """
+        L = self.m[:2, :2]
+        gram = L.T @ L
+        s2 = (gram[0, 0] + gram[1, 1]) / 2
+        if not np.allclose(gram, s2 * np.eye(2), rtol=1e-9, atol=1e-12 * max(s2, 1.0)):
+            raise ValueError("非均勻變換會把圓變成橢圓，無法以 Circle 表示")
+        return math.sqrt(s2)
+
+    def transform_circle(self, circle):
+        return Circle(self(circle.center), circle.r * self.radius_scale())
+
+class PointArray:
+    """ 大量點的集合，x、y 各為一個 float64 陣列 """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        if self.x.shape != self.y.shape:
+            raise ValueError("x 與 y 的長度必須相同")
+
+    @classmethod
+    def from_points(cls, points):
+        return cls([p.x for p in points], [p.y for p in points])
+
+    def to_points(self):
+        return [Point(x, y) for x, y in zip(self.x.tolist(), self.y.tolist())]
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Point(float(self.x[index]), float(self.y[index]))
+        return PointArray(self.x[index], self.y[index])
+
+    def __repr__(self):
+        if len(self) > 6:
+            head = ", ".join(repr(p) for p in self[:3].to_points())
+            return f"PointArray[{head}, ... ({len(self)} 點)]"
+        return f"PointArray{self.to_points()}"
+
+    def transform(self, affine):
+        """ 套用一個 Affine (多個變換請先組合)，一次向量化計算 """
+        return PointArray(*affine.apply(self.x, self.y))
+
+    def translate(self, dx, dy):
+        return PointArray(self.x + dx, self.y + dy)
+
+    def scale(self, factor):
+        return PointArray(self.x * factor, self.y * factor)
+
+    def rotate(self, angle_deg, center=None):
+        return self.transform(Affine().rotate(angle_deg, center))
+
+    def bounds(self):
+        """ (xmin, ymin, xmax, ymax) """
+        return self.x.min(), self.y.min(), self.x.max(), self.y.max()
+
+class Polygon:
+    """ 多邊形 (頂點依序相連，最後一點接回第一點)，頂點存成 PointArray """
+    __slots__ = ("vertices",)
+
+    def __init__(self, vertices):
+        if not isinstance(vertices, PointArray):
+            vertices = PointArray.from_points(vertices)
+        self.vertices = vertices
+
+    @classmethod
+    def from_triangle(cls, tri):
+        return cls(tri.points)
+
+    def to_triangle(self):
+        if len(self.vertices) != 3:
+            raise ValueError("只有三個頂點的多邊形可以轉成 Triangle")
+        return Triangle(*self.vertices.to_points())
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __repr__(self):
+        return f"Polygon{self.vertices.to_points()}"
+
+    def transform(self, affine):
+        return Polygon(self.vertices.transform(affine))
+
+    def signed_area(self):
+        """ 鞋帶公式，逆時針為正 """
+        x, y = self.vertices.x, self.vertices.y
+        return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+    def area(self):
+        return abs(self.signed_area())
+
+    def perimeter(self):
+        x, y = self.vertices.x, self.vertices.y
+        return float(np.hypot(np.roll(x, -1) - x, np.roll(y, -1) - y).sum())
+
+if __name__ == "__main__":
+    # 與 week3 main() 相同的三角形：先平移 (10, 10) 再繞原點旋轉 90 度
+    tri = Triangle(Point(0, 0), Point(4, 0), Point(0, 3))
+    step = tri.transform(Point.translate, 10, 10).transform(Point.rotate, 90, Point(0, 0))
+    M = Affine().translate(10, 10).rotate(90)
+    print(f"組合後的矩陣: {M}")
+    print(f"逐點呼叫 Point 方法: {step}")
+    print(f"Triangle.transform(M): {tri.transform(M)}")
+    poly = Polygon.from_triangle(tri).transform(M)
+    print(f"Polygon.transform(M): {poly}，面積 {poly.area():.2f} (原本 6.00)")
+
+    # 圓：相似變換正確縮放半徑，非均勻縮放拋出錯誤
+    c = Circle(Point(1, 1), 2)
+    print(f"\n{c} 旋轉 30 度再放大 3 倍: {c.transform(Affine().rotate(30).scale(3))}")
+    try:
+        c.transform(Affine().scale(2, 1))
+    except ValueError as e:
+        print(f"非均勻縮放 (2, 1): {e}")
+
+    # 一百萬個頂點一次變換，與逐點計算比對
+    rng = np.random.default_rng(0)
+    mesh = PointArray(rng.uniform(-1, 1, 1_000_000), rng.uniform(-1, 1, 1_000_000))
+    out = mesh.transform(M)
+    sample = mesh[:1000].to_points()
+    expected = [p.translate(10, 10).rotate(90) for p in sample]
+    err = max(abs(q.x - r.x) + abs(q.y - r.y) for q, r in zip(out[:1000].to_points(), expected))
+    print(f"\n{len(mesh)} 個頂點一次變換，前 1000 點與 Point 方法的最大誤差: {err:.2e}")
+    print("\n✅ 驗證成功" if err < 1e-9 else "\n❌ 驗證失敗")
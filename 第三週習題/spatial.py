@@ -0,0 +1,335 @@
+"""
+習題 9 (延伸) : 大量幾何物件的交點查詢
+week3.py 一次只能算一對物件的交點；要找出上萬個物件之間所有的交點，
+逐對檢查需要 O(n^2) 次精確計算。
+1. Scene：收集 Point / Line / Circle，Line 在此視為線段 p1 -> p2 (有邊界才有 bounding box)
+2. 均勻格網 (uniform grid)：每個物件的 bounding box 登記到涵蓋的格子，
+   只有落在同一格且 bounding box 重疊的物件才成為候選配對
+3. 候選配對才交給 week3 的精確交點計算 (intersect_line / intersect_circle)
+4. 線段另外提供 Bentley-Ottmann 掃描線演算法，O((n + k) log n)，k 為交點數
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from collections import defaultdict
+
+from week3 import Point, Line, Circle
+
+# 與 week3 相同的判斷門檻
+EPS = 1e-9
+# 一個物件最多登記的格子數，超過的 (相對格子很大的物件) 改放「大物件」清單
+MAX_CELLS_PER_SHAPE = 64
+
+# --- bounding box 與精確交點 ---
+
+def bounding_box(shape):
+    """ (xmin, ymin, xmax, ymax) """
+    if isinstance(shape, Point):
+        return shape.x, shape.y, shape.x, shape.y
+    if isinstance(shape, Line):
+        return (min(shape.p1.x, shape.p2.x), min(shape.p1.y, shape.p2.y),
+                max(shape.p1.x, shape.p2.x), max(shape.p1.y, shape.p2.y))
+    if isinstance(shape, Circle):
+        c, r = shape.center, shape.r
+        return c.x - r, c.y - r, c.x + r, c.y + r
+    raise TypeError(f"不支援的物件: {shape!r}")
+
+def _boxes_overlap(a, b, eps=EPS):
+    return a[0] <= b[2] + eps and b[0] <= a[2] + eps and a[1] <= b[3] + eps and b[1] <= a[3] + eps
+
+def on_segment(p, seg, eps=EPS):
+    """ 點 p 是否落在線段 seg 上 (容許 eps 的誤差) """
+    ab = seg.p2 - seg.p1
+    ap = p - seg.p1
+    length2 = ab.x ** 2 + ab.y ** 2
+    if length2 == 0:
+        return p.distance(seg.p1) <= eps
+    t = (ap.x * ab.x + ap.y * ab.y) / length2
+    if t < -eps or t > 1 + eps:
+        return False
+    return abs(ap.x * ab.y - ap.y * ab.x) / math.sqrt(length2) <= eps * max(1.0, math.sqrt(length2))
+
+def segment_intersections(s1, s2):
+    """ 兩線段的交點 list；共線重疊時回傳重疊段的兩端點 """
+    p = s1.intersect_line(s2)
+    if p is not None:
+        return [p] if on_segment(p, s1) and on_segment(p, s2) else []
+    # 平行：共線時檢查端點是否落在對方線段上
+    shared = [q for q in (s1.p1, s1.p2) if on_segment(q, s2)] + \
+             [q for q in (s2.p1, s2.p2) if on_segment(q, s1)]
+    if not shared:
+        return []
+    shared.sort(key=lambda q: (q.x, q.y))
+    return [shared[0]] if shared[0].distance(shared[-1]) <= EPS else [shared[0], shared[-1]]
+
+def intersect(s1, s2):
+    """ 任兩個 Point / Line(線段) / Circle 的精確交點 (沿用 week3 的交點計算) """
+    if isinstance(s2, Point) and not isinstance(s1, Point):
+        s1, s2 = s2, s1
+    if isinstance(s1, Point):
+        if isinstance(s2, Point):
+            hit = s1.distance(s2) <= EPS
+        elif isinstance(s2, Line):
+            hit = on_segment(s1, s2)
+        else:
+            hit = abs(s1.distance(s2.center) - s2.r) <= EPS
+        return [s1] if hit else []
+    if isinstance(s1, Line) and isinstance(s2, Line):
+        return segment_intersections(s1, s2)
+    if isinstance(s1, Circle) and isinstance(s2, Circle):
+        return s1.intersect_circle(s2)
+    line, circle = (s1, s2) if isinstance(s1, Line) else (s2, s1)
+    if line.p1.distance(line.p2) == 0:
+        return intersect(line.p1, circle)
+    return [p for p in circle.intersect_line(line) if on_segment(p, line)]
+
+# --- 場景與均勻格網 ---
+
+class Scene:
+    """ 幾何物件的集合，以均勻格網加速「所有交點」查詢 """
+    def __init__(self, shapes=()):
+        self.shapes = []
+        self.boxes = []
+        for s in shapes:
+            self.add(s)
+
+    def add(self, shape):
+        """ 加入物件，回傳其索引 """
+        self.boxes.append(bounding_box(shape))
+        self.shapes.append(shape)
+        return len(self.shapes) - 1
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def _default_cell_size(self):
+        """ 取 bounding box 邊長的中位數，讓大部分物件只佔 1 ~ 4 格 """
+        sizes = sorted(max(b[2] - b[0], b[3] - b[1]) for b in self.boxes)
+        size = sizes[len(sizes) // 2] if sizes else 1.0
+        if size > 0:
+            return size
+        xs = [b[0] for b in self.boxes] + [b[2] for b in self.boxes]
+        ys = [b[1] for b in self.boxes] + [b[3] for b in self.boxes]
+        extent = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+        return extent / math.sqrt(len(self.boxes))
+
+    def candidate_pairs(self, cell_size=None):
+        """
+        產生 bounding box 重疊 (容許 EPS) 的索引對 (i, j)，i < j。
+        每個物件的 box 先向外擴 EPS 再登記到涵蓋的所有格子，相距 EPS 以內但分屬相鄰格子的物件才不會漏掉；
+        同一對可能同時出現在好幾格，只在「兩個擴張後 box 交集的左下角」所在的那一格輸出，因此不會重複。
+        涵蓋超過 MAX_CELLS_PER_SHAPE 格的物件不登記到格網，改與所有物件逐一比較 bounding box。
+        """
+        if len(self.shapes) < 2:
+            return
+        h = cell_size or self._default_cell_size()
+        grid = defaultdict(list)
+        large = []
+        for i, (x0, y0, x1, y1) in enumerate(self.boxes):
+            cx0, cx1 = math.floor((x0 - EPS) / h), math.floor((x1 + EPS) / h)
+            cy0, cy1 = math.floor((y0 - EPS) / h), math.floor((y1 + EPS) / h)
+            if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_CELLS_PER_SHAPE:
+                large.append(i)
+                continue
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    grid[cx, cy].append(i)
+        boxes = self.boxes
+        for (cx, cy), members in grid.items():
+            for a in range(len(members)):
+                i = members[a]
+                bi = boxes[i]
+                for b in range(a + 1, len(members)):
+                    j = members[b]
+                    bj = boxes[j]
+                    if not _boxes_overlap(bi, bj):
+                        continue
+                    # 擴張後交集的左下角所在的格子才輸出 (這一點同時落在兩個擴張後的 box 內)
+                    corner = (math.floor((max(bi[0], bj[0]) - EPS) / h), math.floor((max(bi[1], bj[1]) - EPS) / h))
+                    if corner != (cx, cy):
+                        continue
+                    yield (i, j) if i < j else (j, i)
+        # 大物件與所有物件逐一比較；兩個都是大物件時只由索引較小的那一個輸出
+        is_large = set(large)
+        for i in large:
+            bi = boxes[i]
+            for j, bj in enumerate(boxes):
+                if j == i or (j in is_large and j < i):
+                    continue
+                if _boxes_overlap(bi, bj):
+                    yield (i, j) if i < j else (j, i)
+
+    def intersections(self, method="grid", cell_size=None):
+        """
+        產生所有相交的 (i, j, [交點...])。
+        method: "grid" (均勻格網)、"sweep" (Bentley-Ottmann，只限全部都是線段)、"brute" (逐對)
+        """
+        if method == "sweep":
+            if not all(isinstance(s, Line) for s in self.shapes):
+                raise ValueError("sweep 只適用於全部都是線段的場景")
+            for (i, j), p in sorted(bentley_ottmann(self.shapes).items()):
+                yield i, j, segment_intersections(self.shapes[i], self.shapes[j]) or [p]
+            return
+        if method == "grid":
+            pairs = self.candidate_pairs(cell_size)
+        elif method == "brute":
+            n = len(self.shapes)
+            pairs = ((i, j) for i in range(n) for j in range(i + 1, n))
+        else:
+            raise ValueError(f"未知的 method: {method}")
+        for i, j in pairs:
+            points = intersect(self.shapes[i], self.shapes[j])
+            if points:
+                yield i, j, points
+
+# --- Bentley-Ottmann 掃描線 ---
+
+def bentley_ottmann(segments, eps=EPS):
+    """
+    找出所有相交的線段對，回傳 {(i, j): 交點} (i < j)。
+    掃描線由左往右 (事件依 (x, y) 排序)，狀態是目前與掃描線相交的線段 (由下往上排序)；
+    只有在狀態中相鄰的線段才需要檢查交點。在事件點 p：
+    1. 找出以 p 為起點 (U)、終點 (L) 或內部經過 p (C) 的線段，兩兩互相回報交點
+    2. 移除 L 與 C，再把 U 與 C 依「p 右邊一點點」的順序插回去 (交點處上下對調)
+    3. 檢查新相鄰的線段，交點在 p 右方 (或正上方) 時加入事件佇列
+    垂直線段在事件點 p 的高度視為 p.y (截在線段範圍內)，同一點排序時放在最上面。
+    """
+    segs = []
+    for s in segments:
+        a, b = (s.p1.x, s.p1.y), (s.p2.x, s.p2.y)
+        segs.append((a, b) if a <= b else (b, a))
+
+    starts = defaultdict(list)
+    events = []
+    for i, (a, b) in enumerate(segs):
+        starts[a].append(i)
+        events.append(a)
+        events.append(b)
+    heapq.heapify(events)
+    scheduled = set(events)
+
+    found = {}
+    status = []     # 由下往上排列的線段索引
+    sweep = [0.0, 0.0]
+
+    def y_at(i):
+        (x1, y1), (x2, y2) = segs[i]
+        if x1 == x2:
+            return min(max(sweep[1], y1), y2)
+        if sweep[0] <= x1:
+            return y1
+        if sweep[0] >= x2:
+            return y2
+        return y1 + (y2 - y1) * (sweep[0] - x1) / (x2 - x1)
+
+    def slope(i):
+        (x1, y1), (x2, y2) = segs[i]
+        return math.inf if x1 == x2 else (y2 - y1) / (x2 - x1)
+
+    def record(i, j, p):
+        key = (i, j) if i < j else (j, i)
+        if key not in found:
+            found[key] = Point(*p)
+
+    def check(i, j, p):
+        """ 檢查相鄰的 i, j；交點在事件點 p 之後則排入事件佇列 """
+        pts = segment_intersections(Line(Point(*segs[i][0]), Point(*segs[i][1])),
+                                    Line(Point(*segs[j][0]), Point(*segs[j][1])))
+        for q in pts:
+            q = (q.x, q.y)
+            record(i, j, q)
+            tol = eps * (1 + abs(p[0]) + abs(p[1]))
+            if (q[0] > p[0] + tol or (abs(q[0] - p[0]) <= tol and q[1] > p[1] + tol)) and q not in scheduled:
+                scheduled.add(q)
+                heapq.heappush(events, q)
+
+    while events:
+        p = heapq.heappop(events)
+        sweep[0], sweep[1] = p
+        tol = eps * (1 + abs(p[0]) + abs(p[1]))
+
+        # 狀態中經過 p 的線段 (L 與 C) 在 p.y 附近連續排列
+        lo = bisect_left(status, p[1] - tol, key=y_at)
+        hi = lo
+        while hi < len(status) and y_at(status[hi]) <= p[1] + tol:
+            hi += 1
+        through = status[lo:hi]
+        started = starts.pop(p, [])
+        # 長度為 0 的線段只在這一點出現，回報交點但不放進狀態
+        upper = [i for i in started if segs[i][1] != p]
+        involved = set(through) | set(started)
+        if len(involved) > 1:
+            ordered = sorted(involved)
+            for x in range(len(ordered)):
+                for y in range(x + 1, len(ordered)):
+                    record(ordered[x], ordered[y], p)
+
+        # 移除 L 與 C，再依 p 右側的順序 (全部經過 p，只需比較斜率) 插入 U 與 C
+        del status[lo:hi]
+        continuing = [i for i in through
+                      if abs(segs[i][1][0] - p[0]) > tol or abs(segs[i][1][1] - p[1]) > tol] + upper
+        continuing.sort(key=slope)
+        status[lo:lo] = continuing
+        if continuing:
+            last = lo + len(continuing) - 1
+            if lo > 0:
+                check(status[lo - 1], status[lo], p)
+            if last + 1 < len(status):
+                check(status[last], status[last + 1], p)
+        elif 0 < lo < len(status):
+            check(status[lo - 1], status[lo], p)
+    return found
+
+# --- 主程式 ---
+
+def main():
+    import random
+    import time
+
+    random.seed(0)
+    print("--- 小例子：網格線與圓 ---")
+    scene = Scene([
+        Line(Point(0, 0), Point(4, 0)),
+        Line(Point(2, -1), Point(2, 5)),
+        Line(Point(-10, 3), Point(10, 3)),
+        Circle(Point(0, 0), 5),
+        Circle(Point(3, 0), 4),
+        Point(2, 3),
+    ])
+    for i, j, pts in scene.intersections():
+        print(f"{scene.shapes[i]} x {scene.shapes[j]}: {pts}")
+
+    print("\n--- 隨機短線段：格網 / 掃描線 / 逐對 結果一致 ---")
+    segments = []
+    for _ in range(2000):
+        x, y = random.uniform(0, 100), random.uniform(0, 100)
+        a = random.uniform(0, 2 * math.pi)
+        segments.append(Line(Point(x, y), Point(x + 3 * math.cos(a), y + 3 * math.sin(a))))
+    scene = Scene(segments)
+    results = {}
+    for method in ("brute", "grid", "sweep"):
+        start = time.perf_counter()
+        results[method] = {(i, j) for i, j, _ in scene.intersections(method)}
+        print(f"{method:>5}: {len(results[method])} 對相交，耗時 {time.perf_counter() - start:.3f} 秒")
+    ok = results["brute"] == results["grid"] == results["sweep"]
+
+    print("\n--- 邊界情況：相距 EPS 以內但分屬相鄰格子、一個很大的圓 ---")
+    scene = Scene([
+        Line(Point(0, 0), Point(1 - EPS / 2, 0)),
+        Point(1, 0),
+        Line(Point(1, 1), Point(1, 2)),
+        Line(Point(1 + EPS / 2, 2), Point(3, 2)),
+        Circle(Point(0, 0), 1e6),
+        Line(Point(1e6, -1), Point(1e6, 1)),
+        Line(Point(-1e6, 0), Point(-1e6, 5)),
+    ])
+    start = time.perf_counter()
+    grid_pairs = {(i, j) for i, j, _ in scene.intersections("grid", cell_size=1.0)}
+    brute_pairs = {(i, j) for i, j, _ in scene.intersections("brute")}
+    print(f"grid: {sorted(grid_pairs)}，逐對: {sorted(brute_pairs)}，耗時 {time.perf_counter() - start:.3f} 秒")
+    ok &= grid_pairs == brute_pairs == {(0, 1), (2, 3), (4, 5), (4, 6)}
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
+
+if __name__ == "__main__":
+    main()
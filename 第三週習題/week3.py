@@ -5,19 +5,56 @@
 2. 實作交點計算 (線線、線圓、圓圓)。
 3. 實作垂線與畢氏定理驗證。
 4. 實作幾何變換 (平移、縮放、旋轉)。
+5. 不可變、可雜湊的幾何物件：近似重複的交點可以用 set / PointCache 合併。
 """
 
 import math
 
+# 兩點視為「相同」的容許誤差，與交點計算的 1e-9 門檻一致
+TOL = 1e-9
+
+def _snap(v):
+    """ 座標對齊到邊長 TOL 的格點，作為比較與雜湊的依據 (NaN / inf 保留原值) """
+    try:
+        return round(v / TOL)
+    except (ValueError, OverflowError):
+        return v
+
+def _frozen(self, name, value):
+    raise AttributeError(f"{type(self).__name__} 是不可變物件，請用變換方法產生新的物件")
+
 class Point:
-    """ 定義「點」及其基本運算 """
+    """
+    定義「點」及其基本運算。
+    不可變 (__slots__，不能修改屬性)、可雜湊：座標對齊到 TOL 的格點後相同就視為相等，
+    因此交點計算產生的近似重複點可以用 set / dict 去除。
+    (格線兩側的點即使距離小於 TOL 也可能不相等，需要完整合併時請用 PointCache)
+    """
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
-        self.x = x
-        self.y = y
+        _set_x(self, x)
+        _set_y(self, y)
+
+    __setattr__ = __delattr__ = _frozen
+
+    def __reduce__(self):
+        return Point, (self.x, self.y)
 
     def __repr__(self):
         return f"({self.x:.2f}, {self.y:.2f})"
 
+    def _key(self):
+        return _snap(self.x), _snap(self.y)
+
+    def __eq__(self, other):
+        if not isinstance(other, Point):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
     def __add__(self, other): # 向量加法
         return Point(self.x + other.x, self.y + other.y)
 
@@ -56,26 +93,60 @@ class Point:
         return Point(new_x + center.x, new_y + center.y)
 
 
+# 不可變物件只在建構時透過 slot 描述器寫入
+_set_x, _set_y = Point.x.__set__, Point.y.__set__
+
+
 class Line:
-    """ 定義「線」(由兩點決定) """
+    """ 定義「線」(由兩點決定)，不可變、可雜湊 (p1、p2 依序相等即相等) """
+    __slots__ = ("p1", "p2", "_coef")
+
     def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
-        # 一般式 ax + by = c
-        self.a = p1.y - p2.y
-        self.b = p2.x - p1.x
-        self.c = self.a * p1.x + self.b * p1.y
+        _set_p1(self, p1)
+        _set_p2(self, p2)
+
+    __setattr__ = __delattr__ = _frozen
+
+    def __reduce__(self):
+        return Line, (self.p1, self.p2)
 
     def __repr__(self):
         return f"Line[{self.p1} -> {self.p2}]"
 
+    def __eq__(self, other):
+        if not isinstance(other, Line):
+            return NotImplemented
+        return self.p1 == other.p1 and self.p2 == other.p2
+
+    def __hash__(self):
+        return hash((self.p1, self.p2))
+
+    @property
+    def coefficients(self):
+        """ 一般式 ax + by = c 的 (a, b, c)，第一次用到時才計算並快取 """
+        try:
+            return self._coef
+        except AttributeError:
+            p1, p2 = self.p1, self.p2
+            a = p1.y - p2.y
+            b = p2.x - p1.x
+            coef = (a, b, a * p1.x + b * p1.y)
+            _set_coef(self, coef)
+            return coef
+
+    a = property(lambda self: self.coefficients[0])
+    b = property(lambda self: self.coefficients[1])
+    c = property(lambda self: self.coefficients[2])
+
     def intersect_line(self, other):
         """ 計算兩直線交點 (使用克拉瑪公式) """
-        det = self.a * other.b - other.a * self.b
+        a1, b1, c1 = self.coefficients
+        a2, b2, c2 = other.coefficients
+        det = a1 * b2 - a2 * b1
         if abs(det) < 1e-9:
             return None # 平行無交點
-        x = (other.b * self.c - self.b * other.c) / det
-        y = (self.a * other.c - other.a * self.c) / det
+        x = (b2 * c1 - b1 * c2) / det
+        y = (a1 * c2 - a2 * c1) / det
         return Point(x, y)
 
     def get_projection(self, p):
@@ -97,15 +168,33 @@ class Line:
         return Line(func(self.p1, *args), func(self.p2, *args))
 
 
+_set_p1, _set_p2, _set_coef = Line.p1.__set__, Line.p2.__set__, Line._coef.__set__
+
+
 class Circle:
-    """ 定義「圓」 """
+    """ 定義「圓」，不可變、可雜湊 (圓心相等且半徑相差在 TOL 格點內即相等) """
+    __slots__ = ("center", "r")
+
     def __init__(self, center, r):
-        self.center = center
-        self.r = r
+        _set_center(self, center)
+        _set_r(self, r)
+
+    __setattr__ = __delattr__ = _frozen
+
+    def __reduce__(self):
+        return Circle, (self.center, self.r)
 
     def __repr__(self):
         return f"Circle(Center={self.center}, R={self.r:.2f})"
 
+    def __eq__(self, other):
+        if not isinstance(other, Circle):
+            return NotImplemented
+        return self.center == other.center and _snap(self.r) == _snap(other.r)
+
+    def __hash__(self):
+        return hash((self.center, _snap(self.r)))
+
     def intersect_line(self, line):
         """ 直線與圓的交點 """
         # 幾何法：先找圓心到直線的投影點(垂足) P
@@ -157,13 +246,62 @@ class Circle:
         return [Point(x4_1, y4_1), Point(x4_2, y4_2)]
 
     def transform(self, func, *args):
-        # 圓的縮放比較特別，半徑也要變，這裡假設均勻縮放
+        # 仿射變換物件 (point_array.Affine) 依矩陣計算半徑，非均勻縮放會拋出 ValueError
+        if hasattr(func, 'transform_circle'):
+            return func.transform_circle(self)
+        # 圓的縮放比較特別，半徑也要變：把圓周上的點一起變換，量出新的半徑
+        # (適用平移、縮放、旋轉等均勻變換，不必依函數名稱判斷)
+        # 每 45 度取一點，到新圓心的距離不一致就不是相似變換 (例如 x、y 縮放不同或切變)，
+        # 與 Affine 一樣拋出 ValueError，而不是默默回傳錯誤的圓
         new_center = func(self.center, *args)
-        # 如果是 scale 操作，args[0] 通常是 factor
-        new_r = self.r
-        if func.__name__ == 'scale':
-             new_r *= args[0]
-        return Circle(new_center, new_r)
+        c, r = self.center, self.r
+        dists = [new_center.distance(func(Point(c.x + r * dx, c.y + r * dy), *args))
+                 for dx, dy in _CIRCLE_SAMPLES]
+        tol = TOL * max(1.0, abs(new_center.x), abs(new_center.y))
+        if any(not math.isclose(d, dists[0], rel_tol=1e-9, abs_tol=tol) for d in dists):
+            raise ValueError("非均勻變換會把圓變成橢圓，無法以 Circle 表示")
+        return Circle(new_center, dists[0])
+
+
+_set_center, _set_r = Circle.center.__set__, Circle.r.__set__
+# Circle.transform 檢查相似變換時取樣的方向 (每 45 度一點)
+_CIRCLE_SAMPLES = [(math.cos(k * math.pi / 4), math.sin(k * math.pi / 4)) for k in range(8)]
+
+
+class PointCache:
+    """
+    近似重複點的 intern 快取：x、y 各相差不超過 tol 的點只保留第一個實例。
+    點登記在邊長 tol 的格子，查詢時檢查相鄰 3x3 格，
+    所以落在格線兩側的近似重複點也能合併 (單靠 Point 的雜湊做不到)。
+    """
+    __slots__ = ("tol", "_cells")
+
+    def __init__(self, tol=TOL):
+        self.tol = tol
+        self._cells = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def intern(self, p):
+        """ 回傳快取中與 p 近似重複的點；沒有的話登記 p 並回傳 p """
+        tol = self.tol
+        try:
+            cx, cy = math.floor(p.x / tol), math.floor(p.y / tol)
+        except (ValueError, OverflowError):
+            return p # NaN / inf 不快取
+        cells = self._cells
+        for dx in (0, -1, 1):
+            for dy in (0, -1, 1):
+                q = cells.get((cx + dx, cy + dy))
+                if q is not None and abs(q.x - p.x) <= tol and abs(q.y - p.y) <= tol:
+                    return q
+        # 同一格內的點必定彼此近似重複，所以每格只需要一個代表點
+        cells[(cx, cy)] = p
+        return p
+
+    def clear(self):
+        self._cells.clear()
 
 
 class Triangle:
@@ -253,5 +391,28 @@ def main():
     tri_rot = tri.transform(Point.rotate, 90, Point(0,0))
     print(f"旋轉後: {tri_rot}")
 
+    # 圓：一般函數也必須是相似變換，x、y 縮放不同時拋出 ValueError
+    print(f"圓放大 2 倍: {circle1.transform(Point.scale, 2)}")
+    try:
+        circle1.transform(lambda p: Point(2 * p.x, p.y))
+    except ValueError as e:
+        print(f"x 放大 2 倍、y 不變: {e}")
+
+    # 5. 近似重複的交點
+    print("\n--- 合併近似重複的交點 ---")
+    # 8 條經過 (1/3, 1/7) 的直線兩兩求交點，浮點誤差讓同一點出現多種座標
+    target = Point(1 / 3, 1 / 7)
+    lines = [Line(target.translate(-math.cos(k), -math.sin(k)), target.translate(math.cos(k), math.sin(k)))
+             for k in range(8)]
+    hits = [l1.intersect_line(l2) for i, l1 in enumerate(lines) for l2 in lines[i + 1:]]
+    hits = [p for p in hits if p is not None]
+    cache = PointCache()
+    print(f"{len(hits)} 個交點，不同座標 {len({(p.x, p.y) for p in hits})} 種，"
+          f"set() 後 {len(set(hits))} 個，PointCache 後 {len({id(cache.intern(p)) for p in hits})} 個")
+    try:
+        target.x = 0
+    except AttributeError as e:
+        print(f"修改座標: {e}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+"""
+習題 6 : 有限體 - 效能比較 (Benchmark)
+目標：比較 list[GF] / GFArray、查表、擴張體乘法，以及各種公理驗證方式的耗時。
+執行：python benchmark.py
+"""
+
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from weak2 import GF, check_distributivity, check_group_axioms, field_context
+from gf_array import GFArray
+from extension_field import ExtensionField, _from_coeffs, _to_coeffs, poly_mod, poly_mul, poly_trim
+from parallel_verify import verify_associativity
+
+def timed(func, *args, repeat=3):
+    """ 取 repeat 次中最快的一次 (秒) """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def allocated(func, *args):
+    """ func 執行結果所佔用的記憶體 (bytes) """
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def bench_gf_array(n=1_000_000, p=1_000_003):
+    """ 1. n 個元素的 + - * /：list[GF] vs GFArray """
+    print(f"=== 1. {n} 個 GF({p}) 元素：list[GF] vs GFArray ===")
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, p, n).tolist()
+    ys = rng.integers(1, p, n).tolist()
+
+    mem_list = allocated(lambda: [GF(v, p) for v in xs])
+    mem_array = allocated(GFArray, xs, p)
+    print(f"記憶體：list[GF] {mem_list / n:6.1f} bytes/元素，GFArray {mem_array / n:4.1f} bytes/元素 "
+          f"(少 {mem_list / mem_array:.0f} 倍)")
+
+    gx, gy = [GF(v, p) for v in xs], [GF(v, p) for v in ys]
+    X, Y = GFArray(xs, p), GFArray(ys, p)
+    for name, op in (("+", lambda a, b: a + b), ("-", lambda a, b: a - b),
+                     ("*", lambda a, b: a * b), ("/", lambda a, b: a / b)):
+        t_list = timed(lambda: [op(a, b) for a, b in zip(gx, gy)], repeat=1)
+        t_array = timed(op, X, Y)
+        print(f"{name}: list[GF] {t_list:7.3f} 秒, GFArray {t_array:7.4f} 秒 (快 {t_list / t_array:5.0f} 倍)")
+    print()
+
+def bench_field_context(n=1_000_000, p=65521):
+    """ 2. 除法：費馬小定理 pow(b, p-2, p) vs field_context 查表 """
+    print(f"=== 2. {n} 次 GF({p}) 除法：費馬小定理 vs 查表 ===")
+    t_build = timed(lambda: field_context.__wrapped__(p), repeat=1)
+    print(f"建立 log / antilog / 反元素表: {t_build:.3f} 秒 (每個 p 只建一次)")
+    rng = np.random.default_rng(0)
+    gx = [GF(v, p) for v in rng.integers(0, p, n).tolist()]
+    gy = [GF(v, p) for v in rng.integers(1, p, n).tolist()]
+
+    ys = [b.val for b in gy]
+    inv = field_context(p).inv
+    t_fermat = timed(lambda: [pow(b, p - 2, p) for b in ys], repeat=1)
+    t_table = timed(lambda: [inv[b] for b in ys], repeat=1)
+    print(f"求反元素：費馬 {t_fermat:.3f} 秒, 查表 {t_table:.3f} 秒 (快 {t_fermat / t_table:.1f} 倍)")
+
+    def fermat_div(a, b):
+        # 改版前的 GF.__truediv__
+        a._check_p(b)
+        if b.val == 0:
+            raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+        return GF(a.val * pow(b.val, a.p - 2, a.p), a.p)
+
+    t_fermat = timed(lambda: [fermat_div(a, b) for a, b in zip(gx, gy)], repeat=1)
+    t_table = timed(lambda: [a / b for a, b in zip(gx, gy)], repeat=1)
+    print(f"GF 除法 (含物件開銷)：費馬 {t_fermat:.3f} 秒, 查表 {t_table:.3f} 秒 (快 {t_fermat / t_table:.1f} 倍)")
+
+    X, Y = GFArray.from_gf_list(gx), GFArray.from_gf_list(gy)
+    t_fermat = timed(lambda: X * Y ** (p - 2))
+    t_table = timed(lambda: X / Y)
+    print(f"GFArray 除法：費馬 {t_fermat:.4f} 秒, 查表 {t_table:.4f} 秒 (快 {t_fermat / t_table:.1f} 倍)\n")
+
+def bench_extension_field(n=200_000):
+    """ 3. GF(2^8) / GF(2^16) 乘法：係數多項式 vs 無進位乘法 vs log/exp 查表 """
+    print(f"=== 3. 擴張體 {n} 次乘法 ===")
+    rng = np.random.default_rng(0)
+    for k in (8, 16):
+        F = ExtensionField(2, k)
+        pairs = [(int(a), int(b)) for a, b in rng.integers(1, F.order, (n, 2))]
+        mod = list(F.modulus)
+
+        def poly_path(a, b):
+            prod = poly_mul(poly_trim(_to_coeffs(a, 2, k)), poly_trim(_to_coeffs(b, 2, k)), 2)
+            return _from_coeffs(poly_mod(prod, mod, 2), 2)
+
+        t_poly = timed(lambda: [poly_path(a, b) for a, b in pairs], repeat=1)
+        t_clmul = timed(lambda: [F._mul_slow(a, b) for a, b in pairs], repeat=1)
+        t_table = timed(lambda: [F.mul(a, b) for a, b in pairs], repeat=1)
+        print(f"{F}: 係數多項式 {t_poly:.3f} 秒, 無進位乘法 {t_clmul:.3f} 秒, 查表 {t_table:.3f} 秒")
+    print()
+
+def quiet(func, *args, **kwargs):
+    """ 不顯示驗證函數的輸出 """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+def bench_axioms(sizes=(31, 101, 1009, 4001), exhaustive_max=101, random_p=100_003):
+    """ 4. 群公理與分配律：三層迴圈 vs 凱萊表 (Light 檢定) vs 隨機抽樣 """
+    print("=== 4. 驗證 GF(p) 的加法群、乘法群與分配律 ===")
+    add, mul = (lambda a, b: a + b), (lambda a, b: a * b)
+
+    def verify_all(elements, method):
+        return (quiet(check_group_axioms, elements, "+", add, 0, method=method)
+                and quiet(check_group_axioms, elements[1:], "*", mul, 1, method=method)
+                and quiet(check_distributivity, elements, method=method))
+
+    for p in sizes:
+        elements = [GF(i, p) for i in range(p)]
+        line = f"p = {p:6d}: "
+        if p <= exhaustive_max:
+            line += f"三層迴圈 {timed(verify_all, elements, 'exhaustive', repeat=1):8.3f} 秒, "
+        else:
+            line += f"三層迴圈 (約 {3 * p ** 3:.1e} 次運算，略過), "
+        line += f"凱萊表 {timed(verify_all, elements, 'table', repeat=1):.3f} 秒"
+        print(line)
+    elements = [GF(i, random_p) for i in range(random_p)]
+    t_random = timed(verify_all, elements, "random", repeat=1)
+    print(f"p = {random_p}: 隨機抽樣 (信賴度 0.999, epsilon 0.01) {t_random:.3f} 秒\n")
+
+def bench_parallel_verify(p=61, workers=None):
+    """ 5. 結合律窮舉：單核三層迴圈 vs 多行程 (verify_associativity) """
+    print(f"=== 5. GF({p}) 加法結合律窮舉：單核 vs 多行程 ===")
+    elements = [GF(i, p) for i in range(p)]
+    add = lambda a, b: a + b
+    t_serial = timed(lambda: quiet(check_group_axioms, elements, "+", add, 0, method="exhaustive"), repeat=1)
+    result = verify_associativity(elements, add, workers, progress=None)
+    print(f"單核: {t_serial:.3f} 秒 (含單位元素與反元素)")
+    print(f"多行程 ({workers or os.cpu_count()} 個 worker): {result.elapsed:.3f} 秒, "
+          f"{result.throughput:.3g} 組/秒")
+    sub = verify_associativity(elements, lambda a, b: a - b, workers, progress=None)
+    print(f"減法找到反例 {sub.counterexample} 即停止: {sub.elapsed:.3f} 秒，只檢查 {sub.checked} 組\n")
+
+if __name__ == "__main__":
+    bench_gf_array()
+    bench_field_context()
+    bench_extension_field()
+    bench_axioms()
+    bench_parallel_verify()
@@ -0,0 +1,386 @@
+"""
+習題 6 (延伸) : 以凱萊表 (Cayley Table) 驗證群與分配律
+weak2.check_group_axioms 的三層迴圈需要 n^3 次運算 (每次都配置新的 GF)，p 上千就跑不完。
+1. 運算表只建一次：T[i, j] = index(e_i op e_j)，GF 元素可用 GFArray 一次算完整張表
+2. 結合律：Light 結合律檢定，只需檢查一組生成元 S，成本 O(n^2 |S|)
+   (GF(p) 的加法群由 1 生成、乘法群由原根生成，|S| 通常只有 1)
+3. 單位元素與反元素：對整張表做列 / 行掃描，O(n^2)
+4. 分配律：加法結合且由 G 生成時，只需檢查 a * (b + g) == a*b + a*g (g 屬於 G)
+5. 隨機模式：不建表，抽樣檢查，並給出信賴度上界
+輸出訊息與 weak2 的逐一檢查相同。
+"""
+
+import math
+import random
+
+import numpy as np
+
+from weak2 import GF
+
+# --- 建表 ---
+
+def _unique(elements):
+    """ 依 .val 去除重複元素 (保持順序) """
+    seen = set()
+    out = []
+    for e in elements:
+        if e.val not in seen:
+            seen.add(e.val)
+            out.append(e)
+    return out
+
+def _as_gf_array(elements):
+    """ 全部是同一個 GF(p) 的元素時回傳對應的 GFArray，否則回傳 None """
+    from gf_array import GFArray
+    if elements and all(isinstance(e, GF) and e.p == elements[0].p for e in elements):
+        return GFArray([e.val for e in elements], elements[0].p)
+    return None
+
+def _vectorized(op_func, x, y, shape, p):
+    """
+    以 GFArray 一次算 op_func(x, y)。只接受同一個 GF(p)、形狀為 shape 的結果；
+    lambda a, b: a 之類會廣播成較小的形狀，回傳常數的運算則根本不是 GFArray，這些都回傳 None，
+    呼叫端改用逐一計算。
+    """
+    try:
+        out = op_func(x, y)
+    except (TypeError, AttributeError, ValueError):
+        return None
+    vals = getattr(out, "val", None)
+    if isinstance(vals, np.ndarray) and vals.shape == shape and getattr(out, "p", None) == p:
+        return out
+    return None
+
+def cayley_table(elements, op_func):
+    """
+    回傳 n x n 的 int 陣列 T，T[i, j] 是 op_func(e_i, e_j) 在 elements 中的索引；
+    結果不在 elements 中 (不封閉) 時為 -1。elements 需已去除重複。
+    op_func 若能作用在 GFArray 上 (例如 lambda a, b: a + b)，整張表一次向量化算完。
+    """
+    n = len(elements)
+    index = {e.val: i for i, e in enumerate(elements)}
+    arr = _as_gf_array(elements)
+    if arr is not None:
+        table = _vectorized(op_func, arr[:, None], arr, (n, n), arr.p)
+        if table is not None:
+            lookup = np.full(arr.p, -1, dtype=np.intp)
+            lookup[arr.val] = np.arange(n)
+            return lookup[table.val.astype(np.intp)]
+    T = np.empty((n, n), dtype=np.intp)
+    for i, a in enumerate(elements):
+        for j, b in enumerate(elements):
+            T[i, j] = index.get(op_func(a, b).val, -1)
+    return T
+
+def generating_set(T):
+    """
+    貪婪地挑選生成元：每次取尚未被生成的最小索引，
+    再以 x op s、s op x (s 屬於 S) 擴展直到不再增加 (只需 T 的少數幾行幾列)。
+    """
+    n = len(T)
+    reached = np.zeros(n, dtype=bool)
+    gens = []
+    while not reached.all():
+        g = int(np.argmin(reached))
+        gens.append(g)
+        frontier = np.flatnonzero(reached) if len(gens) > 1 else np.array([], dtype=np.intp)
+        frontier = np.concatenate([frontier, [g]])
+        reached[g] = True
+        S = np.array(gens)
+        while len(frontier):
+            new = np.concatenate([T[np.ix_(frontier, S)].ravel(), T[np.ix_(S, frontier)].ravel()])
+            new = np.unique(new[new >= 0])
+            frontier = new[~reached[new]]
+            reached[frontier] = True
+    return gens
+
+def associativity_counterexample(T):
+    """
+    Light 結合律檢定：若對生成集合 S 中每個 s，
+        (x op s) op y == x op (s op y)  對所有 x, y 成立，
+    則運算滿足結合律。回傳第一個反例 (i, j, k) 或 None。
+    """
+    for s in generating_set(T):
+        left = T[T[:, s]]        # left[x, y] = (x op s) op y
+        right = T[:, T[s]]       # right[x, y] = x op (s op y)
+        bad = np.argwhere(left != right)
+        if len(bad):
+            x, y = bad[0]
+            return int(x), s, int(y)
+    return None
+
+def associativity_counterexample_full(T):
+    """ 不依賴生成元的向量化完整檢查 (O(n^3)，每次處理一個 a) """
+    for a in range(len(T)):
+        left = T[T[a]]           # left[b, c] = (a op b) op c
+        right = T[a][T]          # right[b, c] = a op (b op c)
+        bad = np.argwhere(left != right)
+        if len(bad):
+            b, c = bad[0]
+            return a, int(b), int(c)
+    return None
+
+def find_identity(T):
+    """ 列掃描與行掃描：T[e, :] 與 T[:, e] 都等於 0..n-1 的 e，沒有則回傳 None """
+    idx = np.arange(len(T))
+    ok = (T == idx).all(axis=1) & (T == idx[:, None]).all(axis=0)
+    hits = np.flatnonzero(ok)
+    return int(hits[0]) if len(hits) else None
+
+def missing_inverse(T, e):
+    """ 回傳第一個沒有雙邊反元素的索引，全部都有則回傳 None """
+    has = ((T == e) & (T.T == e)).any(axis=1)
+    bad = np.flatnonzero(~has)
+    return int(bad[0]) if len(bad) else None
+
+def distributivity_counterexample(M, A):
+    """
+    左分配律 a * (b + c) == a*b + a*c。A 必須是結合的加法表：
+    把 f_a(x) = a * x 看成加法的同態，只需對加法的生成元 g 檢查 f_a(b + g) == f_a(b) + f_a(g)，
+    其餘 c 可寫成生成元的和 (有限群中反元素也是生成元的次方) 而自動成立。
+    """
+    for g in generating_set(A):
+        left = M[:, A[:, g]]                 # left[a, b] = a * (b + g)
+        right = A[M, M[:, g][:, None]]       # right[a, b] = a*b + a*g
+        bad = np.argwhere(left != right)
+        if len(bad):
+            a, b = bad[0]
+            return int(a), int(b), g
+    return None
+
+def distributivity_counterexample_full(M, A):
+    """ 不依賴加法結合律的向量化完整檢查 (O(n^3)，每次處理一個 a) """
+    for a in range(len(M)):
+        left = M[a][A]                            # left[b, c] = a * (b + c)
+        right = A[M[a][:, None], M[a][None, :]]   # right[b, c] = a*b + a*c
+        bad = np.argwhere(left != right)
+        if len(bad):
+            b, c = bad[0]
+            return a, int(b), int(c)
+    return None
+
+def associativity_counterexample_elements(elements, op_func):
+    """
+    運算不封閉時表格裡有 -1，無法查表算 (a op b) op c，改用元素本身運算
+    (中間結果可以不在 elements 中)，與 weak2 逐一檢查的語意與反例順序相同。
+    GF 元素每次處理一個 a，以 GFArray 一次算完 n x n 個 (b, c)；不能向量化時逐一計算。
+    """
+    n = len(elements)
+    arr = _as_gf_array(elements)
+    table = _vectorized(op_func, arr[:, None], arr, (n, n), arr.p) if arr is not None else None
+    if table is not None:                                                       # table[b, c] = b op c
+        for a in range(n):
+            left = _vectorized(op_func, table[a][:, None], arr, (n, n), arr.p)  # (a op b) op c
+            right = _vectorized(op_func, arr[a:a + 1], table, (n, n), arr.p)    # a op (b op c)
+            if left is None or right is None:
+                break   # 這個運算無法對二維陣列向量化，改用下方的逐一計算
+            bad = np.argwhere(left.val != right.val)
+            if len(bad):
+                b, c = bad[0]
+                return a, int(b), int(c)
+        else:
+            return None
+    for i, a in enumerate(elements):
+        for j, b in enumerate(elements):
+            ab = op_func(a, b)
+            for k, c in enumerate(elements):
+                if op_func(ab, c) != op_func(a, op_func(b, c)):
+                    return i, j, k
+    return None
+
+def distributivity_counterexample_elements(elements):
+    """
+    加法或乘法不封閉時表格裡有 -1，改用元素本身運算 (中間結果可以不在 elements 中)，
+    與 weak2 逐一檢查的語意相同。GF 元素每次處理一個 a，以 GFArray 一次算完 n x n 個 (b, c)。
+    """
+    arr = _as_gf_array(elements)
+    if arr is not None:
+        sums = arr[:, None] + arr           # sums[b, c] = b + c
+        products = arr[:, None] * arr       # products[a, b] = a * b
+        for a in range(len(arr)):
+            left = arr[a:a + 1] * sums                            # a * (b + c)
+            right = products[a][:, None] + products[a]            # a*b + a*c
+            bad = np.argwhere(left.val != right.val)
+            if len(bad):
+                b, c = bad[0]
+                return a, int(b), int(c)
+        return None
+    for i, a in enumerate(elements):
+        for j, b in enumerate(elements):
+            for k, c in enumerate(elements):
+                if a * (b + c) != (a * b) + (a * c):
+                    return i, j, k
+    return None
+
+# --- 與 weak2 相同輸出格式的檢查 ---
+
+def check_group_table(elements, operation_name, op_func, identity_val):
+    elements = _unique(elements)
+    print(f"--- 驗證 {operation_name} 群性質 ---")
+    T = cayley_table(elements, op_func)
+    # 與 weak2 的逐一檢查相同，不另外要求封閉性 (weak2 假設封閉性由類別保證)。
+    # 不封閉時 Light 檢定與查表的 (a op b) op c 都不成立，結合律改用元素運算；
+    # 單位元素與反元素只比較 T 中的索引，-1 不會與任何元素相等，可以直接查表
+    if (T < 0).any():
+        bad = associativity_counterexample_elements(elements, op_func)
+    else:
+        bad = associativity_counterexample(T)
+    if bad:
+        a, b, c = (elements[i] for i in bad)
+        print(f"❌ 結合律失敗: ({a}{operation_name}{b}){operation_name}{c} != {a}{operation_name}({b}{operation_name}{c})")
+        return False
+    print("✅ 結合律 (Associativity) 通過")
+
+    e = find_identity(T)
+    if e is None or elements[e].val != identity_val:
+        print(f"❌ 找不到正確的單位元素 (預期 {identity_val})")
+        return False
+    print(f"✅ 單位元素 (Identity) 存在且正確: {elements[e]}")
+
+    bad = missing_inverse(T, e)
+    if bad is not None:
+        print(f"❌ 元素 {elements[bad]} 沒有反元素")
+        return False
+    print("✅ 反元素 (Inverse) 對所有元素皆存在")
+
+    print(f"🎉 {operation_name} 構成一個群 (Group)！\n")
+    return True
+
+def check_distributivity_table(elements):
+    elements = _unique(elements)
+    print("--- 驗證 分配律 (Distributivity) ---")
+    A = cayley_table(elements, lambda a, b: a + b)
+    M = cayley_table(elements, lambda a, b: a * b)
+    # 不封閉時表格無法表示 a * (b + c)，改用元素運算；加法不結合時無法只檢查生成元，改用完整的向量化檢查
+    if (A < 0).any() or (M < 0).any():
+        bad = distributivity_counterexample_elements(elements)
+    elif associativity_counterexample(A) is None:
+        bad = distributivity_counterexample(M, A)
+    else:
+        bad = distributivity_counterexample_full(M, A)
+    if bad:
+        a, b, c = (elements[i] for i in bad)
+        print(f"❌ 分配律失敗: {a} * ({b} + {c}) != {a}*{b} + {a}*{c}")
+        return False
+    print("✅ 分配律 (Distributivity) 通過！\n")
+    return True
+
+# --- 隨機模式 ---
+
+def sample_size(confidence, epsilon):
+    """
+    若至少有 epsilon 比例的三元組違反公理，t 次獨立抽樣全部通過的機率 <= (1 - epsilon)^t。
+    取最小的 t 使 (1 - epsilon)^t <= 1 - confidence。
+    """
+    return math.ceil(math.log(1 - confidence) / math.log(1 - epsilon))
+
+def _sample(elements, arr, rng, t):
+    """ 抽 t 個元素：GF 元素回傳 GFArray (可向量化運算)，否則回傳 list """
+    idx = [rng.randrange(len(elements)) for _ in range(t)]
+    if arr is not None:
+        return arr[np.array(idx)]
+    return [elements[i] for i in idx]
+
+def _first_failure(lhs, rhs):
+    """ 兩邊可能是 GFArray 或 list，回傳第一個不相等的位置 """
+    if isinstance(lhs, list):
+        return next((i for i, (l, r) in enumerate(zip(lhs, rhs)) if l != r), None)
+    bad = np.flatnonzero(lhs.val != rhs.val)
+    return int(bad[0]) if len(bad) else None
+
+def _apply(op_func, xs, ys):
+    if isinstance(xs, list):
+        return [op_func(x, y) for x, y in zip(xs, ys)]
+    return op_func(xs, ys)
+
+def check_group_random(elements, operation_name, op_func, identity_val,
+                       confidence=0.999, epsilon=0.01, seed=None):
+    """
+    隨機驗證：抽 t = sample_size(confidence, epsilon) 組檢查結合律、單位元素與反元素。
+    通過代表「違反比例 >= epsilon」的機率不超過 1 - confidence。
+    """
+    print(f"--- 驗證 {operation_name} 群性質 (隨機抽樣) ---")
+    rng = random.Random(seed)
+    t = sample_size(confidence, epsilon)
+    arr = _as_gf_array(elements)
+
+    A, B, C = (_sample(elements, arr, rng, t) for _ in range(3))
+    bad = _first_failure(_apply(op_func, _apply(op_func, A, B), C), _apply(op_func, A, _apply(op_func, B, C)))
+    if bad is not None:
+        a, b, c = A[bad], B[bad], C[bad]
+        print(f"❌ 結合律失敗: ({a}{operation_name}{b}){operation_name}{c} != {a}{operation_name}({b}{operation_name}{c})")
+        return False
+    print(f"✅ 結合律 (Associativity) 通過 {t} 組抽樣")
+
+    e = next((i for i, x in enumerate(elements) if x.val == identity_val), None)
+    if e is None:
+        print(f"❌ 找不到正確的單位元素 (預期 {identity_val})")
+        return False
+    identity_element = elements[e]
+    E = [identity_element] * t if arr is None else arr[np.full(t, e)]
+    if _first_failure(_apply(op_func, A, E), A) is not None or _first_failure(_apply(op_func, E, A), A) is not None:
+        print(f"❌ 找不到正確的單位元素 (預期 {identity_val})")
+        return False
+    print(f"✅ 單位元素 (Identity) 通過 {t} 組抽樣: {identity_element}")
+
+    # 反元素需要掃描整個集合，每個抽樣元素 O(n)
+    for i in range(min(t, len(elements))):
+        a = A[i]
+        if arr is not None:
+            # 先找右反元素的候選，只對候選檢查左邊
+            cands = np.flatnonzero(op_func(a, arr).val == identity_val)
+            found = bool(len(cands)) and bool(np.any(op_func(arr[cands], a).val == identity_val))
+        else:
+            found = any(op_func(a, b) == identity_element and op_func(b, a) == identity_element
+                        for b in elements)
+        if not found:
+            print(f"❌ 元素 {a} 沒有反元素")
+            return False
+    print(f"✅ 反元素 (Inverse) 通過 {min(t, len(elements))} 個抽樣元素")
+
+    print(f"🎉 {operation_name} 以信賴度 {confidence} 構成一個群 (違反比例 < {epsilon})！\n")
+    return True
+
+def check_distributivity_random(elements, confidence=0.999, epsilon=0.01, seed=None):
+    print("--- 驗證 分配律 (Distributivity，隨機抽樣) ---")
+    rng = random.Random(seed)
+    t = sample_size(confidence, epsilon)
+    arr = _as_gf_array(elements)
+    A, B, C = (_sample(elements, arr, rng, t) for _ in range(3))
+    add = lambda x, y: x + y
+    mul = lambda x, y: x * y
+    left = _apply(mul, A, _apply(add, B, C))
+    right = _apply(add, _apply(mul, A, B), _apply(mul, A, C))
+    bad = _first_failure(left, right)
+    if bad is not None:
+        a, b, c = A[bad], B[bad], C[bad]
+        print(f"❌ 分配律失敗: {a} * ({b} + {c}) != {a}*{b} + {a}*{c}")
+        return False
+    print(f"✅ 分配律 (Distributivity) 通過 {t} 組抽樣 (信賴度 {confidence})！\n")
+    return True
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    from weak2 import check_group_axioms, check_distributivity
+
+    # 凱萊表與 weak2 的三層迴圈必須給出相同的結論，包含不封閉的子集合
+    # (weak2 不檢查封閉性：GF(5) 的 {0, 1, 4} 對 + 、{1, 2, 3} 對 * 都會通過)
+    add, mul = (lambda a, b: a + b), (lambda a, b: a * b)
+    cases = [
+        ("GF(5) {0,1,4} +", check_group_axioms, ([GF(i, 5) for i in (0, 1, 4)], "+", add, 0)),
+        ("GF(5) {1,2,3} *", check_group_axioms, ([GF(i, 5) for i in (1, 2, 3)], "*", mul, 1)),
+        ("GF(7) 加法群", check_group_axioms, ([GF(i, 7) for i in range(7)], "+", add, 0)),
+        ("GF(7) 減法 (不結合)", check_group_axioms, ([GF(i, 7) for i in range(7)], "-", lambda a, b: a - b, 0)),
+        ("GF(7) a op b = a", check_group_axioms, ([GF(i, 7) for i in range(7)], "op", lambda a, b: a, 0)),
+        ("GF(7) \\ {0} 分配律", check_distributivity, ([GF(i, 7) for i in range(1, 7)],)),
+    ]
+    ok = True
+    for name, check, args in cases:
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = check(*args, method="table")
+            exhaustive = check(*args, method="exhaustive")
+        ok &= table == exhaustive
+        print(f"{name:>20}: table = {table}, exhaustive = {exhaustive}")
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
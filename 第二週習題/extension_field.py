@@ -0,0 +1,358 @@
+"""
+習題 6 (延伸) : 擴張體 GF(p^k)
+GF(p) 只能處理質數個元素；編碼與密碼學常用 GF(2^8)、GF(2^16) 等擴張體。
+1. 元素是係數屬於 GF(p)、次數小於 k 的多項式，運算時對一個 k 次不可約多項式取餘數
+2. 自動尋找不可約多項式 (預設找本原多項式，使 x 本身就是乘法群的生成元)
+3. 二元體 (p = 2) 把係數打包成整數的位元，加法是 XOR，乘法是無進位乘法 (carry-less)
+4. 元素個數不超過 EXT_TABLE_MAX 時建立 log / exp 表，乘除與次方都變成查表
+元素的 .val 是係數向量以 p 進位打包成的整數 (0 與 1 仍代表零元素與單位元素)，
+因此 weak2.check_group_axioms / check_distributivity 可以直接使用。
+"""
+
+from weak2 import prime_factors
+
+# 元素個數不超過此值時建立 log / exp 表
+EXT_TABLE_MAX = 1 << 16
+
+# --- GF(p) 係數的多項式運算 (list 由低次到高次，最高次係數不為 0) ---
+
+def poly_trim(a):
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+def poly_sub(a, b, p):
+    n = max(len(a), len(b))
+    a = a + [0] * (n - len(a))
+    b = b + [0] * (n - len(b))
+    return poly_trim([(x - y) % p for x, y in zip(a, b)])
+
+def poly_mul(a, b, p):
+    if not a or not b:
+        return []
+    out = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                out[i + j] = (out[i + j] + x * y) % p
+    return poly_trim(out)
+
+def poly_mod(a, m, p):
+    """ a mod m (m 的最高次係數需可逆) """
+    a = list(a)
+    inv_lead = pow(m[-1], p - 2, p)
+    while len(a) >= len(m):
+        factor = a[-1] * inv_lead % p
+        shift = len(a) - len(m)
+        for i, c in enumerate(m):
+            a[shift + i] = (a[shift + i] - factor * c) % p
+        poly_trim(a)
+    return a
+
+def poly_powmod(a, e, m, p):
+    result = [1]
+    a = poly_mod(a, m, p)
+    while e:
+        if e & 1:
+            result = poly_mod(poly_mul(result, a, p), m, p)
+        a = poly_mod(poly_mul(a, a, p), m, p)
+        e >>= 1
+    return result
+
+def poly_gcd(a, b, p):
+    a, b = poly_trim(list(a)), poly_trim(list(b))
+    while b:
+        a, b = b, poly_mod(a, b, p)
+    return a
+
+def is_irreducible(f, p):
+    """
+    Rabin 不可約檢定：k 次首一多項式 f 在 GF(p) 上不可約，若且唯若
+    x^(p^k) = x (mod f)，且對 k 的每個質因數 q，gcd(x^(p^(k/q)) - x, f) = 1。
+    """
+    k = len(f) - 1
+    # x 也要先 mod f：k = 1 時 x 會化成常數，否則一次多項式永遠判為可約
+    x = poly_mod([0, 1], f, p)
+    if poly_sub(poly_powmod(x, p ** k, f, p), x, p):
+        return False
+    for q in prime_factors(k) if k > 1 else []:
+        h = poly_sub(poly_powmod(x, p ** (k // q), f, p), x, p)
+        if len(poly_gcd(f, h, p)) != 1:
+            return False
+    return True
+
+def is_primitive(f, p):
+    """ 不可約且 x 的乘法階數為 p^k - 1 (x 是生成元) """
+    if not is_irreducible(f, p):
+        return False
+    order = p ** (len(f) - 1) - 1
+    return all(poly_powmod([0, 1], order // r, f, p) != [1] for r in prime_factors(order))
+
+def find_irreducible(p, k, primitive=True):
+    """ 依 p 進位編碼由小到大搜尋第一個 k 次首一的不可約 (或本原) 多項式 """
+    test = is_primitive if primitive else is_irreducible
+    for tail in range(p ** k):
+        f = _to_coeffs(tail, p, k) + [1]
+        if f[0] and test(f, p):
+            return f
+    raise ValueError(f"找不到 {k} 次的不可約多項式")
+
+def _to_coeffs(val, p, k):
+    """ p 進位整數 -> 長度 k 的係數 list (低次在前) """
+    coeffs = []
+    for _ in range(k):
+        val, c = divmod(val, p)
+        coeffs.append(c)
+    return coeffs
+
+def _from_coeffs(coeffs, p):
+    val = 0
+    for c in reversed(coeffs):
+        val = val * p + c
+    return val
+
+def poly_str(coeffs):
+    """ 係數 list (低次在前) -> 'x^2 + 2x + 1' """
+    terms = []
+    for i in range(len(coeffs) - 1, -1, -1):
+        c = coeffs[i]
+        if c == 0:
+            continue
+        power = "" if i == 0 else ("x" if i == 1 else f"x^{i}")
+        terms.append(power if c == 1 and i else f"{c}{power}")
+    return " + ".join(terms) if terms else "0"
+
+def clmul(a, b):
+    """ 無進位乘法：GF(2) 係數的多項式相乘，位元打包成整數 """
+    out = 0
+    while b:
+        if b & 1:
+            out ^= a
+        a <<= 1
+        b >>= 1
+    return out
+
+# --- 擴張體 ---
+
+class ExtensionField:
+    """
+    GF(p^k) = GF(p)[x] / (modulus)。
+    modulus 可省略 (自動找本原多項式)，或給係數 list (低次在前) / p 進位編碼的整數，
+    例如 AES 的 GF(2^8)：ExtensionField(2, 8, modulus=0x11B)。
+    """
+    def __init__(self, p, k, modulus=None):
+        if modulus is None:
+            modulus = find_irreducible(p, k)
+        elif isinstance(modulus, int):
+            modulus = _to_coeffs(modulus, p, k + 1)
+        modulus = [c % p for c in modulus]
+        if len(modulus) != k + 1 or modulus[-1] != 1:
+            raise ValueError(f"modulus 必須是 {k} 次首一多項式")
+        if not is_irreducible(modulus, p):
+            raise ValueError("modulus 不是不可約多項式，GF(p^k) 不是體")
+        self.p = p
+        self.k = k
+        self.order = p ** k
+        self.modulus = tuple(modulus)
+        self._mod_int = _from_coeffs(modulus, p)
+        self.exp = self.log = None
+        if self.order <= EXT_TABLE_MAX:
+            self._build_tables()
+
+    def __repr__(self):
+        return f"GF({self.p}^{self.k})"
+
+    def __eq__(self, other):
+        return isinstance(other, ExtensionField) and (self.p, self.modulus) == (other.p, other.modulus)
+
+    def __hash__(self):
+        return hash((self.p, self.modulus))
+
+    def __call__(self, val):
+        """ 建立元素：val 可以是 p 進位編碼的整數或係數 list """
+        if isinstance(val, (list, tuple)):
+            val = _from_coeffs([c % self.p for c in val], self.p)
+        if not 0 <= val < self.order:
+            raise ValueError(f"元素編碼必須介於 0 與 {self.order - 1}")
+        return GFExt(val, self)
+
+    def elements(self):
+        return [GFExt(v, self) for v in range(self.order)]
+
+    # --- 以整數編碼運算 ---
+
+    def add(self, a, b):
+        if self.p == 2:
+            return a ^ b
+        return _from_coeffs([(x + y) % self.p for x, y in
+                             zip(_to_coeffs(a, self.p, self.k), _to_coeffs(b, self.p, self.k))], self.p)
+
+    def neg(self, a):
+        if self.p == 2:
+            return a
+        return _from_coeffs([-x % self.p for x in _to_coeffs(a, self.p, self.k)], self.p)
+
+    def sub(self, a, b):
+        return self.add(a, self.neg(b))
+
+    def _mul_slow(self, a, b):
+        """ 不查表的乘法：二元體用無進位乘法再約化，其他用係數多項式 """
+        if self.p == 2:
+            prod = clmul(a, b)
+            m, deg = self._mod_int, self.k
+            for shift in range(prod.bit_length() - 1 - deg, -1, -1):
+                if prod >> (shift + deg) & 1:
+                    prod ^= m << shift
+            return prod
+        prod = poly_mul(poly_trim(_to_coeffs(a, self.p, self.k)),
+                        poly_trim(_to_coeffs(b, self.p, self.k)), self.p)
+        return _from_coeffs(poly_mod(prod, list(self.modulus), self.p), self.p)
+
+    def mul(self, a, b):
+        if a == 0 or b == 0:
+            return 0
+        if self.exp is not None:
+            return self.exp[self.log[a] + self.log[b]]
+        return self._mul_slow(a, b)
+
+    def pow(self, a, e):
+        if a == 0:
+            if e < 0:
+                raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+            return 1 if e == 0 else 0
+        n = self.order - 1
+        if self.exp is not None:
+            return self.exp[self.log[a] * e % n]
+        e %= n
+        result = 1
+        while e:
+            if e & 1:
+                result = self._mul_slow(result, a)
+            a = self._mul_slow(a, a)
+            e >>= 1
+        return result
+
+    def inv(self, a):
+        if a == 0:
+            raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+        if self.exp is not None:
+            n = self.order - 1
+            return self.exp[(n - self.log[a]) % n]
+        # a^(p^k - 2) = a^(-1)
+        return self.pow(a, self.order - 2)
+
+    def _build_tables(self):
+        """ 找乘法群的生成元 g，建立 exp[i] = g^i (長度 2(q-1)) 與 log 表 """
+        n = self.order - 1
+        rs = prime_factors(n) if n > 1 else []
+        for g in range(2 if self.order > 2 else 1, self.order):
+            if all(self.pow(g, n // r) != 1 for r in rs):
+                break
+        exp = [1] * (2 * n)
+        for i in range(1, 2 * n):
+            exp[i] = self._mul_slow(exp[i - 1], g)
+        log = [0] * self.order
+        for i in range(n):
+            log[exp[i]] = i
+        self.generator = g
+        self.exp, self.log = exp, log
+
+class GFExt:
+    """
+    GF(p^k) 的元素，介面與 weak2.GF 相同 (+, -, *, /, **, inverse, ==)。
+    val 是係數以 p 進位打包的整數，例如 GF(2^8) 中 0x53 代表 x^6 + x^4 + x + 1。
+    """
+    __slots__ = ("val", "field")
+
+    def __init__(self, val, field):
+        self.val = val
+        self.field = field
+
+    def __repr__(self):
+        return poly_str(self.coeffs)
+
+    @property
+    def coeffs(self):
+        return _to_coeffs(self.val, self.field.p, self.field.k)
+
+    def _check_field(self, other):
+        if self.field is not other.field and self.field != other.field:
+            raise ValueError("Cannot operate on elements from different fields")
+
+    def __add__(self, other):
+        if not isinstance(other, GFExt):
+            return NotImplemented
+        self._check_field(other)
+        return GFExt(self.field.add(self.val, other.val), self.field)
+
+    def __sub__(self, other):
+        if not isinstance(other, GFExt):
+            return NotImplemented
+        self._check_field(other)
+        return GFExt(self.field.sub(self.val, other.val), self.field)
+
+    def __neg__(self):
+        return GFExt(self.field.neg(self.val), self.field)
+
+    def __mul__(self, other):
+        if not isinstance(other, GFExt):
+            return NotImplemented
+        self._check_field(other)
+        return GFExt(self.field.mul(self.val, other.val), self.field)
+
+    def __truediv__(self, other):
+        if not isinstance(other, GFExt):
+            return NotImplemented
+        self._check_field(other)
+        return GFExt(self.field.mul(self.val, self.field.inv(other.val)), self.field)
+
+    def __pow__(self, e):
+        return GFExt(self.field.pow(self.val, e), self.field)
+
+    def inverse(self):
+        return GFExt(self.field.inv(self.val), self.field)
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            return self.val == other
+        if not isinstance(other, GFExt):
+            return NotImplemented
+        return self.val == other.val and self.field == other.field
+
+    def __hash__(self):
+        return hash((self.val, self.field))
+
+if __name__ == "__main__":
+    from weak2 import check_group_axioms, check_distributivity
+
+    # 1. 小的擴張體直接套用原本的驗證函數
+    for p, k in ((2, 2), (3, 2), (2, 3)):
+        F = ExtensionField(p, k)
+        print(f"===== {F}，modulus = {poly_str(F.modulus)} =====\n")
+        elements = F.elements()
+        check_group_axioms(elements, "+", lambda a, b: a + b, 0)
+        check_group_axioms(elements[1:], "*", lambda a, b: a * b, 1)
+        check_distributivity(elements)
+
+    # 2. AES 的 GF(2^8)：modulus x^8 + x^4 + x^3 + x + 1，{53} 與 {CA} 互為反元素
+    aes = ExtensionField(2, 8, modulus=0x11B)
+    a, b = aes(0x53), aes(0xCA)
+    print(f"AES {aes}: {{53}} * {{CA}} = {hex((a * b).val)}, {{53}}^-1 = {hex(a.inverse().val)}")
+    print(f"自動選的 GF(2^8) 本原多項式: {hex(_from_coeffs(find_irreducible(2, 8), 2))}")
+
+    # 3. 一次首一多項式都不可約；GF(7^1) 就是 GF(7)
+    ok = all(is_irreducible([c, 1], 7) for c in range(7))
+    F7 = ExtensionField(7, 1)
+    ok &= F7.order == 7 and all(F7.mul(x, y) == x * y % 7 for x in range(7) for y in range(7))
+    print(f"{F7}，modulus = {poly_str(F7.modulus)}：一次多項式不可約檢查通過 = {ok}")
+
+    # 4. 查表與不查表 (無進位乘法) 的結果必須一致
+    import random
+    random.seed(0)
+    for F in (aes, ExtensionField(2, 16), ExtensionField(3, 5), ExtensionField(2, 20)):
+        for _ in range(2000):
+            x, y = random.randrange(1, F.order), random.randrange(1, F.order)
+            ok &= F.mul(x, y) == F._mul_slow(x, y)
+            ok &= F.mul(x, F.inv(x)) == 1
+        print(f"{F}: 查表 = {F.exp is not None}, 乘法與反元素檢查通過 = {ok}")
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
@@ -0,0 +1,233 @@
+"""
+習題 6 (延伸) : 以陣列儲存的有限體向量 GFArray
+weak2.GF 每個元素都是一個 Python 物件，每次 + - * / 都會再配置一個新物件。
+GFArray 把大量元素的餘數存在同一個 NumPy 陣列裡，只共用一個模數 p：
+1. p 夠小 (p^2 不會超過 int64) 時用 int64 陣列，乘法先相乘再取餘數也不會溢位
+2. p 很大時改用 object 陣列 (元素是 Python int)，仍可向量化運算，只是較慢
+3. 支援 NumPy 的 broadcasting，也可以和 GF 純量、int 直接運算
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from weak2 import GF, SMALL_FIELD_MAX, field_context
+
+# a, b < p 時 a * b 不會超過 int64 上限的最大模數
+INT64_SAFE_P = math.isqrt(np.iinfo(np.int64).max)
+
+def _dtype_for(p):
+    return np.int64 if p <= INT64_SAFE_P else object
+
+@lru_cache(maxsize=None)
+def _inverse_table(p):
+    """ field_context(p).inv 的 NumPy 版本，可直接用陣列索引查表 """
+    table = np.array(field_context(p).inv, dtype=np.int64)
+    table.flags.writeable = False
+    return table
+
+class GFArray:
+    """
+    GF(p) 元素組成的陣列 (任意形狀)，所有元素共用同一個模數 p。
+    GFArray([1, 2, 3], 5) + GF(4, 5) -> GFArray([0, 1, 2], p=5)
+    """
+    __slots__ = ("val", "p")
+    # 讓 ndarray + GFArray 交給 GFArray 的反向運算子處理
+    __array_ufunc__ = None
+
+    def __init__(self, values, p):
+        if isinstance(values, GFArray):
+            values._check_p(p)
+            values = values.val
+        elif isinstance(values, GF):
+            values = values.val
+        elif isinstance(values, (list, tuple)):
+            values = [v.val if isinstance(v, GF) else v for v in values]
+        self.p = p
+        try:
+            self.val = np.asarray(values, dtype=_dtype_for(p)) % p
+        except OverflowError:
+            # 輸入有超過 int64 的整數：先以 Python int 取餘數再轉型
+            self.val = (np.asarray(values, dtype=object) % p).astype(_dtype_for(p))
+
+    @classmethod
+    def _wrap(cls, val, p):
+        """ val 已經落在 [0, p-1]，不必再取一次餘數 """
+        out = cls.__new__(cls)
+        out.val = val
+        out.p = p
+        return out
+
+    @classmethod
+    def from_gf_list(cls, elements):
+        """ 由 GF 物件的 list 建立 (所有元素的 p 必須相同) """
+        p = elements[0].p
+        for e in elements:
+            if e.p != p:
+                raise ValueError("Cannot operate on elements from different fields")
+        return cls([e.val for e in elements], p)
+
+    def to_gf_list(self):
+        return [GF(int(v), self.p) for v in self.val.ravel()]
+
+    def tolist(self):
+        return self.val.tolist()
+
+    # --- 陣列介面 ---
+
+    @property
+    def shape(self):
+        return self.val.shape
+
+    @property
+    def nbytes(self):
+        return self.val.nbytes
+
+    def __len__(self):
+        return len(self.val)
+
+    def __iter__(self):
+        for i in range(len(self.val)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        v = self.val[index]
+        if isinstance(v, np.ndarray):
+            return GFArray._wrap(v, self.p)
+        return GF(int(v), self.p)
+
+    def __setitem__(self, index, value):
+        self.val[index] = self._operand(value)
+
+    def __repr__(self):
+        return f"GFArray({self.val.tolist()}, p={self.p})"
+
+    def _check_p(self, p):
+        if self.p != p:
+            raise ValueError("Cannot operate on elements from different fields")
+
+    def _operand(self, other):
+        """ 把另一個運算元轉成已取餘數的陣列或純量 """
+        if isinstance(other, GFArray):
+            self._check_p(other.p)
+            return other.val
+        if isinstance(other, GF):
+            self._check_p(other.p)
+            return other.val
+        if isinstance(other, (int, np.integer)):
+            return int(other) % self.p
+        return np.asarray(other, dtype=self.val.dtype) % self.p
+
+    # --- 運算子重載 (全部向量化) ---
+
+    def __add__(self, other):
+        # (a + b) mod p，a + b < 2p 不會溢位
+        return GFArray._wrap((self.val + self._operand(other)) % self.p, self.p)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return GFArray._wrap((self.val - self._operand(other)) % self.p, self.p)
+
+    def __rsub__(self, other):
+        return GFArray._wrap((self._operand(other) - self.val) % self.p, self.p)
+
+    def __neg__(self):
+        return GFArray._wrap((-self.val) % self.p, self.p)
+
+    def __mul__(self, other):
+        # (a * b) mod p，int64 時 p <= INT64_SAFE_P 保證 a * b 不溢位
+        return GFArray._wrap(self.val * self._operand(other) % self.p, self.p)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        # (a / b) mod p => a * b^(-1) mod p
+        divisor = np.asarray(self._operand(other), dtype=self.val.dtype)
+        return self * GFArray._wrap(divisor, self.p).inverse()
+
+    def __rtruediv__(self, other):
+        return self.inverse() * other
+
+    def __pow__(self, k):
+        """ 逐元素的 a^k mod p (平方-乘法，O(log k) 次向量運算)；k < 0 時先取反元素 """
+        base = self.inverse() if k < 0 else self
+        k = abs(k)
+        result = np.ones_like(self.val) % self.p
+        b = base.val.copy()
+        while k:
+            if k & 1:
+                result = result * b % self.p
+            b = b * b % self.p
+            k >>= 1
+        return GFArray._wrap(result, self.p)
+
+    def inverse(self):
+        """ 逐元素的乘法反元素：小的 p 查表，否則同 GF 使用費馬小定理 b^(p-2) mod p """
+        if np.any(self.val == 0):
+            raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+        if self.p < SMALL_FIELD_MAX:
+            return GFArray._wrap(_inverse_table(self.p)[self.val], self.p)
+        return self ** (self.p - 2)
+
+    def __eq__(self, other):
+        """ 逐元素比較，回傳 bool 陣列 (與 NumPy 相同) """
+        if isinstance(other, (GFArray, GF)) and other.p != self.p:
+            return np.zeros(self.shape, dtype=bool)
+        return self.val == self._operand(other)
+
+    def __ne__(self, other):
+        return ~(self == other)
+
+    __hash__ = None
+
+    def sum(self, axis=None):
+        """ 以 Python int 累加再取餘數，避免 int64 加總溢位 """
+        total = np.sum(self.val.astype(object), axis=axis) % self.p
+        if isinstance(total, np.ndarray):
+            return GFArray(total, self.p)
+        return GF(int(total), self.p)
+
+if __name__ == "__main__":
+    import sys
+
+    P = 5
+    a = GFArray([0, 1, 2, 3, 4], P)
+    b = GFArray([4, 4, 4, 4, 4], P)
+    print(f"a = {a}")
+    print(f"b = {b}")
+    print(f"a + b = {a + b}")
+    print(f"a - b = {a - b}")
+    print(f"a * b = {a * b}")
+    print(f"a / b = {a / b}")
+    print(f"a + GF(3) = {a + GF(3, P)}  (與 GF 純量運算)")
+    print(f"GF(3) * a = {GF(3, P) * a}")
+    print(f"broadcasting: a[:, None] * a =\n{(GFArray(a.val[:, None], P) * a).val}")
+
+    # 與逐一使用 GF 的結果比對
+    p = 1_000_003
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, p, 10_000)
+    ys = rng.integers(1, p, 10_000)
+    X, Y = GFArray(xs, p), GFArray(ys, p)
+    gx, gy = X.to_gf_list(), Y.to_gf_list()
+    ok = True
+    for name, vec, scalar in (("+", X + Y, [u + v for u, v in zip(gx, gy)]),
+                              ("-", X - Y, [u - v for u, v in zip(gx, gy)]),
+                              ("*", X * Y, [u * v for u, v in zip(gx, gy)]),
+                              ("/", X / Y, [u / v for u, v in zip(gx, gy)])):
+        same = vec.tolist() == [e.val for e in scalar]
+        ok &= same
+        print(f"GF({p}) {name} 與 GF 逐一計算一致: {same}")
+
+    # 大質數 (p^2 超過 int64) 自動改用 object 陣列
+    big = 2 ** 127 - 1
+    Z = GFArray([2 ** 100, 3, big - 1], big)
+    same = (Z * Z / Z).tolist() == Z.tolist()
+    ok &= same
+    print(f"p = 2^127 - 1 (dtype={Z.val.dtype}) 乘除還原: {same}")
+
+    per_gf = sys.getsizeof(GF(1, p)) + sys.getsizeof(p // 2)
+    print(f"每個元素記憶體：GF 物件約 {per_gf} bytes，GFArray {X.nbytes // len(X)} bytes")
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
@@ -0,0 +1,208 @@
+"""
+習題 6 (延伸) : 平行、提早結束的窮舉驗證
+需要真正逐一檢查每個 (a, b, c) 時 (例如 op_func 無法建表，或想要完整證明)，
+check_group_axioms / check_distributivity 的三層迴圈只用一個核心，而且要跑完才知道結果。
+1. 外層元素 a 分給 multiprocessing 的 worker，imap_unordered(chunksize=1) 動態分派
+2. 共用的取消旗標 (Event)：任何 worker 找到反例，其他 worker 在下一個 b 就停下
+3. 執行中定期回報進度與吞吐量 (每秒檢查幾組三元組)
+4. 回傳 VerificationResult (通過與否、反例、檢查數量、耗時)，而不是只有印出訊息
+"""
+
+import multiprocessing as mp
+import os
+import time
+
+# 進度回報的最短間隔 (秒)
+PROGRESS_INTERVAL = 0.5
+
+class VerificationResult:
+    """
+    一次驗證的結果：
+    axiom: "associativity" / "identity" / "inverse" / "distributivity" / "group"
+    counterexample: 反例的元素 tuple (結合律、分配律為 (a, b, c)，反元素為 (a,))
+    checked: 實際檢查的三元組 (或元素配對) 數量
+    """
+    def __init__(self, axiom, passed, counterexample=None, checked=0, elapsed=0.0, identity=None):
+        self.axiom = axiom
+        self.passed = passed
+        self.counterexample = counterexample
+        self.checked = checked
+        self.elapsed = elapsed
+        self.identity = identity
+
+    @property
+    def throughput(self):
+        """ 每秒檢查的數量 """
+        return self.checked / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def __bool__(self):
+        return self.passed
+
+    def __repr__(self):
+        status = "通過" if self.passed else f"失敗，反例 {self.counterexample}"
+        return (f"VerificationResult({self.axiom}: {status}, 檢查 {self.checked} 組, "
+                f"{self.elapsed:.2f} 秒, {self.throughput:.3g} 組/秒)")
+
+def report_progress(checked, total, elapsed):
+    """ 預設的進度回報：同一行更新百分比與吞吐量 """
+    rate = checked / elapsed if elapsed > 0 else 0.0
+    done = checked / total if total else 1.0
+    print(f"\r  進度 {done:6.1%} ({checked}/{total})，{rate:.3g} 組/秒", end="", flush=True)
+
+# --- worker ---
+
+_shared = {}
+
+def _init_worker(elements, op_func, kind, cancel):
+    _shared['elements'] = elements
+    _shared['op'] = op_func
+    _shared['kind'] = kind
+    _shared['cancel'] = cancel
+
+def _check_outer(i):
+    """
+    worker 端：固定外層的 a = elements[i]，檢查所有 (b, c)。
+    每換一個 b 就看一次取消旗標。回傳 (反例索引 或 None, 已檢查數量)。
+    """
+    elements, op, cancel = _shared['elements'], _shared['op'], _shared['cancel']
+    a = elements[i]
+    n = len(elements)
+    checked = 0
+    for j, b in enumerate(elements):
+        if cancel.is_set():
+            break
+        if _shared['kind'] == "associativity":
+            ab = op(a, b)
+            for k, c in enumerate(elements):
+                if op(ab, c) != op(a, op(b, c)):
+                    return (i, j, k), checked + k + 1
+        else:
+            # 分配律: a * (b + c) == a * b + a * c
+            ab = a * b
+            for k, c in enumerate(elements):
+                if a * (b + c) != ab + a * c:
+                    return (i, j, k), checked + k + 1
+        checked += n
+    return None, checked
+
+def _pool_context():
+    # fork 不需要 pickle op_func (可以是 lambda)；沒有 fork 的平台 op_func 必須能被 pickle
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context()
+
+def _run_parallel(elements, kind, op_func=None, workers=None, progress=report_progress):
+    elements = list(elements)
+    n = len(elements)
+    if n == 0:
+        # 空集合沒有任何三元組要檢查，與三層迴圈相同：直接通過，不必啟動行程池
+        return VerificationResult(kind, True)
+    total = n ** 3
+    ctx = _pool_context()
+    cancel = ctx.Event()
+    checked = 0
+    found = None
+    start = last = time.perf_counter()
+    with ctx.Pool(workers or os.cpu_count(), initializer=_init_worker,
+                  initargs=(elements, op_func, kind, cancel)) as pool:
+        for bad, count in pool.imap_unordered(_check_outer, range(n), chunksize=1):
+            checked += count
+            if bad is not None:
+                found = tuple(elements[i] for i in bad)
+                cancel.set()
+                break
+            now = time.perf_counter()
+            if progress and now - last >= PROGRESS_INTERVAL:
+                progress(checked, total, now - start)
+                last = now
+    # 離開 with 時 pool.terminate()，還在跑的 worker 直接結束
+    elapsed = time.perf_counter() - start
+    if progress:
+        progress(checked, total, elapsed)
+        print()
+    return VerificationResult(kind, found is None, found, checked, elapsed)
+
+# --- 對外介面 ---
+
+def verify_associativity(elements, op_func, workers=None, progress=report_progress):
+    """ 平行窮舉 (a op b) op c == a op (b op c)，找到第一個反例就停止 """
+    return _run_parallel(elements, "associativity", op_func, workers, progress)
+
+def verify_distributivity(elements, workers=None, progress=report_progress):
+    """ 平行窮舉 a * (b + c) == a * b + a * c，找到第一個反例就停止 """
+    return _run_parallel(elements, "distributivity", None, workers, progress)
+
+def verify_group(elements, op_func, identity_val, workers=None, progress=report_progress):
+    """
+    完整的群驗證：結合律平行窮舉 (O(n^3))，單位元素與反元素在主行程逐一檢查 (O(n^2))。
+    回傳第一個失敗的 VerificationResult，全部通過時 axiom 為 "group"，identity 為單位元素。
+    """
+    elements = list(elements)
+    result = verify_associativity(elements, op_func, workers, progress)
+    if not result:
+        return result
+    checked, elapsed = result.checked, result.elapsed
+
+    start = time.perf_counter()
+    identity = None
+    for e in elements:
+        checked += len(elements)
+        if all(op_func(a, e) == a and op_func(e, a) == a for a in elements):
+            identity = e
+            break
+    if identity is None or identity.val != identity_val:
+        return VerificationResult("identity", False, None, checked, elapsed + time.perf_counter() - start)
+
+    for a in elements:
+        checked += len(elements)
+        if not any(op_func(a, b) == identity and op_func(b, a) == identity for b in elements):
+            return VerificationResult("inverse", False, (a,), checked, elapsed + time.perf_counter() - start)
+    return VerificationResult("group", True, None, checked, elapsed + time.perf_counter() - start, identity)
+
+def check_group_parallel(elements, operation_name, op_func, identity_val, workers=None):
+    """ 與 weak2.check_group_axioms 相同的輸出，內部使用 verify_group """
+    print(f"--- 驗證 {operation_name} 群性質 (平行窮舉) ---")
+    result = verify_group(elements, op_func, identity_val, workers)
+    if result.axiom == "associativity":
+        a, b, c = result.counterexample
+        print(f"❌ 結合律失敗: ({a}{operation_name}{b}){operation_name}{c} != {a}{operation_name}({b}{operation_name}{c})")
+        return False
+    print("✅ 結合律 (Associativity) 通過")
+    if result.axiom == "identity":
+        print(f"❌ 找不到正確的單位元素 (預期 {identity_val})")
+        return False
+    print(f"✅ 單位元素 (Identity) 存在且正確: {result.identity}")
+    if result.axiom == "inverse":
+        print(f"❌ 元素 {result.counterexample[0]} 沒有反元素")
+        return False
+    print("✅ 反元素 (Inverse) 對所有元素皆存在")
+    print(f"🎉 {operation_name} 構成一個群 (Group)！ ({result.throughput:.3g} 組/秒)\n")
+    return True
+
+def check_distributivity_parallel(elements, workers=None):
+    """ 與 weak2.check_distributivity 相同的輸出，內部使用 verify_distributivity """
+    print("--- 驗證 分配律 (Distributivity，平行窮舉) ---")
+    result = verify_distributivity(elements, workers)
+    if not result:
+        a, b, c = result.counterexample
+        print(f"❌ 分配律失敗: {a} * ({b} + {c}) != {a}*{b} + {a}*{c}")
+        return False
+    print(f"✅ 分配律 (Distributivity) 通過！ ({result.throughput:.3g} 組/秒)\n")
+    return True
+
+if __name__ == "__main__":
+    from weak2 import GF
+
+    P = 101
+    elements = [GF(i, P) for i in range(P)]
+    print(f"GF({P}) 加法結合律，使用 {os.cpu_count()} 個 worker：")
+    print(verify_associativity(elements, lambda a, b: a + b))
+
+    print("減法 (不結合)，找到反例就提早結束：")
+    result = verify_associativity(elements, lambda a, b: a - b)
+    print(result)
+    a, b, c = result.counterexample
+    print(f"反例: ({a} - {b}) - {c} = {(a - b) - c}，{a} - ({b} - {c}) = {a - (b - c)}")
+
+    print("乘法群 (排除 0)：")
+    print(verify_group(elements[1:], lambda a, b: a * b, 1))
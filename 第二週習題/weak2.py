@@ -8,11 +8,102 @@
 5. 實作運算子重載 (+, -, *, /)
 """
 
+from functools import lru_cache
+
+# 小於此值的 p 預先建立 log / antilog / 反元素表
+SMALL_FIELD_MAX = 1 << 16
+
+# --- 體的查表 (Field Context) ---
+
+def prime_factors(n):
+    """ n 的相異質因數 """
+    factors = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            factors.append(d)
+            while n % d == 0:
+                n //= d
+        d += 1
+    if n > 1:
+        factors.append(n)
+    return factors
+
+def primitive_root(p):
+    """
+    找出 GF(p) 的原根 g (g 的次方可以產生所有非零元素)：
+    對 p-1 的每個質因數 q，g^((p-1)/q) != 1。
+    """
+    if p == 2:
+        return 1
+    qs = prime_factors(p - 1)
+    for g in range(2, p):
+        if all(pow(g, (p - 1) // q, p) != 1 for q in qs):
+            return g
+    raise ValueError(f"{p} 不是質數，GF({p}) 不是體")
+
+class FieldContext:
+    """
+    GF(p) 的查表 (p < SMALL_FIELD_MAX)，依 p 快取，同一個 p 的所有 GF 共用：
+    * exp[i] = g^i (antilog)，長度 2(p-1)，log a + log b 不必再取餘數
+    * log[a] = i 使 g^i = a (log[0] 沒有意義)
+    * inv[a] = a^(-1)
+    乘除、次方、反元素都變成查表。
+    """
+    def __init__(self, p):
+        g = primitive_root(p)
+        n = p - 1
+        exp = [1] * (2 * n)
+        for i in range(1, 2 * n):
+            exp[i] = exp[i - 1] * g % p
+        log = [0] * p
+        for i in range(n):
+            log[exp[i]] = i
+        inv = [0] * p
+        for a in range(1, p):
+            inv[a] = exp[(n - log[a]) % n]
+        if sorted(exp[:n]) != list(range(1, p)):
+            raise ValueError(f"{p} 不是質數，GF({p}) 不是體")
+        self.p = p
+        self.g = g
+        self.exp = exp
+        self.log = log
+        self.inv = inv
+
+    def mul(self, a, b):
+        if a == 0 or b == 0:
+            return 0
+        return self.exp[self.log[a] + self.log[b]]
+
+    def div(self, a, b):
+        if b == 0:
+            raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+        if a == 0:
+            return 0
+        return self.exp[self.log[a] - self.log[b] + self.p - 1]
+
+    def pow(self, a, k):
+        if a == 0:
+            if k < 0:
+                raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+            return 1 if k == 0 else 0
+        return self.exp[self.log[a] * k % (self.p - 1)]
+
+@lru_cache(maxsize=None)
+def field_context(p):
+    """ 取得 (並快取) GF(p) 的查表，p 必須小於 SMALL_FIELD_MAX """
+    if p >= SMALL_FIELD_MAX:
+        raise ValueError(f"p 必須小於 {SMALL_FIELD_MAX} 才建立查表")
+    return FieldContext(p)
+
 class GF:
     """
     有限體元素類別 (Galois Field Element)
     代表 GF(p) 中的一個數字
+    大量元素請改用 gf_array.GFArray (共用模數、以 NumPy 陣列儲存)
     """
+    __slots__ = ("val", "p")
+
     def __init__(self, val, p):
         self.val = val % p
         self.p = p
@@ -23,33 +114,61 @@ class GF:
     # --- 運算子重載 (Operator Overloading) ---
     
     def __add__(self, other):
+        if not isinstance(other, GF):
+            return NotImplemented
         # (a + b) mod p
         self._check_p(other)
         return GF(self.val + other.val, self.p)
 
     def __sub__(self, other):
+        if not isinstance(other, GF):
+            return NotImplemented
         # (a - b) mod p
         self._check_p(other)
         return GF(self.val - other.val, self.p)
 
     def __mul__(self, other):
-        # (a * b) mod p
+        if not isinstance(other, GF):
+            return NotImplemented
+        # (a * b) mod p：小的 p 也不查表。CPython 中一次乘法加取餘數 (約 0.10 微秒)
+        # 比 exp[log[a] + log[b]] 加上判斷 0 (約 0.13 微秒) 更快，查表只用在除法、次方與反元素
         self._check_p(other)
         return GF(self.val * other.val, self.p)
 
     def __truediv__(self, other):
+        if not isinstance(other, GF):
+            return NotImplemented
         # (a / b) mod p => a * b^(-1) mod p
         self._check_p(other)
         if other.val == 0:
             raise ZeroDivisionError("Cannot divide by zero in Finite Field")
         
-        # 使用費馬小定理求乘法反元素: b^(p-2) mod p
-        inverse = pow(other.val, self.p - 2, self.p)
-        return GF(self.val * inverse, self.p)
+        # 小的 p 直接查表；大的 p 使用費馬小定理求乘法反元素: b^(p-2) mod p
+        # (p < SMALL_FIELD_MAX 但不是質數時，建表會拋出 ValueError；費馬小定理在合數模數下本來就不成立)
+        if self.p < SMALL_FIELD_MAX:
+            return GF(field_context(self.p).div(self.val, other.val), self.p)
+        return GF(self.val * pow(other.val, self.p - 2, self.p), self.p)
+
+    def __pow__(self, k):
+        # a^k mod p，k 可以是負數 (先取反元素)；小的 p 查表，因此模數必須是質數 (見 __truediv__)
+        if self.p < SMALL_FIELD_MAX:
+            return GF(field_context(self.p).pow(self.val, k), self.p)
+        if k < 0:
+            return self.inverse() ** -k
+        return GF(pow(self.val, k, self.p), self.p)
+
+    def inverse(self):
+        if self.val == 0:
+            raise ZeroDivisionError("Cannot divide by zero in Finite Field")
+        if self.p < SMALL_FIELD_MAX:
+            return GF(field_context(self.p).inv[self.val], self.p)
+        return GF(pow(self.val, self.p - 2, self.p), self.p)
 
     def __eq__(self, other):
         if isinstance(other, int):
             return self.val == (other % self.p)
+        if not isinstance(other, GF):
+            return NotImplemented
         return self.val == other.val and self.p == other.p
 
     def _check_p(self, other):
@@ -58,14 +177,29 @@ class GF:
 
 # --- 驗證邏輯 (Axiom Verification) ---
 
-def check_group_axioms(elements, operation_name, op_func, identity_val):
+def check_group_axioms(elements, operation_name, op_func, identity_val, method="table", **options):
     """
     驗證是否符合群 (Group) 的定義：
     1. 封閉性 (Closure) - 由類別定義保證
     2. 結合律 (Associativity): (a op b) op c == a op (b op c)
     3. 單位元素 (Identity): a op e == a
     4. 反元素 (Inverse): a op a' == e
+    method: "table" (預設，以凱萊表驗證，見 cayley.py)、"random" (隨機抽樣，
+    options 可給 confidence / epsilon / seed)、"parallel" (多行程窮舉，options 可給 workers，
+    見 parallel_verify.py)、"exhaustive" (下方的三層迴圈)
     """
+    if method == "table":
+        from cayley import check_group_table
+        return check_group_table(elements, operation_name, op_func, identity_val)
+    if method == "random":
+        from cayley import check_group_random
+        return check_group_random(elements, operation_name, op_func, identity_val, **options)
+    if method == "parallel":
+        from parallel_verify import check_group_parallel
+        return check_group_parallel(elements, operation_name, op_func, identity_val, **options)
+    if method != "exhaustive":
+        raise ValueError(f"未知的 method: {method}")
+
     print(f"--- 驗證 {operation_name} 群性質 ---")
     
     # 1. 檢查結合律
@@ -111,10 +245,23 @@ def check_group_axioms(elements, operation_name, op_func, identity_val):
     print(f"🎉 {operation_name} 構成一個群 (Group)！\n")
     return True
 
-def check_distributivity(elements):
+def check_distributivity(elements, method="table", **options):
     """
     驗證分配律: a * (b + c) == a * b + a * c
+    method 同 check_group_axioms
     """
+    if method == "table":
+        from cayley import check_distributivity_table
+        return check_distributivity_table(elements)
+    if method == "random":
+        from cayley import check_distributivity_random
+        return check_distributivity_random(elements, **options)
+    if method == "parallel":
+        from parallel_verify import check_distributivity_parallel
+        return check_distributivity_parallel(elements, **options)
+    if method != "exhaustive":
+        raise ValueError(f"未知的 method: {method}")
+
     print("--- 驗證 分配律 (Distributivity) ---")
     for a in elements:
         for b in elements:
@@ -140,4 +287,24 @@ if __name__ == "__main__":
     # 產生 GF(5) 的所有元素: {0, 1, 2, 3, 4}
     all_elements = [GF(i, P) for i in range(P)]
     
-    # 產生乘法群元素 (排除
+    # 產生乘法群元素 (排除 0): {1, 2, 3, 4}
+    non_zero_elements = [GF(i, P) for i in range(1, P)]
+
+    # 1. 加法群
+    check_group_axioms(all_elements, "+", lambda a, b: a + b, 0)
+
+    # 2. 乘法群 (排除 0)
+    check_group_axioms(non_zero_elements, "*", lambda a, b: a * b, 1)
+
+    # 3. 分配律
+    check_distributivity(all_elements)
+
+    # 4. 運算子重載範例
+    print("--- 運算子重載 使用範例 ---")
+    a = GF(3, P)
+    b = GF(4, P)
+    print(f"a = {a}, b = {b} (in GF({P}))")
+    print(f"a + b = {a} + {b} = {a + b}")
+    print(f"a - b = {a} - {b} = {a - b}")
+    print(f"a * b = {a} * {b} = {a * b}")
+    print(f"a / b = {a} / {b} = {a / b}")
@@ -0,0 +1,134 @@
+"""
+第八週習題 (延伸) : 大量指標的批次檢定
+一次實驗要對上萬個指標做同樣的 t 檢定；week8 每次呼叫只處理一個 list，p-value 也是逐一查表。
+1. 資料是 2-D NumPy 陣列，每一欄 (column) 是一個檢定，列是觀測值
+2. 各欄的樣本數可以不同 (ragged)：沒有資料的位置填 NaN，計算時忽略
+3. 所有 t 分數用少數幾個陣列運算算完，p-value 只呼叫一次向量化的 t 分佈 (distributions.t_two_sided_array)
+4. 可選的 Benjamini-Hochberg 校正 (控制 false discovery rate)
+"""
+
+import numpy as np
+
+from distributions import t_two_sided_array
+
+def _column_stats(data):
+    """ 每一欄忽略 NaN 後的 (n, mean, M2)，M2 = sum((x - mean)^2) """
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim == 1:
+        data = data[:, None]
+    if data.ndim != 2:
+        raise ValueError(f"資料必須是 2-D 陣列 (列: 觀測值, 欄: 檢定)，收到 {data.shape}")
+    mask = ~np.isnan(data)
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.sum(data, axis=0, where=mask) / n
+    m2 = np.sum(np.square(data - mean), axis=0, where=mask)
+    return n, mean, m2
+
+def benjamini_hochberg(p_values):
+    """
+    Benjamini-Hochberg 校正後的 p-value (q-value)：
+    由小到大排序，q_(i) = min_{j >= i} p_(j) * m / j，超過 1 以 1 計。NaN 不列入 m，結果仍為 NaN。
+    """
+    p = np.asarray(p_values, dtype=np.float64)
+    q = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    if m == 0:
+        return q
+    order = valid[np.argsort(p[valid])]
+    scaled = p[order] * m / np.arange(1, m + 1)
+    q[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    return q
+
+def _finish(t_scores, df, correction):
+    # 雙尾 P-value，一次算完所有欄 (df <= 0 或 t 為 NaN 時回傳 NaN)
+    p_values = t_two_sided_array(t_scores, df)
+    if correction is None:
+        return t_scores, p_values
+    if correction in ("bh", "fdr_bh"):
+        return t_scores, benjamini_hochberg(p_values)
+    raise ValueError(f"不支援的校正方法: {correction!r} (可用: None, 'bh')")
+
+def t_test_one_sample_batch(data, pop_mean=0.0, correction=None):
+    """
+    每一欄做單樣本 T 檢定：t = (x_bar - mu) / (s / sqrt(n))，df = n - 1。
+    pop_mean 可以是純量或每欄一個值。回傳 (t 分數陣列, p-value 陣列)。
+    """
+    n, mean, m2 = _column_stats(data)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        se = np.sqrt(m2 / (n - 1)) / np.sqrt(n)
+        t_scores = (mean - pop_mean) / se
+    return _finish(t_scores, n - 1, correction)
+
+def t_test_independent_batch(data1, data2, correction=None):
+    """
+    每一欄做雙樣本獨立 T 檢定 (合併變異數)，data1 與 data2 的欄數必須相同，列數可以不同。
+    sp^2 = (M2_1 + M2_2) / (n1 + n2 - 2)，t = (x1_bar - x2_bar) / (sp * sqrt(1/n1 + 1/n2))
+    """
+    n1, m1, ss1 = _column_stats(data1)
+    n2, m2, ss2 = _column_stats(data2)
+    if n1.shape != n2.shape:
+        raise ValueError("兩組資料的欄數 (檢定數) 必須相同")
+    df = n1 + n2 - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sp = np.sqrt((ss1 + ss2) / df)
+        t_scores = (m1 - m2) / (sp * np.sqrt(1 / n1 + 1 / n2))
+    return _finish(t_scores, df, correction)
+
+def t_test_paired_batch(data_before, data_after, correction=None):
+    """ 每一欄做配對 T 檢定 = 差值 (after - before) 的單樣本檢定；任一邊是 NaN 的配對會被略過 """
+    before = np.asarray(data_before, dtype=np.float64)
+    after = np.asarray(data_after, dtype=np.float64)
+    if before.shape != after.shape:
+        raise ValueError("配對樣本數量必須相同")
+    return t_test_one_sample_batch(after - before, 0.0, correction)
+
+def ragged(columns):
+    """ 長度不同的多組資料 -> 以 NaN 補齊的 2-D 陣列 (每組一欄) """
+    length = max((len(c) for c in columns), default=0)
+    out = np.full((length, len(columns)), np.nan)
+    for j, col in enumerate(columns):
+        out[:len(col), j] = col
+    return out
+
+if __name__ == "__main__":
+    from scipy import stats
+    from week8 import t_test_one_sample, t_test_independent, t_test_paired
+
+    rng = np.random.default_rng(0)
+    k = 2000
+    # 每欄樣本數不同；前 10% 的指標真的有效果 (平均 0.5)
+    sizes1 = rng.integers(5, 60, k)
+    sizes2 = rng.integers(5, 60, k)
+    effect = np.where(np.arange(k) < k // 10, 0.5, 0.0)
+    group1 = [rng.normal(effect[j], 1, sizes1[j]) for j in range(k)]
+    group2 = [rng.normal(0, 1, sizes2[j]) for j in range(k)]
+    A, B = ragged(group1), ragged(group2)
+
+    def max_diff(batch, scalar):
+        return max(np.max(np.abs(batch[0] - [t for t, _ in scalar])),
+                   np.max(np.abs(batch[1] - [p for _, p in scalar])))
+
+    print(f"=== {k} 個指標，每欄 5~60 筆 (NaN 補齊) ===")
+    err_one = max_diff(t_test_one_sample_batch(A, 0.0), [t_test_one_sample(g, 0.0) for g in group1])
+    print(f"單樣本: 與 week8.t_test_one_sample 最大差異 {err_one:.2e}")
+    err_ind = max_diff(t_test_independent_batch(A, B), [t_test_independent(a, b) for a, b in zip(group1, group2)])
+    print(f"雙樣本獨立: 與 week8.t_test_independent 最大差異 {err_ind:.2e}")
+    pairs = [(a[:min(len(a), len(b))], b[:min(len(a), len(b))]) for a, b in zip(group1, group2)]
+    err_pair = max_diff(t_test_paired_batch(ragged([a for a, _ in pairs]), ragged([b for _, b in pairs])),
+                        [t_test_paired(a, b) for a, b in pairs])
+    print(f"配對: 與 week8.t_test_paired 最大差異 {err_pair:.2e}")
+
+    # 多重比較：BH 校正
+    t, p = t_test_independent_batch(A, B)
+    _, q = t_test_independent_batch(A, B, correction="bh")
+    err_bh = np.max(np.abs(q - stats.false_discovery_control(p)))
+    hits_raw, hits_bh = p < 0.05, q < 0.05
+    false_raw = int(np.sum(hits_raw & (effect == 0)))
+    false_bh = int(np.sum(hits_bh & (effect == 0)))
+    print(f"\np < 0.05: {int(hits_raw.sum())} 個顯著 (其中 {false_raw} 個其實沒有效果)")
+    print(f"BH q < 0.05: {int(hits_bh.sum())} 個顯著 (其中 {false_bh} 個其實沒有效果)，與 scipy 差異 {err_bh:.2e}")
+
+    ok = max(err_one, err_ind, err_pair, err_bh) < 1e-9
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
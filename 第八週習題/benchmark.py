@@ -0,0 +1,131 @@
+"""
+習題 8 : 機率統計 - 效能比較 (Benchmark)
+目標：比較各種檢定實作的耗時與記憶體用量。
+執行：python benchmark.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from week8 import t_test_one_sample, t_test_independent
+from batch_tests import t_test_one_sample_batch, t_test_independent_batch
+from resampling import permutation_test, bootstrap_ci
+from sequential import SequentialTTest
+
+def timed(func, *args, repeat=3):
+    """ 取 repeat 次中最快的一次 (秒) """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(func, *args):
+    """ func 執行期間的記憶體峰值 (bytes) """
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def source(n, chunk=100_000, seed=0):
+    """ 模擬從磁碟逐段讀出的欄位：一次只產生 chunk 筆 """
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk):
+        yield from rng.normal(0.01, 1, min(chunk, n - start)).tolist()
+
+def bench_streaming(n=5_000_000):
+    """ 1. 單樣本 t 檢定：先載入成 list vs 串流 (單次掃描累加器) """
+    print(f"=== 1. {n} 筆資料的單樣本 t 檢定 ===")
+    load = lambda: t_test_one_sample(list(source(n)), 0)
+    stream = lambda: t_test_one_sample(source(n), 0)
+    print(f"載入 list: {timed(load, repeat=1):.2f} 秒，記憶體峰值 {peak_memory(load) / 2**20:7.1f} MiB")
+    print(f"串流:      {timed(stream, repeat=1):.2f} 秒，記憶體峰值 {peak_memory(stream) / 2**20:7.1f} MiB\n")
+
+def bench_batch(k=10_000, n=200):
+    """ 2. k 個指標各做一次 t 檢定：逐欄呼叫 week8 vs 2-D 陣列批次 """
+    print(f"=== 2. {k} 個指標 x {n} 筆觀測 ===")
+    rng = np.random.default_rng(0)
+    A, B = rng.normal(0, 1, (n, k)), rng.normal(0, 1, (n, k))
+    cols_a, cols_b = A.T.tolist(), B.T.tolist()
+    t_loop = timed(lambda: [t_test_one_sample(c, 0) for c in cols_a], repeat=1)
+    t_batch = timed(t_test_one_sample_batch, A, 0)
+    print(f"單樣本: 逐欄 {t_loop:.3f} 秒 / 批次 {t_batch:.4f} 秒 (快 {t_loop / t_batch:.0f} 倍)")
+    t_loop = timed(lambda: [t_test_independent(a, b) for a, b in zip(cols_a, cols_b)], repeat=1)
+    t_batch = timed(t_test_independent_batch, A, B)
+    print(f"雙樣本獨立: 逐欄 {t_loop:.3f} 秒 / 批次 {t_batch:.4f} 秒 (快 {t_loop / t_batch:.0f} 倍)\n")
+
+def startup(code, repeat=5):
+    """ 新開一個 Python 執行 code：回傳 (最快的耗時秒數, 最大常駐記憶體 MiB)，需要 Linux 的 /proc """
+    # VmHWM 是這個行程自己的記憶體峰值 (ru_maxrss 在 fork 後會沿用父行程的峰值)
+    probe = code + "; print(open('/proc/self/status').read().split('VmHWM:')[1].split()[0])"
+    here = os.path.dirname(os.path.abspath(__file__))
+    best, rss = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", probe], cwd=here, capture_output=True, text=True, check=True)
+        best = min(best, time.perf_counter() - start)
+        rss = int(out.stdout.split()[-1])
+    return best, rss / 1024
+
+def bench_import():
+    """ 3. 短命 worker 的啟動成本：import week8 (內建 p-value) vs 另外載入 scipy.stats (舊版的 import) """
+    print("=== 3. 啟動一個 Python 並 import ===")
+    for name, code in (("python 本身", "pass"),
+                       ("import week8", "import week8"),
+                       ("import week8 + scipy.stats (舊版)", "import week8; from scipy import stats")):
+        t, rss = startup(code)
+        print(f"{name:>32}: {t:.3f} 秒，最大記憶體 {rss:6.1f} MiB")
+    print()
+
+def bench_resampling(n_resamples=1_000_000, size=100):
+    """ 4. 10^6 次重抽樣：兩組各 size 筆 (偏態資料)，使用全部 CPU """
+    print(f"=== 4. {n_resamples} 次重抽樣，兩組各 {size} 筆，{os.cpu_count()} 個 CPU ===")
+    rng = np.random.default_rng(0)
+    x, y = rng.lognormal(0, 1, size), rng.lognormal(0.2, 1, size)
+    runs = (("排列檢定 (合併 t)", lambda: permutation_test(x, y, "t", n_resamples=n_resamples, seed=0)),
+            ("排列檢定 (配對 t，翻轉正負號)", lambda: permutation_test(x, y, "t", paired=True, n_resamples=n_resamples, seed=0)),
+            ("bootstrap 信賴區間 (平均差)", lambda: bootstrap_ci(x, y, n_resamples=n_resamples, seed=0)),
+            ("排列檢定 target_se=0.001", lambda: permutation_test(x, y, "t", n_resamples=n_resamples, target_se=0.001, seed=0)))
+    for name, run in runs:
+        res = run()
+        print(f"{name:>24}: {res.elapsed:.2f} 秒 ({res.n_resamples} 次，{res.n_resamples / res.elapsed:.3g} 次/秒)")
+    print()
+
+def bench_sequential(events=200_000, look_every=1_000):
+    """ 5. 線上 A/B：每 look_every 筆看一次結果，重跑 t_test_independent (全部歷史) vs SequentialTTest """
+    print(f"=== 5. {events} 筆事件，每 {look_every} 筆看一次結果 ===")
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 2, events)
+    values = rng.normal(0, 1, events)
+
+    def rerun():
+        history = ([], [])
+        for start in range(0, events, look_every):
+            for g, v in zip(groups[start:start + look_every].tolist(), values[start:start + look_every].tolist()):
+                history[g].append(v)
+            t_test_independent(*history)
+
+    def incremental():
+        test = SequentialTTest()
+        for start in range(0, events, look_every):
+            test.ingest(groups[start:start + look_every], values[start:start + look_every])
+            test.t_score, test.p_value
+
+    t_rerun = timed(rerun, repeat=1)
+    t_inc = timed(incremental)
+    print(f"每次重跑全部歷史: {t_rerun:.3f} 秒 (記憶體隨事件數成長)")
+    print(f"SequentialTTest: {t_inc:.4f} 秒 (快 {t_rerun / t_inc:.0f} 倍，{events / t_inc * 60:.3g} 筆/分鐘，記憶體固定)\n")
+
+if __name__ == "__main__":
+    bench_streaming()
+    bench_batch()
+    bench_import()
+    bench_resampling()
+    bench_sequential()
@@ -0,0 +1,316 @@
+"""
+第八週習題 (延伸) : 不依賴 scipy 的 P-value 計算
+week8 原本只為了查 stats.norm.cdf / stats.t.cdf 就在 import 時載入整個 scipy.stats (約 1 秒)。
+1. 常態分佈：Phi(z) = erfc(-z / sqrt(2)) / 2，直接用 math.erfc，尾端也不會因為 1 - cdf 而失去精度
+2. t 分佈：雙尾機率 P(|T| > t) = I_x(df/2, 1/2)，x = df / (df + t^2)，
+   I_x(a, b) 是正規化不完全 beta 函數，以連分數 (modified Lentz 法) 計算
+3. df 很大時 x 非常接近 1，連分數會把 x 的捨入誤差放大 df 倍；
+   此時改用 DiDonato & Morris 的漸近級數 (BGRAT)，b = 1/2 時首項正好是 erfc，也只需要 math.erfc
+4. 陣列版本 (批次檢定用) 一次對所有元素做連分數 / 級數迭代
+scipy 只在 verify_against_scipy() 中才載入，用來比對精度。
+"""
+
+import math
+
+import numpy as np
+
+# 連分數的收斂門檻、最大迭代次數，以及避免除以 0 的極小值
+EPS = 1e-16
+MAX_ITER = 100_000
+FPMIN = 1e-300
+
+# --- 常態分佈 ---
+
+def norm_cdf(z):
+    """ 標準常態分佈的 CDF """
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+def norm_sf(z):
+    """ 右尾機率 P(Z > z) = 1 - Phi(z)，不經過減法 """
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+# --- 不完全 beta 函數 ---
+
+def _stirling_tail(z):
+    """ ln Gamma(z) 的 Stirling 級數中 1/z 以後的項 (z >= 10 時誤差 < 1e-17) """
+    z2 = z * z
+    return (1 / 12 - (1 / 360 - (1 / 1260 - 1 / (1680 * z2)) / z2) / z2) / z
+
+def _log_gamma_ratio_half(a):
+    """ ln Gamma(a + 1/2) - ln Gamma(a)；a 大時兩個 lgamma 相減會抵消，改用 Stirling 級數相減 """
+    if a < 10:
+        return math.lgamma(a + 0.5) - math.lgamma(a)
+    # (a)ln(a + 1/2) - (a - 1/2)ln(a) - 1/2 = a*log1p(1/(2a)) + ln(a)/2 - 1/2
+    return a * math.log1p(0.5 / a) + 0.5 * math.log(a) - 0.5 + _stirling_tail(a + 0.5) - _stirling_tail(a)
+
+def log_beta(a, b):
+    """ ln B(a, b)；其中一個參數為 1/2 時 (t 分佈) 使用精確的比值公式 """
+    if b == 0.5:
+        a, b = b, a
+    if a == 0.5:
+        return 0.5 * math.log(math.pi) - _log_gamma_ratio_half(b)
+    return math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+
+def _betacf(a, b, x):
+    """ 不完全 beta 函數的連分數 (modified Lentz 法) """
+    qab, qap, qam = a + b, a + 1, a - 1
+    c = 1.0
+    d = 1 - qab * x / qap
+    d = 1 / (d if abs(d) > FPMIN else FPMIN)
+    h = d
+    for m in range(1, MAX_ITER + 1):
+        m2 = 2 * m
+        # 偶數項
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > FPMIN else FPMIN)
+        c = 1 + aa / c
+        c = c if abs(c) > FPMIN else FPMIN
+        h *= d * c
+        # 奇數項
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > FPMIN else FPMIN)
+        c = 1 + aa / c
+        c = c if abs(c) > FPMIN else FPMIN
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < EPS:
+            return h
+    raise ArithmeticError(f"不完全 beta 函數的連分數未收斂 (a={a}, b={b}, x={x})")
+
+def betainc(a, b, x, y=None):
+    """
+    正規化不完全 beta 函數 I_x(a, b)。y = 1 - x 可以另外傳入，避免 x 接近 1 時的減法誤差。
+    x 大於 (a + 1) / (a + b + 2) 時連分數收斂慢，改算 1 - I_{1-x}(b, a)。
+    """
+    if y is None:
+        y = 1 - x
+    if x <= 0:
+        return 0.0
+    if y <= 0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1 - betainc(b, a, y, x)
+    # ln x 與 ln(1 - x) 都從較小的那一個計算：x 接近 1 時 a * ln(x) 會把 x 的捨入誤差放大 a 倍
+    log_x = math.log1p(-y) if y < 0.5 else math.log(x)
+    log_y = math.log1p(-x) if x < 0.5 else math.log(y)
+    front = math.exp(a * log_x + b * log_y - log_beta(a, b))
+    return front * _betacf(a, b, x) / a
+
+# --- 大 a 的漸近級數 (DiDonato & Morris, BGRAT) ---
+
+# a 至少這麼大 (df >= 30) 且 x > 1/2 時改用 BGRAT
+BGRAT_MIN_A = 15
+BGRAT_TERMS = 30
+
+def _bgrat_coefficients(b, terms):
+    """ BGRAT 的係數 p_n (只和 b 有關)：p_0 = 1，n p_n = sum_{m=1}^{n-1} (m b - n) p_{n-m} / (2m+1)! + n (b-1) / (2n+1)! """
+    p = [1.0]
+    for n in range(1, terms):
+        pn = sum((m * b - n) * p[n - m] / math.factorial(2 * m + 1) for m in range(1, n))
+        p.append(pn / n + (b - 1) / math.factorial(2 * n + 1))
+    return p
+
+_BGRAT_P = _bgrat_coefficients(0.5, BGRAT_TERMS)
+
+def _bgrat_half(a, x, y):
+    """
+    I_x(a, 1/2)，a 大、x 接近 1 時使用。令 T = a - 1/4、u = -T ln x (由 y 計算 ln x，不受 x 的捨入影響)：
+        I_x(a, 1/2) = Gamma(a + 1/2) / (Gamma(a) sqrt(T)) * h * sum_n p_n J_n
+    其中 h = sqrt(u) e^{-u} / sqrt(pi)，J_0 = erfc(sqrt(u)) / h，J_n 由遞迴式求得。
+    """
+    b = 0.5
+    t = a - 0.25
+    lx = math.log1p(-y) if y < 0.35 else math.log(x)
+    u = -t * lx
+    if u == 0:
+        return 1.0
+    h = math.sqrt(u) * math.exp(-u) / math.sqrt(math.pi)
+    if h == 0:
+        return 0.0
+    prefix = h * math.exp(_log_gamma_ratio_half(a)) / math.sqrt(t)
+    j = math.erfc(math.sqrt(u)) / h
+    total = prefix * j
+    lx2 = (lx / 2) ** 2
+    lxp = 1.0
+    t4 = 4 * t * t
+    b2n = b
+    for pn in _BGRAT_P[1:]:
+        j = (b2n * (b2n + 1) * j + (u + b2n + 1) * lxp) / t4
+        lxp *= lx2
+        b2n += 2
+        term = prefix * pn * j
+        total += term
+        if abs(term) < EPS * abs(total):
+            break
+    return total
+
+# --- t 分佈 ---
+
+def _t_split(t, df):
+    """ x = df / (df + t^2) 與 1 - x = t^2 / (df + t^2)，分別計算以保留精度 """
+    t2 = t * t
+    return df / (df + t2), t2 / (df + t2)
+
+def t_two_sided(t, df):
+    """ 雙尾機率 P(|T| > |t|) = I_x(df/2, 1/2)；與 t_two_sided_array 相同，t 或 df 為 NaN、df <= 0 時回傳 NaN """
+    if math.isnan(t) or math.isnan(df) or df <= 0:
+        return math.nan
+    if math.isinf(t):
+        return 0.0
+    x, y = _t_split(t, df)
+    a = df / 2
+    if a >= BGRAT_MIN_A and y < 0.5:
+        return _bgrat_half(a, x, y)
+    return betainc(a, 0.5, x, y)
+
+def t_sf(t, df):
+    """ 右尾機率 P(T > t) """
+    p = 0.5 * t_two_sided(t, df)
+    return p if t >= 0 else 1 - p
+
+def t_cdf(t, df):
+    """ t 分佈的 CDF P(T <= t) """
+    return t_sf(-t, df)
+
+# --- 陣列版本 ---
+
+def _betacf_array(a, b, x):
+    """ _betacf 的向量化版本：所有元素一起迭代，已收斂的元素不再更新 """
+    qab, qap, qam = a + b, a + 1, a - 1
+    c = np.ones_like(x)
+    d = 1 - qab * x / qap
+    d = 1 / np.where(np.abs(d) > FPMIN, d, FPMIN)
+    h = d.copy()
+    active = np.ones(x.shape, dtype=bool)
+    for m in range(1, MAX_ITER + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / np.where(np.abs(d) > FPMIN, d, FPMIN)
+        c = 1 + aa / c
+        c = np.where(np.abs(c) > FPMIN, c, FPMIN)
+        h = np.where(active, h * d * c, h)
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / np.where(np.abs(d) > FPMIN, d, FPMIN)
+        c = 1 + aa / c
+        c = np.where(np.abs(c) > FPMIN, c, FPMIN)
+        delta = d * c
+        h = np.where(active, h * delta, h)
+        active &= np.abs(delta - 1) >= EPS
+        if not active.any():
+            return h
+    raise ArithmeticError("不完全 beta 函數的連分數未收斂")
+
+def _per_unique(func, a):
+    """ 對 a 中每個不同的值呼叫一次 func (不同的 df 通常不多，每種樣本數一個)，再展開回 a 的形狀 """
+    values, inverse = np.unique(a, return_inverse=True)
+    return np.array([func(v) for v in values.tolist()])[inverse].reshape(a.shape)
+
+_erfc_array = np.frompyfunc(math.erfc, 1, 1)
+
+def _bgrat_half_array(a, x, y):
+    """ _bgrat_half 的向量化版本 """
+    t = a - 0.25
+    lx = np.where(y < 0.35, np.log1p(-y), np.log(x))
+    u = -t * lx
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        h = np.sqrt(u) * np.exp(-u) / math.sqrt(math.pi)
+        prefix = h * np.exp(_per_unique(_log_gamma_ratio_half, a)) / np.sqrt(t)
+        j = _erfc_array(np.sqrt(u)).astype(np.float64) / h
+        total = prefix * j
+        lx2 = (lx / 2) ** 2
+        lxp = np.ones_like(x)
+        t4 = 4 * t * t
+        b2n = 0.5
+        for pn in _BGRAT_P[1:]:
+            j = (b2n * (b2n + 1) * j + (u + b2n + 1) * lxp) / t4
+            lxp = lxp * lx2
+            b2n += 2
+            term = prefix * pn * j
+            total = total + term
+            if np.all(np.abs(term) < EPS * np.abs(total)):
+                break
+    # u = 0 (t = 0) 時 I = 1；h 下溢時 I = 0
+    return np.where(u == 0, 1.0, np.where(h == 0, 0.0, total))
+
+def t_two_sided_array(t, df):
+    """ t_two_sided 的陣列版本 (t 與 df 可以廣播)；t 或 df 為 NaN、df <= 0 時回傳 NaN """
+    t, df = np.broadcast_arrays(np.asarray(t, dtype=np.float64), np.asarray(df, dtype=np.float64))
+    out = np.full(t.shape, np.nan)
+    ok = ~np.isnan(t) & (df > 0)
+    out[ok & np.isinf(t)] = 0.0
+    ok &= np.isfinite(t)
+    if not ok.any():
+        return out
+    t, df = t[ok], df[ok]
+    t2 = t * t
+    x, y = df / (df + t2), t2 / (df + t2)
+    a = df / 2
+    result = np.empty(len(t))
+    # 與 t_two_sided 相同：a 大且 x 接近 1 時用 BGRAT，其餘用連分數
+    near = (a >= BGRAT_MIN_A) & (y < 0.5)
+    if near.any():
+        result[near] = _bgrat_half_array(a[near], x[near], y[near])
+    rest = ~near
+    if rest.any():
+        result[rest] = _betainc_half_array(a[rest], x[rest], y[rest])
+    out[ok] = result
+    return out
+
+def _betainc_half_array(a, x, y):
+    """ I_x(a, 1/2) 的連分數版本；與 betainc 相同，x 大時改算 1 - I_{1-x}(1/2, a) """
+    flip = x > (a + 1) / (a + 2.5)
+    xx, yy = np.where(flip, y, x), np.where(flip, x, y)
+    pa, pb = np.where(flip, 0.5, a), np.where(flip, a, 0.5)
+    lb = _per_unique(lambda v: log_beta(v, 0.5), a)
+    with np.errstate(divide="ignore"):
+        log_x = np.where(yy < 0.5, np.log1p(-yy), np.log(xx))
+        log_y = np.where(xx < 0.5, np.log1p(-xx), np.log(yy))
+        front = np.exp(pa * log_x + pb * log_y - lb)
+    ib = np.where(xx > 0, front * _betacf_array(pa, pb, xx) / pa, 0.0)
+    return np.where(flip, 1 - ib, ib)
+
+# --- 與 scipy 比對 ---
+
+def verify_against_scipy(tol=1e-12):
+    """ 在 t 與 df 的網格上與 scipy 比對，回傳 (是否全部在 tol 內, 各項最大誤差) """
+    from scipy import stats
+
+    z = np.concatenate([-np.logspace(-6, 1.5, 200), [0.0], np.logspace(-6, 1.5, 200)])
+    err_norm = max(max(abs(norm_cdf(v) - stats.norm.cdf(v)), abs(norm_sf(v) - stats.norm.sf(v))) for v in z.tolist())
+
+    t = np.concatenate([[0.0], np.logspace(-6, 3, 300)])
+    dfs = [0.5, 1, 1.5, 2, 3, 4, 5, 7, 9.5, 10, 15, 29, 30, 50, 99, 200, 1e3, 12345, 1e5, 1e6, 1e7]
+    err_t = err_t_rel = err_array = 0.0
+    for df in dfs:
+        # scipy 的 t 分佈在 df = 1、t 接近 0 時本身約有 4e-11 的誤差，改用等價的 Cauchy 分佈
+        expected = 2 * (stats.cauchy.sf(t) if df == 1 else stats.t.sf(t, df))
+        got = np.array([t_two_sided(v, df) for v in t.tolist()])
+        err_t = max(err_t, np.max(np.abs(got - expected)))
+        # 相對誤差只看還沒有下溢的值
+        big = expected > 1e-290
+        err_t_rel = max(err_t_rel, np.max(np.abs(got[big] / expected[big] - 1)))
+        err_array = max(err_array, np.max(np.abs(t_two_sided_array(t, df) - got)))
+        # CDF (單尾)
+        dist = stats.cauchy() if df == 1 else stats.t(df)
+        err_t = max(err_t, max(abs(t_cdf(v, df) - dist.cdf(v)) for v in np.concatenate([-t[::10], t[::10]]).tolist()))
+    # 退化的輸入：純量與陣列版本必須一致 (NaN 的位置相同)
+    for t_bad, df_bad in [(1.0, 0.0), (0.0, 0.0), (1.0, -1.0), (math.inf, 0.0), (math.nan, 3.0), (1.0, math.nan), (math.inf, 3.0)]:
+        a, b = t_two_sided(t_bad, df_bad), t_two_sided_array([t_bad], df_bad)[0]
+        if not (a == b or (math.isnan(a) and math.isnan(b))):
+            err_array = math.inf
+    errors = {"常態 CDF/SF": err_norm, "t 雙尾與 CDF (絕對)": err_t, "t 雙尾 (相對)": err_t_rel, "陣列 vs 純量": err_array}
+    return all(e < tol for e in errors.values()), errors
+
+if __name__ == "__main__":
+    print(f"t = 2.0, df = 9: P(|T| > t) = {t_two_sided(2.0, 9):.15f}")
+    print(f"z = 1.96: P(|Z| > z) = {2 * norm_sf(1.96):.15f}")
+    print(f"深尾端 z = 30: P(Z > z) = {norm_sf(30):.6e} (1 - Phi 會得到 0)")
+    ok, errors = verify_against_scipy()
+    print("\n與 scipy 比對的最大誤差:")
+    for name, err in errors.items():
+        print(f"  {name}: {err:.2e}")
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
@@ -0,0 +1,336 @@
+"""
+第八週習題 (延伸) : 排列檢定與 bootstrap 信賴區間
+week8 的 t 檢定假設資料接近常態 (或樣本夠大)；線上的指標常常偏態、有長尾，這個假設不一定成立。
+重抽樣 (resampling) 不需要分佈假設：
+1. 排列檢定 (permutation test)：虛無假設下組別標籤可以互換 (配對資料則是每個差值的正負號可以翻轉)，
+   把標籤打亂很多次，p-value = 統計量至少和觀察值一樣極端的比例
+2. bootstrap：各組有放回地重抽，得到統計量的抽樣分佈，取百分位數當信賴區間
+3. 統計量：平均差 ("mean_diff") 或 t 分數 ("t"；獨立樣本為合併變異數 t，配對為配對 t)，與 week8 的公式相同
+4. 每一批重抽樣用 NumPy 一次產生 B x n 的陣列；各批交給 multiprocessing 的 worker，
+   每批的亂數由 SeedSequence.spawn 產生互相獨立的串流，結果只取決於 seed，與 worker 數量無關
+5. 排列檢定可以提早結束：p-value 的蒙地卡羅標準誤 sqrt(p (1 - p) / n) 小於 target_se 就停止
+"""
+
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+STATISTICS = ("mean_diff", "t")
+# 每個工作 (task) 的重抽樣次數：亂數串流、提早結束的判斷與分派給 worker 都以此為單位
+TASK_SIZE = 20_000
+# 一批 B x n 陣列最多的元素數量 (約 16 MiB)，樣本很大時自動減少每批的列數
+BATCH_ELEMENTS = 1 << 21
+
+class PermutationResult:
+    """
+    排列檢定的結果：
+    observed: 原始資料的統計量，p_value = (極端次數 + 1) / (重抽樣次數 + 1)
+    standard_error: p-value 的蒙地卡羅標準誤 sqrt(p (1 - p) / n)
+    """
+    def __init__(self, statistic, paired, observed, extreme, n_resamples, elapsed):
+        self.statistic = statistic
+        self.paired = paired
+        self.observed = observed
+        self.extreme = extreme
+        self.n_resamples = n_resamples
+        self.elapsed = elapsed
+
+    @property
+    def p_value(self):
+        return (self.extreme + 1) / (self.n_resamples + 1)
+
+    @property
+    def standard_error(self):
+        p = self.p_value
+        return (p * (1 - p) / self.n_resamples) ** 0.5
+
+    @property
+    def throughput(self):
+        """ 每秒重抽樣次數 """
+        return self.n_resamples / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def __repr__(self):
+        return (f"PermutationResult({self.statistic}={self.observed:.4f}, p={self.p_value:.4g} "
+                f"± {self.standard_error:.2g}, {self.n_resamples} 次, {self.elapsed:.2f} 秒)")
+
+class BootstrapResult:
+    """
+    bootstrap 百分位數信賴區間：(low, high) 為 distribution 的 (1 - confidence) / 2 與 (1 + confidence) / 2 分位數
+    standard_error: bootstrap 分佈的標準差
+    """
+    def __init__(self, statistic, paired, observed, distribution, confidence, elapsed):
+        self.statistic = statistic
+        self.paired = paired
+        self.observed = observed
+        self.distribution = distribution
+        self.confidence = confidence
+        self.elapsed = elapsed
+        alpha = (1 - confidence) / 2
+        self.low, self.high = np.quantile(distribution, [alpha, 1 - alpha])
+
+    @property
+    def n_resamples(self):
+        return len(self.distribution)
+
+    @property
+    def standard_error(self):
+        return float(np.std(self.distribution, ddof=1))
+
+    def __repr__(self):
+        return (f"BootstrapResult({self.statistic}={self.observed:.4f}, "
+                f"{self.confidence:.0%} CI [{self.low:.4f}, {self.high:.4f}], {self.n_resamples} 次, {self.elapsed:.2f} 秒)")
+
+# --- 由 (和, 平方和) 算統計量：純量與陣列 (每次重抽樣一個值) 共用 ---
+
+def _one_sample(s, q, n, shift, statistic):
+    """ 資料已減去 shift：平均 = s / n + shift，M2 = q - s^2 / n """
+    mean = s / n
+    if statistic == "mean_diff":
+        return mean + shift
+    m2 = np.maximum(q - s * mean, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (mean + shift) / np.sqrt(m2 / (n - 1) / n)
+
+def _two_sample(s1, q1, n1, s2, q2, n2, shift, statistic):
+    """ 兩組各自減去常數後的 (和, 平方和)；shift 是兩個常數的差，平均差要加回來 """
+    mean1, mean2 = s1 / n1, s2 / n2
+    diff = mean1 - mean2 + shift
+    if statistic == "mean_diff":
+        return diff
+    m2 = np.maximum(q1 - s1 * mean1, 0.0) + np.maximum(q2 - s2 * mean2, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return diff / (np.sqrt(m2 / (n1 + n2 - 2)) * np.sqrt(1 / n1 + 1 / n2))
+
+def _sums(block):
+    """ 每一列的 (和, 平方和) """
+    return block.sum(axis=1), np.einsum("ij,ij->i", block, block)
+
+# --- worker：每一種重抽樣產生 rows 個統計量 ---
+
+_shared = {}
+
+def _init_worker(shared):
+    _shared.clear()
+    _shared.update(shared)
+
+def _permute_independent(rng, rows):
+    # 兩組合併後每列各自洗牌，前 n1 個當第一組；總和與總平方和不變，第二組用相減得到
+    z, n1, n2, total, total_sq = _shared["z"], _shared["n1"], _shared["n2"], _shared["total"], _shared["total_sq"]
+    s1, q1 = _sums(rng.permuted(np.broadcast_to(z, (rows, len(z))), axis=1)[:, :n1])
+    return _two_sample(s1, q1, n1, total - s1, total_sq - q1, n2, 0.0, _shared["statistic"])
+
+def _flip_signs(rng, rows):
+    # 配對差值隨機翻轉正負號：和 = 2 * (保留的部分) - 全部，平方和不變
+    d = _shared["d"]
+    keep = rng.integers(0, 2, (rows, len(d)), dtype=np.uint8).astype(np.float64)
+    s = 2 * (keep @ d) - _shared["total"]
+    return _one_sample(s, _shared["total_sq"], len(d), 0.0, _shared["statistic"])
+
+def _bootstrap_independent(rng, rows):
+    x1, x2 = _shared["x1"], _shared["x2"]
+    s1, q1 = _sums(x1[rng.integers(0, len(x1), (rows, len(x1)))])
+    s2, q2 = _sums(x2[rng.integers(0, len(x2), (rows, len(x2)))])
+    return _two_sample(s1, q1, len(x1), s2, q2, len(x2), _shared["shift"], _shared["statistic"])
+
+def _bootstrap_paired(rng, rows):
+    d = _shared["d"]
+    s, q = _sums(d[rng.integers(0, len(d), (rows, len(d)))])
+    return _one_sample(s, q, len(d), _shared["shift"], _shared["statistic"])
+
+_BATCH = {
+    ("permutation", False): _permute_independent,
+    ("permutation", True): _flip_signs,
+    ("bootstrap", False): _bootstrap_independent,
+    ("bootstrap", True): _bootstrap_paired,
+}
+
+def _resample(task):
+    """ 一個工作：size 次重抽樣，分成不超過 BATCH_ELEMENTS 的批次。排列檢定只回傳極端次數 """
+    size, seed = task
+    rng = np.random.default_rng(seed)
+    batch = _BATCH[_shared["kind"], _shared["paired"]]
+    rows = max(1, BATCH_ELEMENTS // _shared["width"])
+    stats = np.concatenate([batch(rng, min(rows, size - start)) for start in range(0, size, rows)])
+    if _shared["kind"] == "permutation":
+        return int(np.count_nonzero(np.abs(stats) >= _shared["threshold"]))
+    return stats
+
+def _run(shared, n_resamples, seed, workers):
+    """
+    依序產生每個工作的 (重抽樣次數, 結果)。imap 保持順序，提早結束時停在哪裡只取決於 seed。
+    workers 為 None 時使用全部 CPU；只有 1 個時直接在主行程執行，不開行程池。
+    """
+    full, rest = divmod(n_resamples, TASK_SIZE)
+    sizes = [TASK_SIZE] * full + ([rest] if rest else [])
+    tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        _init_worker(shared)
+        yield from zip(sizes, map(_resample, tasks))
+        return
+    # 離開 with 時 pool.terminate()，提早結束後還在跑的 worker 直接結束
+    with mp.Pool(workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        yield from zip(sizes, pool.imap(_resample, tasks, chunksize=1))
+
+# --- 對外介面 ---
+
+def _prepare(data1, data2, statistic, paired, n_resamples=None):
+    if n_resamples is not None and n_resamples < 1:
+        raise ValueError("n_resamples 至少需要 1")
+    if statistic not in STATISTICS:
+        raise ValueError(f"不支援的統計量: {statistic!r} (可用: {', '.join(STATISTICS)})")
+    x1 = np.asarray(data1, dtype=np.float64).ravel()
+    x2 = np.asarray(data2, dtype=np.float64).ravel()
+    if paired:
+        if len(x1) != len(x2):
+            raise ValueError("配對樣本數量必須相同")
+        if len(x1) < 2:
+            raise ValueError("配對樣本至少需要 2 筆")
+    elif len(x1) < 2 or len(x2) < 2:
+        raise ValueError("兩組樣本各至少需要 2 筆")
+    return x1, x2
+
+def permutation_test(data1, data2, statistic="t", paired=False, n_resamples=100_000,
+                     target_se=None, seed=None, workers=None):
+    """
+    雙尾排列檢定，方向與 week8 相同：獨立樣本為 data1 - data2，配對為 data2 - data1 (after - before)。
+    - paired=False：合併兩組後隨機分成 n1、n2 兩組；paired=True：隨機翻轉每個差值的正負號
+    - statistic="t" 時觀察值等於 week8.t_test_independent / t_test_paired 的 t 分數
+    - target_se：每完成一個工作 (TASK_SIZE 次) 檢查一次，p-value 標準誤小於它就停止，最多 n_resamples 次
+    - seed 相同時結果相同，與 workers 無關
+    """
+    x1, x2 = _prepare(data1, data2, statistic, paired, n_resamples)
+    if paired:
+        # 符號翻轉的虛無分佈以 0 為中心，差值不能先減去平均
+        d = x2 - x1
+        total, total_sq = float(d.sum()), float(d @ d)
+        observed = float(_one_sample(total, total_sq, len(d), 0.0, statistic))
+        shared = {"d": d, "total": total, "total_sq": total_sq, "width": len(d)}
+    else:
+        # 兩組統計量不受整體平移影響：先減去合併平均，平方和比較不會失去精度
+        z = np.concatenate([x1, x2])
+        z -= z.mean()
+        n1, n2 = len(x1), len(x2)
+        s1, q1 = _sums(z[None, :n1])
+        total, total_sq = float(z.sum()), float(z @ z)
+        observed = float(_two_sample(s1[0], q1[0], n1, total - s1[0], total_sq - q1[0], n2, 0.0, statistic))
+        shared = {"z": z, "n1": n1, "n2": n2, "total": total, "total_sq": total_sq, "width": len(z)}
+    # 重抽樣的加總順序與原始資料不同，完全一樣的排列可能差幾個 ulp，門檻放寬一點點
+    shared.update(kind="permutation", paired=paired, statistic=statistic,
+                  threshold=abs(observed) * (1 - 1e-9))
+
+    start = time.perf_counter()
+    result = PermutationResult(statistic, paired, observed, 0, 0, 0.0)
+    results = _run(shared, n_resamples, seed, workers)
+    for size, extreme in results:
+        result.extreme += extreme
+        result.n_resamples += size
+        if target_se is not None and result.standard_error < target_se:
+            break
+    results.close()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+def bootstrap_ci(data1, data2, statistic="mean_diff", paired=False, confidence=0.95,
+                 n_resamples=100_000, seed=None, workers=None):
+    """
+    bootstrap 百分位數信賴區間：獨立樣本兩組各自有放回地重抽，配對資料重抽差值 (data2 - data1)。
+    回傳 BootstrapResult (low, high, standard_error, distribution)。
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence 必須介於 0 與 1 之間")
+    x1, x2 = _prepare(data1, data2, statistic, paired, n_resamples)
+    if paired:
+        d = x2 - x1
+        shift = float(d.mean())
+        dc = d - shift
+        s, q = _sums(dc[None, :])
+        observed = float(_one_sample(s[0], q[0], len(d), shift, statistic))
+        shared = {"d": dc, "shift": shift, "width": len(d)}
+    else:
+        c1, c2 = float(x1.mean()), float(x2.mean())
+        x1c, x2c = x1 - c1, x2 - c2
+        s1, q1 = _sums(x1c[None, :])
+        s2, q2 = _sums(x2c[None, :])
+        observed = float(_two_sample(s1[0], q1[0], len(x1), s2[0], q2[0], len(x2), c1 - c2, statistic))
+        shared = {"x1": x1c, "x2": x2c, "shift": c1 - c2, "width": len(x1) + len(x2)}
+    shared.update(kind="bootstrap", paired=paired, statistic=statistic)
+
+    start = time.perf_counter()
+    distribution = np.concatenate([stats for _, stats in _run(shared, n_resamples, seed, workers)])
+    return BootstrapResult(statistic, paired, observed, distribution, confidence, time.perf_counter() - start)
+
+def exact_permutation_p(data1, data2, statistic="t", paired=False):
+    """ 小樣本時窮舉所有分組 (或所有正負號組合) 的精確雙尾 p-value，用來驗證蒙地卡羅結果 """
+    from itertools import combinations, product
+    x1, x2 = _prepare(data1, data2, statistic, paired)
+    if paired:
+        d = x2 - x1
+        stats = [_one_sample(float(s @ d), float(d @ d), len(d), 0.0, statistic)
+                 for s in map(np.array, product((1.0, -1.0), repeat=len(d)))]
+    else:
+        z = np.concatenate([x1, x2])
+        total, total_sq, n1, n2 = z.sum(), z @ z, len(x1), len(x2)
+        stats = []
+        for group in map(list, combinations(range(len(z)), n1)):
+            s1, q1 = z[group].sum(), z[group] @ z[group]
+            stats.append(_two_sample(s1, q1, n1, total - s1, total_sq - q1, n2, 0.0, statistic))
+    stats = np.abs(stats)
+    return float(np.mean(stats >= stats[0] * (1 - 1e-9)))
+
+if __name__ == "__main__":
+    from week8 import t_test_independent, t_test_paired
+
+    rng = np.random.default_rng(0)
+    ok = True
+
+    print("=== 1. 小樣本：蒙地卡羅 p-value vs 窮舉的精確 p-value ===")
+    a, b = rng.normal(0.8, 1, 7), rng.normal(0, 1, 7)
+    before = rng.normal(10, 2, 12)
+    after = before + rng.normal(0.6, 1, 12)
+    for name, args in (("獨立 (7 vs 7)", (a, b, False)), ("配對 (12 對)", (before, after, True))):
+        for statistic in STATISTICS:
+            exact = exact_permutation_p(args[0], args[1], statistic, args[2])
+            res = permutation_test(args[0], args[1], statistic, args[2], n_resamples=200_000, seed=1, workers=1)
+            close = abs(res.p_value - exact) < 4 * res.standard_error + 1e-5
+            ok &= close
+            print(f"{name} {statistic:>9}: 精確 {exact:.5f}，蒙地卡羅 {res.p_value:.5f} ± {res.standard_error:.5f} "
+                  f"{'✓' if close else '✗'}")
+
+    print("\n=== 2. 觀察到的 t 分數與 week8 相同 ===")
+    x, y = rng.lognormal(0, 1, 40), rng.lognormal(0.3, 1, 35)
+    t_ind, p_ind = t_test_independent(x, y)
+    t_pair, p_pair = t_test_paired(before, after)
+    res_ind = permutation_test(x, y, seed=2, workers=1)
+    res_pair = permutation_test(before, after, paired=True, seed=2, workers=1)
+    err = max(abs(res_ind.observed - t_ind), abs(res_pair.observed - t_pair))
+    ok &= err < 1e-9
+    print(f"獨立 t = {t_ind:.6f} (week8)，{res_ind.observed:.6f} (排列)；配對 t = {t_pair:.6f}，{res_pair.observed:.6f}")
+    print(f"偏態資料 (對數常態)：t 檢定 p = {p_ind:.4f}，排列檢定 p = {res_ind.p_value:.4f}")
+
+    print("\n=== 3. 提早結束與可重現性 ===")
+    res = permutation_test(x, y, n_resamples=10**6, target_se=0.002, seed=3, workers=1)
+    print(f"target_se = 0.002：{res}")
+    ok &= res.n_resamples < 10**6 and res.standard_error < 0.002
+    one = permutation_test(x, y, n_resamples=100_000, seed=4, workers=1)
+    two = permutation_test(x, y, n_resamples=100_000, seed=4, workers=2)
+    boot_one = bootstrap_ci(x, y, n_resamples=50_000, seed=4, workers=1)
+    boot_two = bootstrap_ci(x, y, n_resamples=50_000, seed=4, workers=2)
+    same = one.extreme == two.extreme and np.array_equal(boot_one.distribution, boot_two.distribution)
+    ok &= same
+    print(f"同一個 seed，1 個與 2 個 worker 的結果{'相同' if same else '不同'}")
+
+    print("\n=== 4. bootstrap 信賴區間 ===")
+    print(bootstrap_ci(x, y, seed=5, workers=1))
+    print(bootstrap_ci(before, after, statistic="t", paired=True, seed=5, workers=1))
+    # 覆蓋率：常態資料平均差真值 0.5，95% 區間應該大約有 95% 包含它
+    trials, covered = 200, 0
+    for i in range(trials):
+        ci = bootstrap_ci(rng.normal(0.5, 1, 50), rng.normal(0, 1, 50), n_resamples=2_000, seed=i, workers=1)
+        covered += ci.low <= 0.5 <= ci.high
+    ok &= 0.88 <= covered / trials <= 0.99
+    print(f"常態資料 (平均差真值 0.5)：{trials} 組資料中 {covered} 組的 95% 區間包含真值")
+
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
@@ -0,0 +1,223 @@
+"""
+第八週習題 (延伸) : 線上序貫 A/B 檢定
+實驗進行中每來一筆資料就重跑 t_test_independent 要重新掃過全部歷史；而且反覆偷看 (peeking)
+固定樣本數的 p-value，只要有一次 < 0.05 就停止，型一錯誤會遠大於 5%。
+1. 兩組各一個 RunningStats：逐筆 push 或整批 update 都是 O(1) 記憶體，合併變異數隨時可得
+2. 任何時候都能讀出目前的 t 分數與 (固定樣本數的) p-value，與 week8.t_test_independent 完全相同
+3. mSPRT (mixture sequential probability ratio test) 的 always-valid p-value：
+   不管看幾次、什麼時候停，型一錯誤都不超過 alpha
+"""
+
+import math
+
+import numpy as np
+
+from week8 import RunningStats, t_test_independent
+
+class SequentialTTest:
+    """
+    兩組 (0: data1, 1: data2) 的序貫 t 檢定，檢定 mean1 == mean2，方向與 week8 相同 (data1 - data2)。
+
+    mSPRT：效果 (以標準差為單位) 的先驗為 N(0, tau^2)，令 V = 1/n1 + 1/n2，
+    把平均差除以合併標準差後的概似比對先驗積分，得到只和 t 分數有關的混合概似比
+        Lambda = sqrt(V / (V + tau^2)) * exp(t^2 * tau^2 / (2 (V + tau^2)))
+    虛無假設下 Lambda 是平均為 1 的 martingale，所以 P(任何時候 Lambda >= 1/alpha) <= alpha。
+    always-valid p-value = 到目前為止每次查看時 1 / Lambda 的最小值 (只會變小)。
+    tau 是預期的效果大小 (Cohen's d)，接近真實效果時最快達到顯著。
+    """
+    __slots__ = ("groups", "alpha", "tau", "_p_min")
+
+    def __init__(self, alpha=0.05, tau=0.1):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha 必須介於 0 與 1 之間")
+        if tau <= 0:
+            raise ValueError("tau 必須大於 0")
+        self.groups = (RunningStats(), RunningStats())
+        self.alpha = alpha
+        self.tau = tau
+        self._p_min = 1.0
+
+    def __repr__(self):
+        a, b = self.groups
+        return (f"SequentialTTest(n=({a.n}, {b.n}), diff={a.mean - b.mean:.4g}, t={self.t_score:.4f}, "
+                f"always-valid p={self.always_valid_p:.4g}{', 顯著' if self.rejected else ''})")
+
+    # --- 資料輸入 ---
+
+    def _group(self, group):
+        # groups[-1] 也會成功，所以不能只靠 IndexError
+        if group != 0 and group != 1:
+            raise ValueError("group 只能是 0 或 1")
+        return self.groups[int(group)]
+
+    def push(self, group, x):
+        """ 一筆觀測值 (Welford，O(1)) """
+        self._group(group).push(x)
+        return self
+
+    def update(self, group, data):
+        """ 同一組的一批觀測值 (micro-batch)，轉成陣列後以 Chan 公式併入，最後查看一次 """
+        self._group(group).update(data)
+        self.check()
+        return self
+
+    def ingest(self, groups, values):
+        """ 混合兩組的一批事件：groups[i] 為 0 或 1，values[i] 為觀測值 """
+        groups = np.asarray(groups)
+        values = np.asarray(values, dtype=np.float64)
+        if groups.shape != values.shape:
+            raise ValueError("groups 與 values 的長度必須相同")
+        second = groups == 1
+        # 其他標籤 (2、-1、0.5…) 不能默默歸到某一組
+        if not (second | (groups == 0)).all():
+            raise ValueError("groups 只能是 0 或 1")
+        self.groups[0].update(values[~second])
+        self.groups[1].update(values[second])
+        self.check()
+        return self
+
+    # --- 目前的檢定結果 ---
+
+    def _ready(self):
+        a, b = self.groups
+        return a.n >= 1 and b.n >= 1 and a.n + b.n >= 3 and a.m2 + b.m2 > 0
+
+    @property
+    def t_score(self):
+        return t_test_independent(*self.groups)[0] if self._ready() else math.nan
+
+    @property
+    def p_value(self):
+        """ 固定樣本數的雙尾 p-value (與 week8 相同)：只有事先決定樣本數、只看一次時才有效 """
+        return t_test_independent(*self.groups)[1] if self._ready() else math.nan
+
+    @property
+    def likelihood_ratio(self):
+        """ mSPRT 的混合概似比 Lambda；資料不足時為 0 """
+        if not self._ready():
+            return 0.0
+        a, b = self.groups
+        t = self.t_score
+        v = 1 / a.n + 1 / b.n
+        tau2 = self.tau * self.tau
+        log_lr = 0.5 * math.log(v / (v + tau2)) + t * t * tau2 / (2 * (v + tau2))
+        # 超過 1 / (最小的浮點數) 時 p 已經是 0，不必算出 inf
+        return math.exp(min(log_lr, 700.0))
+
+    def check(self):
+        """ 查看一次：以目前的 Lambda 更新 always-valid p-value 並回傳 """
+        lr = self.likelihood_ratio
+        if lr > 1.0:
+            self._p_min = min(self._p_min, 1.0 / lr)
+        return self._p_min
+
+    @property
+    def always_valid_p(self):
+        return self.check()
+
+    @property
+    def rejected(self):
+        """ always-valid p <= alpha：可以隨時停止並宣告兩組平均不同 """
+        return self.always_valid_p <= self.alpha
+
+    @property
+    def boundary(self):
+        """ 目前樣本數下，Lambda 達到 1 / alpha 所需的 |t| (比固定樣本數的 1.96 大，隨樣本數緩慢增加) """
+        a, b = self.groups
+        if a.n == 0 or b.n == 0:
+            return math.inf
+        v = 1 / a.n + 1 / b.n
+        tau2 = self.tau * self.tau
+        return math.sqrt(2 * (v + tau2) / tau2 * (math.log(1 / self.alpha) + 0.5 * math.log((v + tau2) / v)))
+
+def _simulate(effect, experiments, n_max, look_every, rng, tau=0.1, alpha=0.05):
+    """
+    每個實驗兩組各最多 n_max 筆，每 look_every 筆查看一次。
+    回傳 (固定樣本數 p 曾經 < alpha 的比例, mSPRT 顯著的比例, mSPRT 停止時每組樣本數的中位數)
+    """
+    naive = always = 0
+    stops = []
+    for _ in range(experiments):
+        test = SequentialTTest(alpha, tau)
+        a = rng.normal(effect, 1, n_max)
+        b = rng.normal(0, 1, n_max)
+        peeked = False
+        for start in range(0, n_max, look_every):
+            test.update(0, a[start:start + look_every])
+            test.update(1, b[start:start + look_every])
+            peeked |= test.p_value < alpha
+            if test.rejected:
+                stops.append(start + look_every)
+                break
+        naive += peeked
+        always += test.rejected
+    median = float(np.median(stops)) if stops else math.nan
+    return naive / experiments, always / experiments, median
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    ok = True
+
+    print("=== 1. 逐筆與小批次輸入 vs week8.t_test_independent (全部歷史) ===")
+    x, y = rng.normal(10.3, 2, 3000), rng.normal(10, 2, 2500)
+    single = SequentialTTest()
+    for i in range(max(len(x), len(y))):
+        if i < len(x):
+            single.push(0, x[i])
+        if i < len(y):
+            single.push(1, y[i])
+    batched = SequentialTTest()
+    groups = np.concatenate([np.zeros(len(x), int), np.ones(len(y), int)])
+    order = rng.permutation(len(groups))
+    for chunk in np.array_split(order, 37):
+        batched.ingest(groups[chunk], np.concatenate([x, y])[chunk])
+    t_ref, p_ref = t_test_independent(x.tolist(), y.tolist())
+    err = max(abs(single.t_score - t_ref), abs(batched.t_score - t_ref),
+              abs(single.p_value - p_ref), abs(batched.p_value - p_ref))
+    ok &= err < 1e-9
+    print(f"week8: t = {t_ref:.6f}, p = {p_ref:.6g}")
+    print(f"逐筆: {single}")
+    print(f"37 批: {batched}")
+    print(f"最大差異 {err:.2e}，目前 |t| 的門檻 {batched.boundary:.3f}")
+    try:
+        batched.ingest([0, 1, 2], [1.0, 2.0, 3.0])
+        ok = False
+    except ValueError:
+        pass
+    try:
+        batched.push(-1, 1.0)
+        ok = False
+    except ValueError:
+        ok &= batched.groups[0].n + batched.groups[1].n == len(groups)
+
+    print("\n=== 2. 反覆偷看：A/A 實驗 (兩組沒有差異)，每組 5000 筆，每 100 筆看一次 ===")
+    naive, always, _ = _simulate(0.0, 400, 5000, 100, rng)
+    ok &= always <= 0.05 + 3 * math.sqrt(0.05 * 0.95 / 400)
+    print(f"固定樣本數 p < 0.05 就停止: 型一錯誤 {naive:.1%}")
+    print(f"mSPRT always-valid p < 0.05: 型一錯誤 {always:.1%}")
+
+    print("\n=== 3. A/B 實驗 (效果 0.1 個標準差) ===")
+    _, power, median = _simulate(0.1, 200, 5000, 100, rng)
+    ok &= power > 0.5
+    print(f"mSPRT 在每組 5000 筆內顯著的比例 {power:.1%}，停止時每組樣本數中位數 {median:.0f}")
+
+    print("\n=== 4. 吞吐量 ===")
+    events = 1_000_000
+    groups = rng.integers(0, 2, events)
+    values = rng.normal(0, 1, events)
+    test = SequentialTTest()
+    start = time.perf_counter()
+    for g, v in zip(groups.tolist(), values.tolist()):
+        test.push(g, v)
+    per_event = time.perf_counter() - start
+    test = SequentialTTest()
+    start = time.perf_counter()
+    for i in range(0, events, 1000):
+        test.ingest(groups[i:i + 1000], values[i:i + 1000])
+    per_batch = time.perf_counter() - start
+    print(f"逐筆 push: {events / per_event * 60:.3g} 筆/分鐘；每 1000 筆 ingest: {events / per_batch * 60:.3g} 筆/分鐘")
+    ok &= test.groups[0].n + test.groups[1].n == events
+
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")
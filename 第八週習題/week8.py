@@ -4,31 +4,117 @@
 1. 實作 Z-test 公式 (單一樣本)
 2. 實作 T-test 公式 (單一樣本、雙樣本獨立、雙樣本配對)
 3. 驗證數學原理與公式推導
+4. 單次掃描的統計量累加器：資料可以是串流 (例如逐行讀檔)，不必先載入成 list
 """
 
+import itertools
 import math
-# 我們只用 scipy 來查找 P-value (因為積分計算繁瑣)，但統計量(t-score, z-score)全部手算
-from scipy import stats
+
+import numpy as np
+
+# 統計量 (t-score, z-score) 全部手算；P-value 也用 distributions 中的 erfc 與不完全 beta 函數計算，不必載入 scipy
+from distributions import norm_sf, t_two_sided
+
+# 串流資料每次轉成 NumPy 陣列處理的筆數
+CHUNK_SIZE = 1 << 16
+
+class RunningStats:
+    """
+    單次掃描的統計量累加器 (Welford / Chan)：
+    只保存樣本數 n、平均 mean、離均差平方和 M2 = sum((x - mean)^2)，記憶體固定。
+    可以逐筆 push、整批 update (一次掃過 iterable)，
+    各分段 (檔案的不同區塊、不同機器) 的結果也能以 merge / + 合併：
+        delta = mean_b - mean_a
+        mean = mean_a + delta * n_b / n
+        M2 = M2_a + M2_b + delta^2 * n_a * n_b / n
+    """
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_iterable(cls, data, chunk_size=CHUNK_SIZE):
+        return cls().update(data, chunk_size)
+
+    def __repr__(self):
+        return f"RunningStats(n={self.n}, mean={self.mean:.6g}, std={self.std():.6g})"
+
+    def push(self, x):
+        """ Welford 逐筆更新 """
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        return self
+
+    def update(self, data, chunk_size=CHUNK_SIZE):
+        """ 一次掃過 data：每 chunk_size 筆轉成陣列求出 (n, mean, M2)，再與目前結果合併 """
+        if isinstance(data, np.ndarray):
+            self._merge_chunk(data.ravel().astype(np.float64, copy=False))
+            return self
+        it = iter(data)
+        while True:
+            chunk = np.fromiter(itertools.islice(it, chunk_size), dtype=np.float64)
+            if len(chunk) == 0:
+                return self
+            self._merge_chunk(chunk)
+
+    def _merge_chunk(self, chunk):
+        if len(chunk):
+            mean = float(chunk.mean())
+            self._merge(len(chunk), mean, float(np.square(chunk - mean).sum()))
+
+    def _merge(self, n, mean, m2):
+        """ Chan 的合併公式 """
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def merge(self, other):
+        """ 把另一段的結果併入自己 """
+        self._merge(other.n, other.mean, other.m2)
+        return self
+
+    def __add__(self, other):
+        return RunningStats(self.n, self.mean, self.m2).merge(other)
+
+    def variance(self, ddof=1):
+        if self.n <= ddof: return 0.0
+        return self.m2 / (self.n - ddof)
+
+    def std(self, ddof=1):
+        return math.sqrt(self.variance(ddof))
+
+def summarize(data):
+    """ 資料 (list、generator、NumPy 陣列) -> RunningStats；已經是 RunningStats 就直接使用 """
+    if isinstance(data, RunningStats):
+        return data
+    return RunningStats.from_iterable(data)
 
 def calculate_mean(data):
     return sum(data) / len(data)
 
 def calculate_std(data, ddof=1):
-    """ 計算標準差，ddof=1 代表樣本標準差 (除以 n-1) """
-    n = len(data)
-    if n <= ddof: return 0.0
-    mean_val = calculate_mean(data)
-    variance = sum((x - mean_val) ** 2 for x in data) / (n - ddof)
-    return math.sqrt(variance)
+    """ 計算標準差，ddof=1 代表樣本標準差 (除以 n-1)；只掃過資料一次 """
+    return summarize(data).std(ddof)
 
 def z_test_one_sample(data, pop_mean, pop_std):
     """
     1. Z-test (單樣本)
     適用情境: 母體標準差(pop_std)已知，樣本數通常較大 (n > 30)
     公式: z = (x_bar - mu) / (sigma / sqrt(n))
+    data 可以是任何 iterable 或 RunningStats (以下各檢定相同)
     """
-    n = len(data)
-    sample_mean = calculate_mean(data)
+    summary = summarize(data)
+    n = summary.n
+    sample_mean = summary.mean
     
     # 標準誤 (Standard Error)
     se = pop_std / math.sqrt(n)
@@ -37,7 +123,7 @@ def z_test_one_sample(data, pop_mean, pop_std):
     z_score = (sample_mean - pop_mean) / se
     
     # 雙尾 P-value
-    p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+    p_value = 2 * norm_sf(abs(z_score))
     
     return z_score, p_value
 
@@ -47,9 +133,10 @@ def t_test_one_sample(data, pop_mean):
     適用情境: 母體標準差未知，用樣本標準差(s)取代
     公式: t = (x_bar - mu) / (s / sqrt(n))
     """
-    n = len(data)
-    sample_mean = calculate_mean(data)
-    sample_std = calculate_std(data, ddof=1) # 樣本標準差
+    summary = summarize(data)
+    n = summary.n
+    sample_mean = summary.mean
+    sample_std = summary.std(ddof=1) # 樣本標準差
     
     # 標準誤 (Standard Error)
     se = sample_std / math.sqrt(n)
@@ -59,7 +146,7 @@ def t_test_one_sample(data, pop_mean):
     
     # 雙尾 P-value (自由度 df = n - 1)
     df = n - 1
-    p_value = 2 * (1 - stats.t.cdf(abs(t_score), df))
+    p_value = t_two_sided(t_score, df)
     
     return t_score, p_value
 
@@ -70,14 +157,13 @@ def t_test_independent(data1, data2):
     假設: 變異數相等 (Pooled Variance)
     公式: t = (x1_bar - x2_bar) / sp * sqrt(1/n1 + 1/n2)
     """
-    n1, n2 = len(data1), len(data2)
-    m1, m2 = calculate_mean(data1), calculate_mean(data2)
-    v1 = calculate_std(data1)**2
-    v2 = calculate_std(data2)**2
+    s1, s2 = summarize(data1), summarize(data2)
+    n1, n2 = s1.n, s2.n
+    m1, m2 = s1.mean, s2.mean
     
     # 計算合併變異數 (Pooled Variance)
-    # sp^2 = ((n1-1)s1^2 + (n2-1)s2^2) / (n1 + n2 - 2)
-    pooled_var = ((n1 - 1)*v1 + (n2 - 1)*v2) / (n1 + n2 - 2)
+    # sp^2 = ((n1-1)s1^2 + (n2-1)s2^2) / (n1 + n2 - 2)，其中 (n-1)s^2 就是累加器的 M2
+    pooled_var = (s1.m2 + s2.m2) / (n1 + n2 - 2)
     sp = math.sqrt(pooled_var)
     
     # 標準誤
@@ -86,22 +172,35 @@ def t_test_independent(data1, data2):
     t_score = (m1 - m2) / se
     
     df = n1 + n2 - 2
-    p_value = 2 * (1 - stats.t.cdf(abs(t_score), df))
+    p_value = t_two_sided(t_score, df)
     
     return t_score, p_value
 
-def t_test_paired(data_before, data_after):
+def _paired_diffs(data_before, data_after):
+    """ 逐對產生 after - before；任一邊先結束就是長度不同 (其他錯誤，例如非數值資料，照原樣拋出) """
+    if hasattr(data_before, "__len__") and hasattr(data_after, "__len__") and len(data_before) != len(data_after):
+        raise ValueError("配對樣本數量必須相同")
+    missing = object()
+    for after, before in itertools.zip_longest(data_after, data_before, fillvalue=missing):
+        if after is missing or before is missing:
+            raise ValueError("配對樣本數量必須相同")
+        yield after - before
+
+def t_test_paired(data_before, data_after=None):
     """
     2-3. T-test (雙樣本配對)
     適用情境: 同一個體不同時間的測量 (例如: 服藥前 vs 服藥后)
     原理: 轉化為「差值」的單樣本 T 檢定
     公式: d = x_after - x_before, 檢定 d_bar 是否為 0
+    配對資料不能拆成兩組各自累加；已經累加好的差值 (RunningStats) 直接當作唯一的參數傳入
     """
-    if len(data_before) != len(data_after):
-        raise ValueError("配對樣本數量必須相同")
-        
-    # 計算差值 d
-    diffs = [a - b for a, b in zip(data_after, data_before)]
+    if data_after is None:
+        if not isinstance(data_before, RunningStats):
+            raise TypeError("只給一個參數時必須是差值 (after - before) 的 RunningStats")
+        return t_test_one_sample(data_before, pop_mean=0)
+
+    # 計算差值 d (逐對產生，不建立 list；串流資料長度不同時在讀到結尾時發現)
+    diffs = summarize(_paired_diffs(data_before, data_after))
     
     # 轉化為單樣本 T 檢定 (檢定差值平均是否為 0)
     return t_test_one_sample(diffs, pop_mean=0)
@@ -140,4 +239,40 @@ if __name__ == "__main__":
     diffs = [post - pre for pre, post in zip(weight_pre, weight_post)]
     print(f"體重變化平均: {calculate_mean(diffs)}")
     print(f"T-score: {t:.4f} (公式計算)")
-    print(f"P-value: {p:.4f}")
+    print(f"P-value: {p:.4f}\n")
+
+    print("=== 4. 串流資料 (單次掃描累加器) 驗證 ===")
+    import os
+    import tempfile
+    rng = np.random.default_rng(0)
+    values = rng.normal(70.02, 10, 1_000_000)
+    path = os.path.join(tempfile.mkdtemp(), "scores.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(map(repr, values.tolist())))
+
+    def stream(path):
+        """ 逐行讀檔，不把整個欄位載入記憶體 """
+        with open(path) as f:
+            for line in f:
+                yield float(line)
+
+    t_stream, p_stream = t_test_one_sample(stream(path), mu_0)
+    t_list, p_list = t_test_one_sample(values.tolist(), mu_0)
+    print(f"檔案串流 ({len(values)} 筆): T-score {t_stream:.6f}, P-value {p_stream:.6f}")
+    print(f"整個 list 載入: T-score {t_list:.6f}, P-value {p_list:.6f}")
+
+    # 分段計算再合併 (例如多個 worker 各讀一段)
+    parts = [RunningStats.from_iterable(chunk) for chunk in np.array_split(values, 7)]
+    merged = sum(parts, RunningStats())
+    direct = np.std(values, ddof=1)
+    print(f"7 段合併: {merged}，NumPy 標準差 {direct:.6g}")
+    os.remove(path)
+    # 配對檢定：差值分段累加後合併，結果與逐對計算相同
+    before, after = values[:500_000], values[500_000:]
+    diff_parts = [RunningStats.from_iterable(a - b) for a, b in zip(np.array_split(after, 4), np.array_split(before, 4))]
+    t_pair, _ = t_test_paired(before.tolist(), after.tolist())
+    t_pair_acc, _ = t_test_paired(sum(diff_parts, RunningStats()))
+    print(f"配對 T-score: 逐對 {t_pair:.6f}，差值分 4 段累加後合併 {t_pair_acc:.6f}")
+    ok = math.isclose(t_stream, t_list, rel_tol=1e-9) and math.isclose(merged.std(), direct, rel_tol=1e-12)
+    ok &= math.isclose(t_pair, t_pair_acc, rel_tol=1e-9)
+    print("\n✅ 驗證成功" if ok else "\n❌ 驗證失敗")